@@ -0,0 +1,591 @@
+# async_bot.py
+"""
+AsyncTeleBot entry point: one event loop serves every conversation, and database
+work is awaited through the async engine (utils/async_data.py) instead of
+occupying a worker thread per update.
+
+    python -m bot.async_bot
+
+Offers the same menus as the threaded bot (python -m bot.main): step-by-step
+income/expense entry, quick entry, category add/edit/delete, the period reports
+with charts and the monthly report. Multi-step conversations keep their place
+in the bot's state storage instead of register_next_step_handler. Charts are
+drawn by the render service on a worker thread; CSV import and export stay on
+the threaded bot.
+
+The step handlers (state=...) are registered before the menu and fallback
+handlers, so while a conversation waits for an answer every message goes to it,
+as with next-step handlers on the threaded bot.
+"""
+import asyncio
+import datetime
+
+from telebot import asyncio_filters, types
+from telebot.asyncio_helper import ApiTelegramException
+from telebot.async_telebot import AsyncTeleBot
+from telebot.asyncio_storage import StateMemoryStorage
+from telebot.states import State, StatesGroup
+
+from bot.models import init_db
+from bot.scheduler import start_scheduler
+from bot.utils import (
+    async_data, chart_cache, file_ids, menus, money, monthly_report, quick_entry, rate_lookup, reports, tx_pages
+)
+from bot.utils.config import BOT_TOKEN, DATABASE_URL
+from bot.utils.menus import BACK
+from bot.utils.render_service import renderer
+
+async_bot = AsyncTeleBot(BOT_TOKEN, state_storage=StateMemoryStorage())
+async_bot.add_custom_filter(asyncio_filters.StateFilter(async_bot))
+
+HELP_TEXT = (
+    "Швидке введення: 150 Їжа кава; 40 Транспорт; +20000 Зарплата\n"
+    "/summary YYYY-MM-DD:YYYY-MM-DD — доходи й витрати за період\n"
+    "/tx YYYY-MM-DD:YYYY-MM-DD — список транзакцій\n"
+    "/month — звіт за попередній місяць\n"
+    "/categories — ваші категорії"
+)
+PERIOD_PROMPT = "Введіть період у форматі YYYY-MM-DD:YYYY-MM-DD:"
+SKIP = "Пропустити"
+TYPE_CHOICES = {"Витрата": "expense", "Дохід": "income"}
+
+# тип → (сума чого, що додано, текст скасування)
+ENTRY_TEXTS = {
+    "expense": ("витрати", "Витрату", "Додавання витрати скасовано."),
+    "income": ("доходу", "Дохід", "Додавання доходу скасовано."),
+}
+
+
+class EntryStates(StatesGroup):
+    amount = State()
+    category = State()
+    note = State()
+
+
+class CategoryStates(StatesGroup):
+    add_type = State()
+    add_name = State()
+    edit_choice = State()
+    edit_field = State()
+    edit_name = State()
+    edit_type = State()
+    delete_choice = State()
+    delete_confirm = State()
+
+
+class ReportStates(StatesGroup):
+    period = State()
+
+
+def parse_range(text: str):
+    """
+    "YYYY-MM-DD:YYYY-MM-DD" → (start_dt, end_dt) на весь останній день; ValueError інакше.
+    """
+    s, e = [p.strip() for p in text.split(":", 1)]
+    start = datetime.datetime.fromisoformat(s)
+    end = datetime.datetime.combine(datetime.date.fromisoformat(e), datetime.time.max)
+    return start, end
+
+
+def parse_period(text: str):
+    """
+    "/cmd YYYY-MM-DD:YYYY-MM-DD" → (start_dt, end_dt) на весь останній день; ValueError інакше.
+    """
+    parts = text.split(maxsplit=1)
+    if len(parts) < 2:
+        raise ValueError("period is missing")
+    return parse_range(parts[1])
+
+
+# --- Розмова: стан і дані кроків ---
+async def ask(message, state: State, text: str, markup, **data):
+    """
+    Переводить розмову на крок state (з даними data) і ставить питання.
+    """
+    await async_bot.set_state(message.from_user.id, state, message.chat.id)
+    if data:
+        await async_bot.add_data(message.from_user.id, message.chat.id, **data)
+    await async_bot.send_message(message.chat.id, text, reply_markup=markup)
+
+
+async def finish(message, text: str, markup):
+    """
+    Завершує розмову (стан і дані скидаються) й відповідає.
+    """
+    await async_bot.delete_state(message.from_user.id, message.chat.id)
+    await async_bot.send_message(message.chat.id, text, reply_markup=markup)
+
+
+async def step_data(message) -> dict:
+    async with async_bot.retrieve_data(message.from_user.id, message.chat.id) as data:
+        return dict(data or {})
+
+
+# --- Графіки: малювання в render service і надсилання через реєстр file_id ---
+async def render(spec: dict) -> bytes:
+    return await asyncio.to_thread(renderer.render, spec)
+
+
+async def cached_chart(user_id: int, chart: str, start: datetime.date, end: datetime.date, make_spec) -> bytes:
+    """
+    chart_cache.get_or_render для async: make_spec — корутина, що читає дані.
+    """
+    key = chart_cache.chart_key(user_id, chart, start, end)
+    png = chart_cache.get(key)
+    if png is None:
+        png = await render(await make_spec())
+        chart_cache.put(key, png)
+    return png
+
+
+async def send_photo(chat_id: int, png: bytes):
+    """
+    file_ids.send_photo для async: однакові байти завантажуються в Telegram один раз.
+    """
+    digest = file_ids.content_hash(png)
+    file_id = await async_data.stored_file_id(digest)
+    if file_id is not None:
+        try:
+            return await async_bot.send_photo(chat_id, file_id)
+        except ApiTelegramException as e:
+            # Інші помилки Bad Request не пов'язані з file_id
+            if not file_ids.is_stale_file_id(e):
+                raise
+            await async_data.forget_file_id(digest)
+    sent = await async_bot.send_photo(chat_id, png)
+    if sent.photo:
+        await async_data.remember_file_id(digest, sent.photo[-1].file_id, len(png))
+    return sent
+
+
+# --- 1. Введення доходу/витрати крок за кроком ---
+@async_bot.message_handler(state=EntryStates.amount)
+async def entry_amount(message):
+    ttype = (await step_data(message))["type"]
+    text = message.text.strip()
+    if text == BACK:
+        await finish(message, ENTRY_TEXTS[ttype][2], menus.main_menu())
+        return
+    try:
+        amount = money.parse_amount(text)
+    except ValueError:
+        await finish(message, "Невірна сума. Спробуйте ще раз.", menus.main_menu())
+        return
+    categories = await async_data.get_categories(message.from_user.id, ttype)
+    await ask(
+        message, EntryStates.category, "Оберіть категорію:",
+        menus.choice_menu(*(cat.name for cat in categories)), amount=amount
+    )
+
+
+@async_bot.message_handler(state=EntryStates.category)
+async def entry_category(message):
+    ttype = (await step_data(message))["type"]
+    name = message.text.strip()
+    if name == BACK:
+        await finish(message, ENTRY_TEXTS[ttype][2], menus.main_menu())
+        return
+    category = await async_data.resolve_category(message.from_user.id, name, ttype)
+    if not category:
+        await finish(message, "Категорія не знайдена.", menus.main_menu())
+        return
+    await ask(
+        message, EntryStates.note,
+        f"(Опційно) Додайте опис {ENTRY_TEXTS[ttype][0]} або натисніть '{SKIP}' чи '{BACK}':",
+        menus.choice_menu(SKIP), category_id=category.id, category_name=name
+    )
+
+
+@async_bot.message_handler(state=EntryStates.note)
+async def entry_note(message):
+    data = await step_data(message)
+    ttype = data["type"]
+    note = message.text.strip()
+    if note == BACK:
+        await finish(message, ENTRY_TEXTS[ttype][2], menus.main_menu())
+        return
+    if note == SKIP:
+        note = ""
+    # Денні підсумки та метрика місяця оновлюються в тому ж commit
+    await async_data.add_transaction(message.from_user.id, data["category_id"], ttype, data["amount"], note)
+    await finish(
+        message,
+        f"{ENTRY_TEXTS[ttype][1]} {money.format_amount(data['amount'])} додано до '{data['category_name']}'.",
+        menus.main_menu()
+    )
+
+
+# --- 2. Категорії: додавання, редагування, видалення ---
+@async_bot.message_handler(state=CategoryStates.add_type)
+async def add_category_type(message):
+    choice = message.text.strip()
+    if choice == BACK:
+        await finish(message, "Додавання категорії скасовано.", menus.categories_menu())
+        return
+    if choice not in TYPE_CHOICES:
+        await finish(message, "Невідома опція.", menus.categories_menu())
+        return
+    await ask(
+        message, CategoryStates.add_name, f"Введіть назву нової категорії ({choice}):",
+        menus.choice_menu(), ctype=TYPE_CHOICES[choice]
+    )
+
+
+@async_bot.message_handler(state=CategoryStates.add_name)
+async def add_category_name(message):
+    name = message.text.strip()
+    if name == BACK:
+        await finish(message, "Додавання категорії скасовано.", menus.categories_menu())
+        return
+    ctype = (await step_data(message))["ctype"]
+    await async_data.add_category(message.from_user.id, name, ctype)
+    await finish(message, f"Категорію '{name}' додано ({ctype}).", menus.categories_menu())
+
+
+@async_bot.message_handler(state=CategoryStates.edit_choice)
+async def edit_category_choice(message):
+    name = message.text.strip()
+    if name == BACK:
+        await finish(message, "Редагування категорії скасовано.", menus.categories_menu())
+        return
+    category = await async_data.resolve_category(message.from_user.id, name)
+    if not category:
+        await finish(message, f"Категорія '{name}' не знайдена.", menus.categories_menu())
+        return
+    await ask(
+        message, CategoryStates.edit_field, f"Що ви хочете змінити в '{name}'?",
+        menus.choice_menu("Змінити назву", "Змінити тип"), category_id=category.id
+    )
+
+
+@async_bot.message_handler(state=CategoryStates.edit_field)
+async def edit_category_field(message):
+    choice = message.text.strip()
+    if choice == BACK:
+        await finish(message, "Редагування категорії скасовано.", menus.categories_menu())
+    elif choice == "Змінити назву":
+        await ask(message, CategoryStates.edit_name, "Введіть нову назву:", menus.choice_menu())
+    elif choice == "Змінити тип":
+        await ask(message, CategoryStates.edit_type, "Оберіть новий тип категорії:", menus.choice_menu(*TYPE_CHOICES))
+    else:
+        await finish(message, "Невідома опція.", menus.categories_menu())
+
+
+@async_bot.message_handler(state=CategoryStates.edit_name)
+async def edit_category_apply_name(message):
+    new_name = message.text.strip()
+    if new_name == BACK:
+        await finish(message, "Редагування категорії скасовано.", menus.categories_menu())
+        return
+    await async_data.rename_category((await step_data(message))["category_id"], new_name)
+    await finish(message, f"Категорію перейменовано на '{new_name}'.", menus.categories_menu())
+
+
+@async_bot.message_handler(state=CategoryStates.edit_type)
+async def edit_category_apply_type(message):
+    choice = message.text.strip()
+    if choice == BACK:
+        await finish(message, "Редагування категорії скасовано.", menus.categories_menu())
+        return
+    if choice not in TYPE_CHOICES:
+        await finish(message, "Невірний тип.", menus.categories_menu())
+        return
+    await async_data.retype_category((await step_data(message))["category_id"], TYPE_CHOICES[choice])
+    await finish(message, f"Тип категорії змінено на '{choice}'.", menus.categories_menu())
+
+
+@async_bot.message_handler(state=CategoryStates.delete_choice)
+async def delete_category_confirm(message):
+    name = message.text.strip()
+    if name == BACK:
+        await finish(message, "Видалення категорії скасовано.", menus.categories_menu())
+        return
+    category = await async_data.resolve_category(message.from_user.id, name)
+    if not category:
+        await finish(message, f"Категорія '{name}' не знайдена.", menus.categories_menu())
+        return
+    await ask(
+        message, CategoryStates.delete_confirm, f"Ви впевнені, що хочете видалити категорію '{name}'?",
+        menus.choice_menu("✅ Так", "❌ Ні", back=False), category_id=category.id
+    )
+
+
+@async_bot.message_handler(state=CategoryStates.delete_confirm)
+async def delete_category_apply(message):
+    if message.text.strip() != "✅ Так":
+        await finish(message, "Видалення категорії відмінено.", menus.categories_menu())
+        return
+    if not await async_data.delete_category((await step_data(message))["category_id"]):
+        await finish(message, "Категорію не можна видалити: у ній є транзакції.", menus.categories_menu())
+        return
+    await finish(message, "Категорію видалено.", menus.categories_menu())
+
+
+# --- 3. Звіти за період ---
+@async_bot.message_handler(state=ReportStates.period)
+async def report_period(message):
+    report = (await step_data(message))["report"]
+    try:
+        start_dt, end_dt = parse_range(message.text.strip())
+    except ValueError:
+        await finish(message, "Невірний формат.", menus.main_menu())
+        return
+    await async_bot.delete_state(message.from_user.id, message.chat.id)
+    await PERIOD_REPORTS[report](message, start_dt, end_dt)
+
+
+async def report_pie(message, start_dt, end_dt):
+    user_id = await async_data.get_user_id(message.from_user.id)
+    start, end = start_dt.date(), end_dt.date()
+    # Той самий період без нових транзакцій — готова картинка з кешу
+    png = await cached_chart(user_id, "pie", start, end, lambda: async_data.category_pies_spec(user_id, start, end))
+    await send_photo(message.chat.id, png)
+    await async_bot.send_message(message.chat.id, "Круговий звіт готовий.", reply_markup=menus.main_menu())
+
+
+async def report_line(message, start_dt, end_dt):
+    user_id = await async_data.get_user_id(message.from_user.id)
+    start, end = start_dt.date(), end_dt.date()
+    png = await cached_chart(
+        user_id, "line", start, end, lambda: async_data.income_expense_lines_spec(user_id, start, end)
+    )
+    await send_photo(message.chat.id, png)
+    await async_bot.send_message(message.chat.id, "Лінійний звіт готовий.", reply_markup=menus.main_menu())
+
+
+async def report_summary(message, start_dt, end_dt):
+    totals = await async_data.period_totals(message.from_user.id, start_dt.date(), end_dt.date())
+    if totals is None:
+        await async_bot.send_message(message.chat.id, "Спочатку виконайте /start.")
+        return
+    await send_photo(message.chat.id, await render(reports.summary_bar_spec(totals, start_dt.date(), end_dt.date())))
+    await async_bot.send_message(
+        message.chat.id, reports.summary_text(totals, start_dt.date(), end_dt.date()), reply_markup=menus.main_menu()
+    )
+
+
+async def report_tx(message, start_dt, end_dt):
+    page = await async_data.tx_page(message.from_user.id, start_dt, end_dt)
+    if not page or not page.rows:
+        await async_bot.send_message(message.chat.id, "Транзакцій немає.", reply_markup=menus.main_menu())
+        return
+    await async_bot.send_message(
+        message.chat.id, page.text(), reply_markup=tx_pages.page_markup(page, start_dt, end_dt)
+    )
+
+
+async def report_currency(message, start_dt, end_dt):
+    # Спільний графік курсів; провайдери курсів опитуються в робочому потоці
+    png, stale = await async_data.market_chart(start_dt.date(), end_dt.date())
+    await send_photo(message.chat.id, png)
+    done_text = "Звіт по валютам готовий."
+    if stale:
+        done_text += f"\n* {rate_lookup.STALE_NOTE}"
+    await async_bot.send_message(message.chat.id, done_text, reply_markup=menus.main_menu())
+
+
+PERIOD_REPORTS = {
+    "pie": report_pie,
+    "line": report_line,
+    "summary": report_summary,
+    "tx": report_tx,
+    "currency": report_currency,
+}
+REPORT_BUTTONS = {
+    "📊 Круговий по категоріям": "pie",
+    "📈 Лінійний по дням": "line",
+    "📑 Зведений": "summary",
+    "📝 Транзакції": "tx",
+    "📊 Звіт по валютам": "currency",
+}
+
+
+# --- Команди й кнопки меню ---
+@async_bot.message_handler(commands=["start"])
+async def start(message):
+    await async_data.register_user(
+        message.from_user.id,
+        message.from_user.username or message.from_user.full_name,
+        message.from_user.language_code
+    )
+    await async_bot.send_message(
+        message.chat.id, f"Привіт, {message.from_user.full_name}!\n{HELP_TEXT}", reply_markup=menus.main_menu()
+    )
+
+
+@async_bot.message_handler(func=lambda m: m.text in ("➕ Витрата", "➕ Дохід"))
+async def entry_start(message):
+    ttype = "expense" if message.text == "➕ Витрата" else "income"
+    await ask(
+        message, EntryStates.amount, f"Введіть суму {ENTRY_TEXTS[ttype][0]}:", menus.choice_menu(), type=ttype
+    )
+
+
+@async_bot.message_handler(func=lambda m: m.text == "📂 Категорії")
+async def categories_menu(message):
+    await async_bot.send_message(message.chat.id, "Меню категорій:", reply_markup=menus.categories_menu())
+
+
+@async_bot.message_handler(commands=["categories"])
+@async_bot.message_handler(func=lambda m: m.text == "📑 Всі категорії")
+async def show_categories(message):
+    categories = await async_data.get_categories(message.from_user.id)
+    if not categories:
+        text = "У вас ще немає категорій."
+    else:
+        lines = []
+        for cat in categories:
+            default_note = "Шаблон" if cat.is_default else "Персональна"
+            cat_type = "Витрати" if cat.type == "expense" else "Дохід"
+            lines.append(f"• {cat.name} [{cat_type}] ({default_note})")
+        text = "Ваші категорії:\n" + "\n".join(lines)
+    await async_bot.send_message(message.chat.id, text, reply_markup=menus.categories_menu())
+
+
+@async_bot.message_handler(func=lambda m: m.text == "➕ Додати категорію")
+async def add_category_start(message):
+    await ask(
+        message, CategoryStates.add_type, f"Оберіть тип категорії або '{BACK}' для виходу:",
+        menus.choice_menu(*TYPE_CHOICES)
+    )
+
+
+@async_bot.message_handler(func=lambda m: m.text in ("✏️ Редагувати категорію", "🗑️ Видалити категорію"))
+async def change_category_start(message):
+    editing = message.text == "✏️ Редагувати категорію"
+    categories = await async_data.get_categories(message.from_user.id)
+    if not categories:
+        text = "У вас немає категорій для редагування." if editing else "У вас немає кастомних категорій для видалення."
+        await async_bot.send_message(message.chat.id, text, reply_markup=menus.categories_menu())
+        return
+    await ask(
+        message, CategoryStates.edit_choice if editing else CategoryStates.delete_choice,
+        "Оберіть категорію для редагування:" if editing else "Оберіть категорію для видалення:",
+        menus.choice_menu(*(cat.name for cat in categories))
+    )
+
+
+@async_bot.message_handler(func=lambda m: m.text == "📆 Звіт за період")
+async def report_menu(message):
+    await async_bot.send_message(message.chat.id, "Оберіть тип звіту:", reply_markup=menus.report_menu())
+
+
+@async_bot.message_handler(func=lambda m: m.text in REPORT_BUTTONS)
+async def report_start(message):
+    await ask(
+        message, ReportStates.period, PERIOD_PROMPT, types.ForceReply(selective=True),
+        report=REPORT_BUTTONS[message.text]
+    )
+
+
+@async_bot.message_handler(func=lambda m: m.text == BACK)
+async def return_to_menu(message):
+    await async_bot.send_message(message.chat.id, "Головне меню:", reply_markup=menus.main_menu())
+
+
+@async_bot.message_handler(func=lambda m: quick_entry.looks_like_entry(m.text))
+async def quick_entry_message(message):
+    entries, errors = await async_data.add_quick_entries(message.from_user.id, message.text)
+    if entries is None:
+        await async_bot.send_message(message.chat.id, "Спочатку виконайте /start.")
+        return
+    if errors or not entries:
+        await async_bot.send_message(
+            message.chat.id,
+            "Не вдалося розібрати: " + "; ".join(errors) +
+            "\nФормат: сума категорія [опис]; … (\"+\" перед сумою — дохід)."
+        )
+        return
+    lines = [
+        f"{'Дохід' if e.type == 'income' else 'Витрата'} {money.format_amount(e.amount_minor)} → '{e.category_name}'"
+        for e in entries
+    ]
+    await async_bot.send_message(message.chat.id, "Додано:\n" + "\n".join(lines), reply_markup=menus.main_menu())
+
+
+@async_bot.message_handler(commands=["summary"])
+async def summary(message):
+    try:
+        start_dt, end_dt = parse_period(message.text)
+    except ValueError:
+        await async_bot.send_message(message.chat.id, "Формат: /summary YYYY-MM-DD:YYYY-MM-DD")
+        return
+    await report_summary(message, start_dt, end_dt)
+
+
+@async_bot.message_handler(commands=["tx"])
+async def transactions(message):
+    try:
+        start_dt, end_dt = parse_period(message.text)
+    except ValueError:
+        await async_bot.send_message(message.chat.id, "Формат: /tx YYYY-MM-DD:YYYY-MM-DD")
+        return
+    await report_tx(message, start_dt, end_dt)
+
+
+@async_bot.callback_query_handler(func=lambda c: c.data and c.data.startswith(tx_pages.CALLBACK_PREFIX + ":"))
+async def transactions_page(call):
+    try:
+        direction, start_dt, end_dt, key = tx_pages.decode_callback(call.data)
+    except ValueError:
+        await async_bot.answer_callback_query(call.id)
+        return
+    if direction == "n":
+        page = await async_data.tx_page(call.from_user.id, start_dt, end_dt, after=key)
+    else:
+        page = await async_data.tx_page(call.from_user.id, start_dt, end_dt, before=key)
+    await async_bot.answer_callback_query(call.id)
+    if not page or not page.rows:
+        return
+    await async_bot.edit_message_text(
+        page.text(), call.message.chat.id, call.message.message_id,
+        reply_markup=tx_pages.page_markup(page, start_dt, end_dt)
+    )
+
+
+# --- 4. Місячний звіт ---
+@async_bot.message_handler(commands=["month"])
+@async_bot.message_handler(func=lambda m: m.text == "📅 Щомісячний звіт")
+async def month(message):
+    """
+    Звіт за попередній місяць, як handlers/monthly_report_handler.py.
+    """
+    chat_id = message.chat.id
+    user_id = await async_data.get_user_id(message.from_user.id)
+    if user_id is None:
+        await async_bot.send_message(chat_id, "Спочатку виконайте /start.")
+        return
+    start, end = monthly_report.previous_month(datetime.date.today())
+    prev_metric = await async_data.month_metric(message.from_user.id, start - datetime.timedelta(days=1))
+
+    # Ключі кешу графіків беремо до читання даних (версія даних користувача)
+    chart_keys = [chart_cache.chart_key(user_id, chart, start, end) for chart in monthly_report.USER_CHARTS]
+    deadline = rate_lookup.new_deadline()
+    data = await async_data.month_totals(user_id, start, end)
+    data.update(await async_data.month_rates(start, end, deadline))
+
+    images = await asyncio.to_thread(
+        chart_cache.get_or_render_many, chart_keys, monthly_report.user_chart_specs(data, start, end),
+        renderer.render_many
+    )
+    market_png, _ = await async_data.market_chart(start, end, deadline)
+    for png in images + [market_png]:
+        await send_photo(chat_id, png)
+
+    comparison_text = monthly_report.build_comparison_text(prev_metric, data, start)
+    await async_bot.send_message(
+        chat_id, monthly_report.format_text_report(data, comparison_text, start, end), reply_markup=menus.main_menu()
+    )
+    await async_data.save_month_rates(user_id, start.strftime("%Y-%m"), data)
+
+
+@async_bot.message_handler(func=lambda m: True, content_types=["text"])
+async def fallback(message):
+    await async_bot.send_message(message.chat.id, HELP_TEXT, reply_markup=menus.main_menu())
+
+
+if __name__ == "__main__":
+    init_db(DATABASE_URL)
+    start_scheduler()
+    print("Starting async bot…")
+    asyncio.run(async_bot.infinity_polling())
@@ -1,23 +1,14 @@
 #handlers\category_handler.py
-from bot_app import bot
+from bot.bot_app import bot
 from telebot import types
-from models import SessionLocal
-from models.category import Category
-from models.user import User
-from handlers.start_handler import get_main_menu
+from bot.models import SessionLocal
+from bot.handlers.start_handler import get_main_menu
+from bot.utils import categories as category_changes, category_cache, menus, user_cache
 
 
 # Menu of category operations
 def get_categories_menu():
-    markup = types.ReplyKeyboardMarkup(row_width=1, resize_keyboard=True)
-    markup.add(
-        types.KeyboardButton("📑 Всі категорії"),
-        types.KeyboardButton("➕ Додати категорію"),
-        types.KeyboardButton("✏️ Редагувати категорію"),
-        types.KeyboardButton("🗑️ Видалити категорію"),
-        types.KeyboardButton("🔙 Назад")
-    )
-    return markup
+    return menus.categories_menu()
 
 
 # Main categories menu
@@ -37,8 +28,8 @@ def categories_menu(message):
 @bot.message_handler(func=lambda m: m.text == "📑 Всі категорії")
 def show_categories(message):
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    categories = session.query(Category).filter(Category.user_id == user.id).all()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    categories = category_cache.get_categories(session, user_id)
     session.close()
     if not categories:
         text = "У вас ще немає категорій."
@@ -97,10 +88,8 @@ def add_category_name(message, ctype):
         bot.send_message(message.chat.id, "Додавання категорії скасовано.", reply_markup=get_categories_menu())
         return
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    category = Category(name=name, type=ctype, is_default=False, user_id=user.id)
-    session.add(category)
-    session.commit()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    category_changes.add(session, user_id, name, ctype)
     session.close()
     bot.send_message(message.chat.id, f"Категорію '{name}' додано ({ctype}).", reply_markup=get_categories_menu())
 
@@ -109,8 +98,8 @@ def add_category_name(message, ctype):
 @bot.message_handler(func=lambda m: m.text == "✏️ Редагувати категорію")
 def edit_category_start(message):
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    categories = session.query(Category).filter(Category.user_id == user.id).all()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    categories = category_cache.get_categories(session, user_id)
     session.close()
     if not categories:
         bot.send_message(message.chat.id, "У вас немає категорій для редагування.", reply_markup=get_categories_menu())
@@ -130,8 +119,8 @@ def edit_category_choice(message):
         bot.send_message(message.chat.id, "Редагування категорії скасовано.", reply_markup=get_categories_menu())
         return
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    category = session.query(Category).filter(Category.user_id == user.id, Category.name == name_old).first()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    category = category_cache.resolve(session, user_id, name_old)
     session.close()
     if not category:
         bot.send_message(message.chat.id, f"Категорія '{name_old}' не знайдена.", reply_markup=get_categories_menu())
@@ -171,10 +160,8 @@ def edit_category_apply_name(message, category_id):
         bot.send_message(message.chat.id, "Редагування категорії скасовано.", reply_markup=get_categories_menu())
         return
     session = SessionLocal()
-    category = session.get(Category, category_id)
-    category.name = new_name
-    category.is_default = 0
-    session.commit()
+    # Назва й тип категорії видно на графіках: закешовані стають застарілими
+    category_changes.rename(session, category_id, new_name)
     session.close()
     bot.send_message(message.chat.id, f"Категорію перейменовано на '{new_name}'.", reply_markup=get_categories_menu())
 
@@ -190,10 +177,7 @@ def edit_category_apply_type(message, category_id):
         return
     ctype = "expense" if choice == "Витрата" else "income"
     session = SessionLocal()
-    category = session.get(Category, category_id)
-    category.type = ctype
-    category.is_default = 0
-    session.commit()
+    category_changes.retype(session, category_id, ctype)
     session.close()
     bot.send_message(message.chat.id, f"Тип категорії змінено на '{choice}'.", reply_markup=get_categories_menu())
 
@@ -202,8 +186,8 @@ def edit_category_apply_type(message, category_id):
 @bot.message_handler(func=lambda m: m.text == "🗑️ Видалити категорію")
 def delete_category_start(message):
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    categories = session.query(Category).filter(Category.user_id == user.id).all()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    categories = category_cache.get_categories(session, user_id)
     session.close()
     if not categories:
         bot.send_message(
@@ -233,11 +217,8 @@ def delete_category_confirm(message):
         )
         return
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    category = session.query(Category).filter(
-        Category.user_id == user.id,
-        Category.name == name
-    ).first()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    category = category_cache.resolve(session, user_id, name)
     session.close()
     if not category:
         bot.send_message(
@@ -258,10 +239,14 @@ def delete_category_apply(message, category_id):
     choice = message.text.strip()
     if choice == "✅ Так":
         session = SessionLocal()
-        category = session.get(Category, category_id)
-        session.delete(category)
-        session.commit()
+        deleted = category_changes.delete(session, category_id)
         session.close()
+        if not deleted:
+            bot.send_message(
+                message.chat.id,
+                "Категорію не можна видалити: у ній є транзакції.", reply_markup=get_categories_menu()
+            )
+            return
         bot.send_message(
             message.chat.id,
             "Категорію видалено.", reply_markup=get_categories_menu()
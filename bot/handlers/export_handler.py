@@ -0,0 +1,58 @@
+# handlers/export_handler.py
+import datetime
+
+from telebot import types
+
+from bot.bot_app import bot
+from bot.models import SessionLocal
+from bot.handlers.start_handler import get_main_menu
+from bot.utils import export, user_cache
+
+
+@bot.message_handler(commands=["export"])
+def export_start(message):
+    formats = "csv або parquet" if export.parquet_available() else "csv"
+    msg = bot.send_message(
+        message.chat.id,
+        f"Введіть період і формат ({formats}) у вигляді YYYY-MM-DD:YYYY-MM-DD csv",
+        reply_markup=types.ForceReply(selective=True)
+    )
+    bot.register_next_step_handler(msg, export_period)
+
+
+def export_period(message):
+    parts = (message.text or "").split()
+    try:
+        s, e = [p.strip() for p in parts[0].split(":", 1)]
+        st = datetime.datetime.fromisoformat(s)
+        et = datetime.datetime.combine(datetime.date.fromisoformat(e), datetime.time.max)
+        fmt = parts[1].lower() if len(parts) > 1 else "csv"
+        if fmt not in export.FORMATS:
+            raise ValueError(fmt)
+    except (ValueError, IndexError):
+        bot.send_message(message.chat.id, "Невірний формат.", reply_markup=get_main_menu())
+        return
+    if fmt == "parquet" and not export.parquet_available():
+        bot.send_message(message.chat.id, "Експорт у Parquet недоступний на цьому сервері.",
+                         reply_markup=get_main_menu())
+        return
+
+    session = SessionLocal()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    if user_id is None:
+        session.close()
+        bot.send_message(message.chat.id, "Спочатку виконайте /start.", reply_markup=get_main_menu())
+        return
+    # Файл збирається потоком у тимчасовому spooled-файлі
+    spool, name, count = export.build_export(session, user_id, st, et, fmt)
+    session.close()
+    try:
+        if not count:
+            bot.send_message(message.chat.id, "Транзакцій немає.", reply_markup=get_main_menu())
+            return
+        bot.send_document(
+            message.chat.id, spool, visible_file_name=name,
+            caption=f"Транзакцій: {count}", reply_markup=get_main_menu()
+        )
+    finally:
+        spool.close()
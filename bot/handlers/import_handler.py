@@ -0,0 +1,88 @@
+# handlers/import_handler.py
+import csv
+import io
+import tempfile
+
+import requests
+from telebot import apihelper, types
+
+from bot.bot_app import bot
+from bot.models import SessionLocal
+from bot.handlers.start_handler import get_main_menu
+from bot.utils import csv_import, user_cache
+
+TELEGRAM_FILE_URL = "https://api.telegram.org/file/bot{0}/{1}"
+DOWNLOAD_TIMEOUT = 30
+DOWNLOAD_CHUNK = 64 * 1024
+
+
+def download_document(file_id: str):
+    """
+    Завантажує документ з Telegram у тимчасовий файл і відкриває його як текстовий потік.
+    Імпорт читає вже локальний файл, тож транзакція БД (а на SQLite — блокування запису)
+    не тримається, поки файл іде мережею. Потік треба закрити (файл видаляється).
+    """
+    file_info = bot.get_file(file_id)
+    url = (apihelper.FILE_URL or TELEGRAM_FILE_URL).format(bot.token, file_info.file_path)
+    buffer = tempfile.TemporaryFile()
+    try:
+        with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(DOWNLOAD_CHUNK):
+                buffer.write(chunk)
+    except Exception:
+        buffer.close()
+        raise
+    buffer.seek(0)
+    return io.TextIOWrapper(buffer, encoding="utf-8-sig", newline="")
+
+
+@bot.message_handler(commands=["import"])
+def import_start(message):
+    msg = bot.send_message(
+        message.chat.id,
+        "Надішліть CSV-файл з колонками date, amount, category (type і note — опційно).\n"
+        "Дата: YYYY-MM-DD або DD.MM.YYYY. Без колонки type від'ємна сума — витрата.",
+        reply_markup=types.ForceReply(selective=True)
+    )
+    bot.register_next_step_handler(msg, import_document)
+
+
+def import_document(message):
+    if message.content_type != "document":
+        bot.send_message(message.chat.id, "Імпорт скасовано: очікувався CSV-файл.", reply_markup=get_main_menu())
+        return
+
+    session = SessionLocal()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    if user_id is None:
+        session.close()
+        bot.send_message(message.chat.id, "Спочатку виконайте /start.", reply_markup=get_main_menu())
+        return
+
+    bot.send_message(message.chat.id, "Імпортую…")
+    stream = None
+    try:
+        stream = download_document(message.document.file_id)
+        result = csv_import.import_csv(session, user_id, stream)
+    except (requests.RequestException, UnicodeDecodeError) as e:
+        session.rollback()
+        bot.send_message(message.chat.id, f"Не вдалося прочитати файл: {e}", reply_markup=get_main_menu())
+        return
+    except (ValueError, csv.Error) as e:
+        # csv.Error (напр. задовге поле) кидає сам reader, поза перевіркою окремих рядків
+        session.rollback()
+        bot.send_message(message.chat.id, f"Невірний формат файлу: {e}", reply_markup=get_main_menu())
+        return
+    finally:
+        if stream is not None:
+            stream.close()
+        session.close()
+
+    text = f"Імпортовано транзакцій: {result.imported}."
+    if result.created_categories:
+        text += f"\nНові категорії: {', '.join(result.created_categories)}."
+    if result.skipped:
+        lines = ", ".join(str(n) for n in result.error_lines)
+        text += f"\nПропущено рядків з помилками: {result.skipped} (рядки {lines})."
+    bot.send_message(message.chat.id, text, reply_markup=get_main_menu())
@@ -1,34 +1,20 @@
 # handlers/report_handler.py
-import matplotlib
-
-matplotlib.use('Agg')  # Use non-GUI backend for image generation
-import matplotlib.pyplot as plt
-from io import BytesIO
 import datetime
-import requests
 
-from bot_app import bot
+from bot.bot_app import bot
 from telebot import types
-from models import SessionLocal
-from models.transaction import Transaction
-from models.category import Category
-from models.user import User
-from handlers.start_handler import get_main_menu
+from bot.models import SessionLocal
+from bot.handlers.start_handler import get_main_menu
+from bot.utils import (
+    chart_cache, file_ids, market_charts, menus, rate_lookup, reports, rollups, tx_pages, user_cache
+)
+from bot.utils.render_service import renderer
 
 
 # --- Menu вибору типу звіту ---
 @bot.message_handler(func=lambda m: m.text == "📆 Звіт за період")
 def report_menu(message):
-    markup = types.ReplyKeyboardMarkup(row_width=2, resize_keyboard=True)
-    markup.add(
-        types.KeyboardButton("📊 Круговий по категоріям"),
-        types.KeyboardButton("📈 Лінійний по дням"),
-        types.KeyboardButton("📑 Зведений"),
-        types.KeyboardButton("📝 Транзакції"),
-        types.KeyboardButton("📊 Звіт по валютам"),
-        types.KeyboardButton("🔙 Назад")
-    )
-    bot.send_message(message.chat.id, "Оберіть тип звіту:", reply_markup=markup)
+    bot.send_message(message.chat.id, "Оберіть тип звіту:", reply_markup=menus.report_menu())
 
 
 # --- 1. Кругова діаграма по категоріям ---
@@ -54,49 +40,17 @@ def report_pie(message):
         return
 
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    # Витрати по категоріям
-    exp_txs = session.query(Transaction).filter(
-        Transaction.date >= start_dt,
-        Transaction.date <= end_dt,
-        Transaction.type == 'expense',
-        Transaction.user_id == user.id
-    ).all()
-    exp_data = {}
-    for t in exp_txs:
-        cat = session.query(Category).get(t.category_id)
-        exp_data[cat.name] = exp_data.get(cat.name, 0) + t.amount
-    # Доходи по категоріям
-    inc_txs = session.query(Transaction).filter(
-        Transaction.date >= start_dt,
-        Transaction.date <= end_dt,
-        Transaction.type == 'income',
-        Transaction.user_id == user.id
-    ).all()
-    inc_data = {}
-    for t in inc_txs:
-        cat = session.query(Category).get(t.category_id)
-        inc_data[cat.name] = inc_data.get(cat.name, 0) + t.amount
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+
+    # Витрати та доходи по категоріям з денних підсумків; той самий період
+    # без нових транзакцій — готова картинка з кешу
+    png = chart_cache.get_or_render(
+        user_id, "pie", start_dt.date(), end_dt.date(),
+        lambda: reports.category_pies_spec(session, user_id, start_dt.date(), end_dt.date()), renderer.render
+    )
     session.close()
 
-    # Графік з двома круговими діаграмами
-    labels_exp = list(exp_data.keys()) or ['Немає']
-    sizes_exp = list(exp_data.values()) or [1]
-    labels_inc = list(inc_data.keys()) or ['Немає']
-    sizes_inc = list(inc_data.values()) or [1]
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(8, 4))
-    ax1.pie(sizes_exp, labels=labels_exp, autopct='%1.1f%%')
-    ax1.set_title('Витрати')
-    ax2.pie(sizes_inc, labels=labels_inc, autopct='%1.1f%%')
-    ax2.set_title('Доходи')
-    fig.suptitle(f"Категорії: {start_dt.date()}–{end_dt.date()}")
-    buf = BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0);
-    plt.close(fig)
-
-    bot.send_photo(message.chat.id, buf)
-    buf.close()
+    file_ids.send_photo(bot, message.chat.id, png)
     bot.send_message(message.chat.id, "Круговий звіт готовий.", reply_markup=get_main_menu())
 
 
@@ -121,39 +75,16 @@ def report_line(message):
         bot.send_message(message.chat.id, "Невірний формат. Повторіть:", reply_markup=get_main_menu())
         return
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    txs = session.query(Transaction).filter(
-        Transaction.date >= start_dt,
-        Transaction.date <= end_dt,
-        Transaction.user_id == user.id
-    ).all()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+
+    # Суми по днях і типах з денних підсумків
+    png = chart_cache.get_or_render(
+        user_id, "line", start_dt.date(), end_dt.date(),
+        lambda: reports.income_expense_lines_spec(session, user_id, start_dt.date(), end_dt.date()), renderer.render
+    )
     session.close()
 
-    days = {}
-    cur = start_dt.date()
-    while cur <= end_dt.date():
-        days[cur] = {'income': 0, 'expense': 0}
-        cur += datetime.timedelta(days=1)
-    for t in txs:
-        d = t.date.date()
-        days[d][t.type] += t.amount
-    dates = sorted(days.keys())
-    income_vals = [days[d]['income'] for d in dates]
-    expense_vals = [days[d]['expense'] for d in dates]
-
-    fig, ax = plt.subplots()
-    ax.plot(dates, income_vals, label='Доходи')
-    ax.plot(dates, expense_vals, label='Витрати')
-    ax.legend()
-    ax.set_title(f"Дохід/Витрати: {start_dt.date()}–{end_dt.date()}")
-    fig.autofmt_xdate()
-    buf = BytesIO();
-    fig.savefig(buf, format='png');
-    buf.seek(0);
-    plt.close(fig)
-
-    bot.send_photo(message.chat.id, buf)
-    buf.close()
+    file_ids.send_photo(bot, message.chat.id, png)
     bot.send_message(message.chat.id, "Лінійний звіт готовий.", reply_markup=get_main_menu())
 
 
@@ -178,37 +109,17 @@ def report_summary(message):
         bot.send_message(message.chat.id, "Невірний формат.", reply_markup=get_main_menu())
         return
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    txs = session.query(Transaction).filter(
-        Transaction.date >= sd,
-        Transaction.date <= ed,
-        Transaction.user_id == user.id
-    ).all()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    totals = rollups.type_totals(session, user_id, sd.date(), ed.date())
     session.close()
-    inc = sum(t.amount for t in txs if t.type == 'income')
-    exp = sum(t.amount for t in txs if t.type == 'expense')
-    bal = inc - exp
 
     # Діаграма барів
-    fig, ax = plt.subplots()
-    ax.bar(['Доходи', 'Витрати'], [inc, exp])
-    ax.set_title(f"Зведений звіт: {sd.date()}–{ed.date()}")
-    buf = BytesIO();
-    fig.savefig(buf, format='png');
-    buf.seek(0);
-    plt.close(fig)
+    png = renderer.render(reports.summary_bar_spec(totals, sd.date(), ed.date()))
 
-    bot.send_photo(message.chat.id, buf)
-    buf.close()
+    file_ids.send_photo(bot, message.chat.id, png)
 
     # Текстовий підсумок
-    text = (
-        f"Звіт з {sd.date()} по {ed.date()}:\n"
-        f"• Доходи:  {inc}\n"
-        f"• Витрати: {exp}\n"
-        f"• Баланс:  {bal}"
-    )
-    bot.send_message(message.chat.id, text, reply_markup=get_main_menu())
+    bot.send_message(message.chat.id, reports.summary_text(totals, sd.date(), ed.date()), reply_markup=get_main_menu())
 
 
 # --- 4. Текстовий звіт по транзакціям ---
@@ -232,25 +143,41 @@ def report_tx(message):
         bot.send_message(message.chat.id, "Невірний формат.", reply_markup=get_main_menu())
         return
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    txs = session.query(Transaction).filter(
-        Transaction.date >= st,
-        Transaction.date <= et,
-        Transaction.user_id == user.id
-    ).order_by(Transaction.date).all()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    # Перша сторінка: рядки читаються потоком, лише скільки вміщається в повідомлення
+    page = tx_pages.fetch_page(session, user_id, st, et)
     session.close()
-    if not txs:
+    if not page.rows:
         bot.send_message(message.chat.id, "Транзакцій немає.", reply_markup=get_main_menu())
         return
-    report_text = ""
-    last = None
-    for t in txs:
-        d = t.date.date()
-        if d != last:
-            report_text += f"\n📅 {d}:\n"
-            last = d
-        report_text += f" – [{t.type}] {t.amount} ({t.note or 'без опису'})\n"
-    bot.send_message(message.chat.id, report_text, reply_markup=get_main_menu())
+    if not page.has_next:
+        bot.send_message(message.chat.id, page.text(), reply_markup=get_main_menu())
+        return
+    bot.send_message(message.chat.id, page.text(), reply_markup=tx_pages.page_markup(page, st, et))
+    bot.send_message(message.chat.id, "Гортайте сторінки кнопками під списком.", reply_markup=get_main_menu())
+
+
+@bot.callback_query_handler(func=lambda c: c.data and c.data.startswith(tx_pages.CALLBACK_PREFIX + ":"))
+def report_tx_page(call):
+    try:
+        direction, st, et, key = tx_pages.decode_callback(call.data)
+    except ValueError:
+        bot.answer_callback_query(call.id)
+        return
+    session = SessionLocal()
+    user_id = user_cache.get_user_id(session, call.from_user.id)
+    if direction == "n":
+        page = tx_pages.fetch_page(session, user_id, st, et, after=key)
+    else:
+        page = tx_pages.fetch_page(session, user_id, st, et, before=key)
+    session.close()
+    bot.answer_callback_query(call.id)
+    if not page.rows:
+        return
+    bot.edit_message_text(
+        page.text(), call.message.chat.id, call.message.message_id,
+        reply_markup=tx_pages.page_markup(page, st, et)
+    )
 
 @bot.message_handler(func=lambda m: m.text == "📊 Звіт по валютам")
 def currency_period_start(message):
@@ -280,107 +207,16 @@ def currency_period_generate(message):
         )
         return
 
-
-    def fetch_timeseries_nbu(c_char_code: str, start: datetime.date, end: datetime.date) -> list:
-        """
-        Повертає список (date_obj, rate) для c_char_code (\"USD\" або \"EUR\") за весь місяць
-        Використовуємо NBU API: https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange?date=YYYYMMDD&json
-        """
-        result = []
-        cur = start
-        while cur <= end:
-            date_str = cur.strftime("%Y%m%d")
-            url = f"https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange?date={date_str}&json"
-            try:
-                resp = requests.get(url, timeout=5)
-                rates_list = resp.json()  # список словників
-                for item in rates_list:
-                    if item.get("cc") == c_char_code:
-                        d_obj = cur
-                        rate = float(item.get("rate", 0.0))
-                        result.append((d_obj, rate))
-                        break
-            except:
-                pass
-            cur += datetime.timedelta(days=1)
-        return result
-
-    # --- 8.2. Функція для BTC/ETH→USD через CoinGecko ---
-    def fetch_timeseries_crypto(symbol_id: str, vs_currency: str, start: datetime.date, end: datetime.date) -> list:
-        """
-        Повертає список (date_obj, price) для криптовалюти symbol_id за період.
-        Використовуємо CoinGecko: останні N днів, потім филтруємо по датах.
-        """
-        url = f"https://api.coingecko.com/api/v3/coins/{symbol_id}/market_chart"
-        params = {
-            "vs_currency": vs_currency,
-            "days":        (end - start).days + 1
-        }
-        try:
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json().get("prices", [])  # [[timestamp_ms, price], …]
-            result = []
-            for timestamp_ms, price in data:
-                d_obj = datetime.datetime.utcfromtimestamp(timestamp_ms / 1000.0).date()
-                if start <= d_obj <= end:
-                    result.append((d_obj, price))
-            return sorted(result)
-        except:
-            return []
-
-
-
-    # Збираємо дані курсів за вказаний період (через API НБУ для USD, EUR,
-    # CoinGecko для BTC, ETH). Побудова графіка – аналогічно місячному звіту.
-    usd_series = fetch_timeseries_nbu("USD", start_dt, end_dt)
-    eur_series = fetch_timeseries_nbu("EUR", start_dt, end_dt)
-    btc_series = fetch_timeseries_crypto("bitcoin", "USD", start_dt, end_dt)
-    eth_series = fetch_timeseries_crypto("ethereum", "USD", start_dt, end_dt)
-
-    # Малюємо два підграфіки: фіат (USD→UAH, EUR→UAH) та крипто (BTC→USD, ETH→USD)
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(8, 6), sharex=False)
-
-    # Фіат:
-    if usd_series:
-        dates_usd, vals_usd = zip(*usd_series)
-        ax1.plot(dates_usd, vals_usd, label="USD/UAH", color="blue")
-    if eur_series:
-        dates_eur, vals_eur = zip(*eur_series)
-        ax1.plot(dates_eur, vals_eur, label="EUR/UAH", color="orange")
-    ax1.set_title(f"Курси USD та EUR → UAH ({start_dt} – {end_dt})")
-    ax1.set_ylabel("Курс (UAH)")
-    if usd_series or eur_series:
-        ax1.legend()
-    ax1.grid(True)
-
-    # Крипто:
-    if btc_series:
-        dates_btc, vals_btc = zip(*btc_series)
-        ax2.plot(dates_btc, vals_btc, label="BTC/USD", color="black")
-    if eth_series:
-        dates_eth, vals_eth = zip(*eth_series)
-        ax2_sec = ax2.twinx()
-        ax2_sec.plot(dates_eth, vals_eth, label="ETH/USD", color="gray", linestyle="--")
-        ax2_sec.set_ylabel("ETH/USD", color="gray")
-        ax2_sec.tick_params(axis="y", labelcolor="gray")
-
-    ax2.set_title(f"Курси BTC та ETH → USD ({start_dt} – {end_dt})")
-    ax2.set_xlabel("Дата")
-    ax2.set_ylabel("BTC/USD", color="black")
-    ax2.tick_params(axis="y", labelcolor="black")
-    if btc_series:
-        ax2.legend(loc="upper left")
-    ax2.grid(True)
-
-    fig.autofmt_xdate()
-    fig.tight_layout()
-
-    buf = BytesIO()
-    fig.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close(fig)
+    # Графік курсів (НБУ для USD, EUR, CoinGecko для BTC, ETH) не залежить від
+    # користувача: готовий графік періоду читається зі спільного сховища, а
+    # малюється лише перший раз (пропуски курсів довантажуються в межах ліміту часу).
+    session = SessionLocal()
+    png, stale = market_charts.get_chart(session, start_dt, end_dt)
+    session.close()
 
     # Відправляємо графік у чат
-    bot.send_photo(message.chat.id, buf)
-    bot.send_message(message.chat.id, "Звіт по валютам готовий.", reply_markup=get_main_menu())
-    buf.close()
\ No newline at end of file
+    file_ids.send_photo(bot, message.chat.id, png)
+    done_text = "Звіт по валютам готовий."
+    if stale:
+        done_text += f"\n* {rate_lookup.STALE_NOTE}"
+    bot.send_message(message.chat.id, done_text, reply_markup=get_main_menu())
@@ -2,21 +2,18 @@
 from bot.bot_app import bot
 from telebot import types
 from bot.models import SessionLocal
-from bot.models.transaction import Transaction
-from bot.models.category import Category
-from bot.models.user import User
 from bot.handlers.start_handler import get_main_menu
-import datetime
+from bot.utils import category_cache, ledger, money, quick_entry, user_cache
 
 
 # Utility to fetch categories by type
 def fetch_categories(telegram_id, ctype):
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == telegram_id).first()
-    if not user:
+    user_id = user_cache.get_user_id(session, telegram_id)
+    if user_id is None:
         session.close()
         return []
-    cats = session.query(Category).filter(Category.user_id == user.id, Category.type == ctype).all()
+    cats = category_cache.get_categories(session, user_id, ctype)
     session.close()
     return cats
 
@@ -43,7 +40,7 @@ def expense_amount(message):
         bot.send_message(message.chat.id, "Додавання витрати скасовано.", reply_markup=get_main_menu())
         return
     try:
-        amount = float(text)
+        amount = money.parse_amount(text)
     except ValueError:
         bot.send_message(message.chat.id, "Невірна сума. Спробуйте ще раз.", reply_markup=get_main_menu())
         return
@@ -63,9 +60,8 @@ def expense_category(message, amount):
         bot.send_message(message.chat.id, "Додавання витрати скасовано.", reply_markup=get_main_menu())
         return
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    category = session.query(Category).filter(Category.user_id == user.id, Category.name == name,
-                                              Category.type == 'expense').first()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    category = category_cache.resolve(session, user_id, name, 'expense')
     session.close()
     if not category:
         bot.send_message(message.chat.id, "Категорія не знайдена.", reply_markup=get_main_menu())
@@ -89,19 +85,12 @@ def expense_note(message, amount, category_id, category_name):
     if note == "Пропустити":
         note = ""
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    transaction = Transaction(
-        amount=amount,
-        date=datetime.datetime.utcnow(),
-        type='expense',
-        note=note,
-        user_id=user.id,
-        category_id=category_id
-    )
-    session.add(transaction)
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    # Денні підсумки та метрика місяця оновлюються в тому ж commit
+    ledger.add_transaction(session, user_id, category_id, 'expense', amount, note)
     session.commit()
     session.close()
-    bot.send_message(message.chat.id, f"Витрату {amount} додано до '{category_name}'.", reply_markup=get_main_menu())
+    bot.send_message(message.chat.id, f"Витрату {money.format_amount(amount)} додано до '{category_name}'.", reply_markup=get_main_menu())
 
 
 def income_amount(message):
@@ -110,7 +99,7 @@ def income_amount(message):
         bot.send_message(message.chat.id, "Додавання доходу скасовано.", reply_markup=get_main_menu())
         return
     try:
-        amount = float(text)
+        amount = money.parse_amount(text)
     except ValueError:
         bot.send_message(message.chat.id, "Невірна сума. Спробуйте ще раз.", reply_markup=get_main_menu())
         return
@@ -130,9 +119,8 @@ def income_category(message, amount):
         bot.send_message(message.chat.id, "Додавання доходу скасовано.", reply_markup=get_main_menu())
         return
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    category = session.query(Category).filter(Category.user_id == user.id, Category.name == name,
-                                              Category.type == 'income').first()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    category = category_cache.resolve(session, user_id, name, 'income')
     session.close()
     if not category:
         bot.send_message(message.chat.id, "Категорія не знайдена.", reply_markup=get_main_menu())
@@ -155,16 +143,40 @@ def income_note(message, amount, category_id, category_name):
     if note == "Пропустити":
         note = ""
     session = SessionLocal()
-    user = session.query(User).filter(User.telegram_id == message.from_user.id).first()
-    transaction = Transaction(
-        amount=amount,
-        date=datetime.datetime.utcnow(),
-        type='income',
-        note=note,
-        user_id=user.id,
-        category_id=category_id
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    # Денні підсумки та метрика місяця оновлюються в тому ж commit
+    ledger.add_transaction(session, user_id, category_id, 'income', amount, note)
+    session.commit()
+    session.close()
+    bot.send_message(message.chat.id, f"Дохід {money.format_amount(amount)} додано до '{category_name}'.", reply_markup=get_main_menu())
+
+
+# Швидке введення: "150 Їжа кава; 40 Транспорт; +20000 Зарплата"
+@bot.message_handler(func=lambda m: quick_entry.looks_like_entry(m.text))
+def quick_entry_message(message):
+    session = SessionLocal()
+    user_id = user_cache.get_user_id(session, message.from_user.id)
+    if user_id is None:
+        session.close()
+        bot.send_message(message.chat.id, "Спочатку виконайте /start.", reply_markup=get_main_menu())
+        return
+    entries, errors = quick_entry.parse(message.text, category_cache.load(session, user_id))
+    if errors or not entries:
+        session.close()
+        bot.send_message(
+            message.chat.id,
+            "Не вдалося розібрати: " + "; ".join(errors) +
+            "\nФормат: сума категорія [опис]; … (\"+\" перед сумою — дохід).",
+            reply_markup=get_main_menu()
+        )
+        return
+    ledger.add_transactions(
+        session, user_id, [(e.type, e.amount_minor, e.category_id, e.note) for e in entries]
     )
-    session.add(transaction)
     session.commit()
     session.close()
-    bot.send_message(message.chat.id, f"Дохід {amount} додано до '{category_name}'.", reply_markup=get_main_menu())
+    lines = [
+        f"{'Дохід' if e.type == 'income' else 'Витрата'} {money.format_amount(e.amount_minor)} → '{e.category_name}'"
+        for e in entries
+    ]
+    bot.send_message(message.chat.id, "Додано:\n" + "\n".join(lines), reply_markup=get_main_menu())
@@ -1,41 +1,49 @@
 # main.py
-from bot_app import bot
-from utils.config import DATABASE_URL
-from models import init_db, SessionLocal
-from models.user import User
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-
-# Initialize database
-engine = init_db(DATABASE_URL)
-
-# Import handler modules (they register via decorators)
-import handlers.start_handler
-import handlers.category_handler
-import handlers.transaction_handler
-import handlers.report_handler
-import handlers.monthly_report_handler
-import handlers.fallback_handler
-
-
-def send_daily_reminder():
-    session = SessionLocal()
-    users = session.query(User).all()
-    session.close()
-    for u in users:
-        bot.send_message(
-            u.telegram_id,
-            "Не забудьте внести сьогоднішні витрати!"
-        )
+#
+# Everything runs under main(): chart render workers are started with "spawn",
+# which re-imports this module as __mp_main__ in every worker process, and a
+# worker must not migrate the database, register handlers or start jobs.
 
 
-if __name__ == "__main__":
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(
-        send_daily_reminder,
-        CronTrigger(hour=20, minute=0)
+def main():
+    from bot.bot_app import bot
+    from bot.utils import config
+    from bot.utils.config import DATABASE_URL
+    from bot.models import init_db
+    from bot.scheduler import start_scheduler
+
+    # Initialize database
+    init_db(DATABASE_URL)
+
+    # Import handler modules (they register via decorators).
+    # "from bot.handlers import ..." keeps the name `bot` bound to the TeleBot instance.
+    from bot.handlers import (
+        start_handler,
+        category_handler,
+        transaction_handler,
+        report_handler,
+        monthly_report_handler,
+        import_handler,
+        export_handler,
+        fallback_handler,
     )
-    scheduler.start()
 
-    print("Starting bot…")
-    bot.polling(none_stop=True)
+    start_scheduler()
+
+    if config.WEBHOOK_URL:
+        from bot import webhook
+
+        print(f"Starting bot (webhook on {config.WEBHOOK_LISTEN}:{config.WEBHOOK_PORT}{config.WEBHOOK_PATH})…")
+        webhook.run(
+            bot, config.WEBHOOK_URL, config.WEBHOOK_LISTEN, config.WEBHOOK_PORT, config.WEBHOOK_PATH,
+            config.WEBHOOK_SECRET, config.WEBHOOK_WORKERS, config.WEBHOOK_QUEUE_SIZE
+        )
+    else:
+        # Development: long polling
+        bot.remove_webhook()
+        print("Starting bot…")
+        bot.polling(none_stop=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,18 @@
 # models\__init__.py
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
-from bot.utils.config import DATABASE_URL
+from bot.utils.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+)
 
 # Base class for all ORM models
 Base = declarative_base()
@@ -12,18 +22,140 @@ from .user import User
 from .category import Category
 from .transaction import Transaction
 from .monthly_metric import MonthlyMetric
+from .fx_rate import FxRate
+from .crypto_price import CryptoPrice
+from .daily_rollup import DailyRollup
+from .archived_month import ArchivedMonth
+from .telegram_file import TelegramFile
+from .market_chart import MarketChart
 
 
-def init_db(database_url: str):
+def _is_sqlite(database_url: str) -> bool:
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+
+def engine_options(database_url: str) -> dict:
+    """
+    create_engine() keyword arguments for the given database.
     """
-    Initialize the database connection and create tables for all registered ORM models.
+    if _is_sqlite(database_url):
+        # Handlers run on telebot's worker threads, so connections cross threads
+        return {"connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets report reads run while a transaction is being written;
+    synchronous=NORMAL is durable enough under WAL and avoids an fsync per commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def create_db_engine(database_url: str):
     """
-    engine = create_engine(database_url, connect_args={"check_same_thread": False})
-    # Create all tables defined by subclasses of Base
-    Base.metadata.create_all(engine)
+    The single place where the bot builds an engine: SQLite gets WAL and tuned
+    pragmas, server databases (PostgreSQL etc.) get a sized connection pool.
+    """
+    engine = create_engine(database_url, **engine_options(database_url))
+    if _is_sqlite(database_url):
+        event.listen(engine, "connect", _set_sqlite_pragmas)
     return engine
 
 
-# SQLAlchemy session factory
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Async drivers used when the same DATABASE_URL is opened with SQLAlchemy asyncio
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(database_url: str) -> str:
+    """
+    Maps a sync URL (sqlite:///..., postgresql://...) to its asyncio driver.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS and url.get_driver_name() != ASYNC_DRIVERS[backend]:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+def create_async_db_engine(database_url: str):
+    """
+    Async counterpart of create_db_engine() with the same pool settings and SQLite pragmas.
+    Needs greenlet and the async driver (aiosqlite / asyncpg), imported only here.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_engine = create_async_engine(async_database_url(database_url), **engine_options(database_url))
+    if _is_sqlite(database_url):
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return async_engine
+
+
+_async_sessionmaker = None
+
+
+def get_async_sessionmaker():
+    """
+    Session factory for the AsyncTeleBot entry point; the engine is built on first use.
+    """
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_sessionmaker = async_sessionmaker(
+            create_async_db_engine(DATABASE_URL), autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker
+
+
+# Alembic revision matching the schema that create_all() produced before migrations existed
+BASELINE_REVISION = "0001"
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    cfg = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(PROJECT_ROOT, "migrations"))
+    return cfg
+
+
+def init_db(database_url: str):
+    """
+    Initialize the database connection and bring the schema to the latest Alembic revision.
+
+    A fresh database gets every table from the models and is stamped as current.
+    A database created by create_all() before migrations existed is stamped at the
+    baseline revision and then upgraded.
+    """
+    from alembic import command
+
+    db_engine = engine if database_url == DATABASE_URL else create_db_engine(database_url)
+    cfg = alembic_config()
+    with db_engine.begin() as connection:
+        cfg.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if "alembic_version" not in tables:
+            if "users" not in tables:
+                Base.metadata.create_all(connection)
+                command.stamp(cfg, "head")
+                return db_engine
+            command.stamp(cfg, BASELINE_REVISION)
+        command.upgrade(cfg, "head")
+    return db_engine
+
+
+# SQLAlchemy engine and session factory shared by the whole bot
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
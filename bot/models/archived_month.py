@@ -0,0 +1,13 @@
+# models/archived_month.py
+from sqlalchemy import Column, Integer, String, DateTime
+from . import Base
+import datetime
+
+
+class ArchivedMonth(Base):
+    """A closed month whose transactions were moved to a per-year archive table."""
+    __tablename__ = "archived_months"
+    year_month = Column(String, primary_key=True)  # 'YYYY-MM'
+    table_name = Column(String, nullable=False)  # e.g. 'transactions_archive_2024'
+    row_count = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime, default=datetime.datetime.utcnow)
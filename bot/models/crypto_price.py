@@ -0,0 +1,15 @@
+# models/crypto_price.py
+from sqlalchemy import Column, Integer, String, Float, Date, UniqueConstraint
+from . import Base
+
+
+class CryptoPrice(Base):
+    __tablename__ = "crypto_prices"
+    __table_args__ = (
+        UniqueConstraint("coin", "vs_currency", "date", name="uq_crypto_prices_coin_vs_date"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    coin = Column(String, nullable=False)  # CoinGecko id: 'bitcoin', 'ethereum'
+    vs_currency = Column(String, nullable=False)  # 'usd'
+    date = Column(Date, nullable=False)
+    price = Column(Float, nullable=False)  # daily close
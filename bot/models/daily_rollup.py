@@ -0,0 +1,18 @@
+# models/daily_rollup.py
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, UniqueConstraint
+from . import Base
+
+
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+    # One row per (user, day, category, type); the key also serves the per-user date range scans
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "category_id", "type", name="uq_daily_rollups_key"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    type = Column(String, nullable=False)  # 'income' or 'expense'
+    total_minor = Column(Integer, nullable=False, default=0)  # kopecks
+    tx_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,13 @@
+# models/fx_rate.py
+from sqlalchemy import Column, Integer, String, Float, Date, UniqueConstraint
+from . import Base
+
+
+class FxRate(Base):
+    __tablename__ = "fx_rates"
+    # (currency, date) is both the natural key and the index used by range lookups
+    __table_args__ = (UniqueConstraint("currency", "date", name="uq_fx_rates_currency_date"),)
+    id = Column(Integer, primary_key=True, index=True)
+    currency = Column(String, nullable=False)  # 'USD', 'EUR'
+    date = Column(Date, nullable=False)
+    rate = Column(Float, nullable=False)  # currency→UAH (NBU official rate)
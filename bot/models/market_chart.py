@@ -0,0 +1,14 @@
+# models/market_chart.py
+from sqlalchemy import Column, Date, DateTime, LargeBinary, String
+from . import Base
+import datetime
+
+
+class MarketChart(Base):
+    """Rendered currency-rate chart for a closed period; identical for every user."""
+    __tablename__ = "market_charts"
+    period_start = Column(Date, primary_key=True)
+    period_end = Column(Date, primary_key=True)
+    currencies = Column(String, primary_key=True)  # e.g. 'USD,EUR|bitcoin,ethereum'
+    png = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
@@ -1,20 +1,51 @@
 # models/monthly_metric.py
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, UniqueConstraint
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from . import Base
+from bot.utils import money
 
 
 class MonthlyMetric(Base):
     __tablename__ = "monthly_metrics"
+    # Concurrent writers of one month must end up updating the same row
+    __table_args__ = (
+        UniqueConstraint("user_id", "year_month", name="uq_monthly_metrics_user_month"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     year_month = Column(String, nullable=False, index=True)
-    total_income = Column(Float, default=0.0)
-    total_expense = Column(Float, default=0.0)
-    avg_daily_expense = Column(Float, default=0.0)
+    total_income_minor = Column(Integer, default=0)  # kopecks
+    total_expense_minor = Column(Integer, default=0)  # kopecks
+    avg_daily_expense_minor = Column(Integer, default=0)  # kopecks
     top_category = Column(String, nullable=True)
     top_category_pct = Column(Float, default=0.0)
     avg_usd = Column(Float, default=0.0)  # USD→UAH
     avg_eur = Column(Float, default=0.0)  # EUR→UAH
 
     user = relationship("User", back_populates="monthly_metrics")
+
+    # Amounts in hryvnias for reports; the stored values are the *_minor columns
+    @hybrid_property
+    def total_income(self):
+        return money.from_minor(self.total_income_minor)
+
+    @total_income.setter
+    def total_income(self, value):
+        self.total_income_minor = money.to_minor(value)
+
+    @hybrid_property
+    def total_expense(self):
+        return money.from_minor(self.total_expense_minor)
+
+    @total_expense.setter
+    def total_expense(self, value):
+        self.total_expense_minor = money.to_minor(value)
+
+    @hybrid_property
+    def avg_daily_expense(self):
+        return money.from_minor(self.avg_daily_expense_minor)
+
+    @avg_daily_expense.setter
+    def avg_daily_expense(self, value):
+        self.avg_daily_expense_minor = money.to_minor(value)
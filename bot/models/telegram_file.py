@@ -0,0 +1,13 @@
+# models/telegram_file.py
+from sqlalchemy import Column, Integer, String, DateTime
+from . import Base
+import datetime
+
+
+class TelegramFile(Base):
+    """A file already uploaded to Telegram, found by the SHA-256 of its bytes."""
+    __tablename__ = "telegram_files"
+    content_hash = Column(String, primary_key=True)  # sha256 hex digest
+    file_id = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)  # bytes
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
@@ -1,14 +1,21 @@
 # models\transaction.py
-from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, String, ForeignKey, Index
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from . import Base
+from bot.utils import money
 import datetime
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Every report filters by user and date range, often by type as well
+    __table_args__ = (
+        Index("ix_transactions_user_type_date", "user_id", "type", "date"),
+        Index("ix_transactions_user_date", "user_id", "date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
+    amount_minor = Column(Integer, nullable=False)  # kopecks
     date = Column(DateTime, default=datetime.datetime.utcnow)
     type = Column(String, nullable=False)  # 'income' or 'expense'
     note = Column(String, nullable=True)
@@ -17,3 +24,16 @@ class Transaction(Base):
 
     user = relationship("User", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
+
+    @hybrid_property
+    def amount(self):
+        """Amount in hryvnias; the stored value is amount_minor."""
+        return money.from_minor(self.amount_minor)
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_minor = money.to_minor(value)
+
+    @amount.expression
+    def amount(cls):
+        return cls.amount_minor / float(money.MINOR_UNITS)
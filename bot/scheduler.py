@@ -0,0 +1,56 @@
+# scheduler.py
+import datetime
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from bot.bot_app import bot
+from bot.models import SessionLocal
+from bot.models.user import User
+from bot.utils import archive, market_charts
+from bot.utils.rate_warmer import warm_rates
+
+
+def send_daily_reminder():
+    session = SessionLocal()
+    users = session.query(User).all()
+    session.close()
+    for u in users:
+        bot.send_message(
+            u.telegram_id,
+            "Не забудьте внести сьогоднішні витрати!"
+        )
+
+
+def start_scheduler() -> BackgroundScheduler:
+    """
+    Background jobs shared by the polling and the asyncio entry points.
+    """
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(
+        send_daily_reminder,
+        CronTrigger(hour=20, minute=0)
+    )
+    # Nightly: pull the latest NBU and crypto rates so reports never hit the network
+    scheduler.add_job(
+        warm_rates,
+        CronTrigger(hour=3, minute=0)
+    )
+    # Once on startup: cover the previous month before the first monthly report
+    scheduler.add_job(
+        warm_rates,
+        kwargs={"days": 62},
+        next_run_time=datetime.datetime.now()
+    )
+    # Month rollover: draw the closed month's shared currency chart before the first monthly report
+    scheduler.add_job(
+        market_charts.pregenerate_closed_month,
+        CronTrigger(day=1, hour=3, minute=30)
+    )
+    # Monthly: move transactions older than archive.KEEP_MONTHS out of the hot table
+    scheduler.add_job(
+        archive.run_scheduled,
+        CronTrigger(day=2, hour=4, minute=0)
+    )
+    scheduler.start()
+    return scheduler
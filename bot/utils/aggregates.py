@@ -0,0 +1,21 @@
+# utils/aggregates.py
+"""
+Обробка підсумків по категоріях (rollups.category_totals) для звітів.
+Суми приходять у копійках (Transaction.amount_minor); у гривні їх переводить money.from_minor.
+"""
+from bot.utils import money
+
+
+def split_by_type(rows) -> tuple:
+    """
+    Розкладає рядки category_totals на два словники в гривнях: ({витрати}, {доходи}).
+    """
+    expenses = {}
+    incomes = {}
+    for name, ttype, total in rows:
+        target = expenses if ttype == "expense" else incomes
+        target[name] = target.get(name, 0) + (total or 0)
+    return (
+        {name: money.from_minor(v) for name, v in expenses.items()},
+        {name: money.from_minor(v) for name, v in incomes.items()},
+    )
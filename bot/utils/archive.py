@@ -0,0 +1,264 @@
+# utils/archive.py
+"""
+Архів старих транзакцій у таблицях за роками (transactions_archive_YYYY).
+
+Закритий місяць переноситься з transactions в архів одним commit, але лише
+після перевірки, що його денні підсумки (daily_rollups) та MonthlyMetric
+збігаються з сирими транзакціями: звіти за сумами читають саме їх, тож після
+архівації нічого не втрачається. Список архівованих місяців — таблиця archived_months.
+
+Запити, яким потрібні окремі транзакції (список, експорт), беруть джерело з
+transaction_source(): архівні таблиці додаються через UNION ALL лише тоді,
+коли запитаний період їх зачіпає.
+
+    python -m bot.utils.archive run [--keep-months N]
+    python -m bot.utils.archive month 2024-01
+"""
+import argparse
+import datetime
+import logging
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, MetaData, String, Table, func, select, union_all
+)
+
+from bot.models import SessionLocal
+from bot.models.archived_month import ArchivedMonth
+from bot.models.daily_rollup import DailyRollup
+from bot.models.monthly_metric import MonthlyMetric
+from bot.models.transaction import Transaction
+from bot.utils import monthly_metrics
+
+logger = logging.getLogger(__name__)
+
+# Скільки останніх закритих місяців лишати в гарячій таблиці
+KEEP_MONTHS = 12
+
+ARCHIVE_PREFIX = "transactions_archive_"
+# Архівні таблиці створюються під час роботи, поза метаданими моделей і міграціями
+archive_metadata = MetaData()
+_COLUMNS = ("id", "amount_minor", "date", "type", "note", "user_id", "category_id")
+
+
+class ArchiveError(Exception):
+    """Місяць не можна архівувати (відкритий, уже в архіві або агрегати неповні)."""
+
+
+def archive_table(year: int) -> Table:
+    name = f"{ARCHIVE_PREFIX}{year}"
+    table = archive_metadata.tables.get(name)
+    if table is None:
+        table = Table(
+            name, archive_metadata,
+            Column("id", Integer, primary_key=True),
+            Column("amount_minor", Integer, nullable=False),
+            Column("date", DateTime),
+            Column("type", String, nullable=False),
+            Column("note", String),
+            Column("user_id", Integer, nullable=False),
+            Column("category_id", Integer, nullable=False),
+            Index(f"ix_{name}_user_date", "user_id", "date"),
+        )
+    return table
+
+
+def _month_range(month: datetime.date) -> tuple:
+    """
+    [початок місяця, початок наступного) як datetime.
+    """
+    start = datetime.datetime(month.year, month.month, 1)
+    if month.month == 12:
+        return start, datetime.datetime(month.year + 1, 1, 1)
+    return start, datetime.datetime(month.year, month.month + 1, 1)
+
+
+def _in_month(column, month: datetime.date):
+    start, end = _month_range(month)
+    return (column >= start) & (column < end)
+
+
+def verify_month(session, month: datetime.date) -> list:
+    """
+    Порівнює сирі транзакції місяця з daily_rollups і MonthlyMetric.
+    Повертає список розбіжностей (порожній — можна архівувати).
+    """
+    raw = {
+        (user_id, ttype): (total or 0, count)
+        for user_id, ttype, total, count in session.query(
+            Transaction.user_id, Transaction.type, func.sum(Transaction.amount_minor), func.count(Transaction.id)
+        ).filter(_in_month(Transaction.date, month)).group_by(Transaction.user_id, Transaction.type)
+    }
+    start, end = _month_range(month)
+    rolled = {
+        (user_id, ttype): (total or 0, count or 0)
+        for user_id, ttype, total, count in session.query(
+            DailyRollup.user_id, DailyRollup.type, func.sum(DailyRollup.total_minor), func.sum(DailyRollup.tx_count)
+        ).filter(
+            DailyRollup.day >= start.date(), DailyRollup.day < end.date()
+        ).group_by(DailyRollup.user_id, DailyRollup.type)
+    }
+    problems = []
+    for key in sorted(set(raw) | set(rolled)):
+        if raw.get(key, (0, 0)) != rolled.get(key, (0, 0)):
+            problems.append(f"daily_rollups user={key[0]} type={key[1]}: {rolled.get(key)} != {raw.get(key)}")
+
+    year_month = month.strftime("%Y-%m")
+    metrics = {
+        m.user_id: m for m in session.query(MonthlyMetric).filter(MonthlyMetric.year_month == year_month)
+    }
+    for user_id in sorted({user_id for user_id, _ in raw}):
+        metric = metrics.get(user_id)
+        income = raw.get((user_id, "income"), (0, 0))[0]
+        expense = raw.get((user_id, "expense"), (0, 0))[0]
+        if metric is None:
+            problems.append(f"monthly_metrics user={user_id}: missing")
+        elif (metric.total_income_minor, metric.total_expense_minor) != (income, expense):
+            problems.append(f"monthly_metrics user={user_id}: totals differ")
+    return problems
+
+
+def _refresh_metrics(session, month: datetime.date):
+    """
+    Перераховує MonthlyMetric місяця з daily_rollups для всіх його користувачів.
+    До підтримки метрик під час запису вони з'являлися лише після перегляду звіту,
+    тож в оновленій базі їх може не бути; після цього розбіжність з сирими
+    транзакціями можлива лише через daily_rollups, які виправляє rebuild.
+    """
+    users = session.query(Transaction.user_id).filter(_in_month(Transaction.date, month)).distinct()
+    for user_id, in users.all():
+        monthly_metrics.refresh(session, user_id, month)
+    session.flush()
+
+
+def archive_month(session, month: datetime.date, today=None) -> int:
+    """
+    Переносить транзакції закритого місяця в архів свого року; повертає кількість рядків.
+    ArchiveError, якщо місяць ще відкритий, уже в архіві або його агрегати неповні.
+    """
+    today = today or datetime.date.today()
+    month = month.replace(day=1)
+    year_month = month.strftime("%Y-%m")
+    if month >= today.replace(day=1):
+        raise ArchiveError(f"{year_month} is not closed yet")
+    if session.get(ArchivedMonth, year_month) is not None:
+        raise ArchiveError(f"{year_month} is already archived")
+    _refresh_metrics(session, month)
+    problems = verify_month(session, month)
+    if problems:
+        raise ArchiveError(
+            f"{year_month}: aggregates are incomplete, run 'python -m bot.utils.rollups rebuild' first: "
+            + "; ".join(problems)
+        )
+
+    table = archive_table(month.year)
+    table.create(session.connection(), checkfirst=True)
+    hot = Transaction.__table__
+    moved = select(*(hot.c[name] for name in _COLUMNS)).where(_in_month(hot.c.date, month))
+    session.execute(table.insert().from_select(list(_COLUMNS), moved))
+    count = session.execute(hot.delete().where(_in_month(hot.c.date, month))).rowcount
+    session.add(ArchivedMonth(year_month=year_month, table_name=table.name, row_count=count))
+    session.commit()
+    return count
+
+
+def archive_closed_months(session, keep_months: int = KEEP_MONTHS, today=None) -> dict:
+    """
+    Архівує всі місяці, старші за keep_months закритих місяців; повертає {year_month: рядків}.
+    Місяць, який не можна архівувати, записується в журнал і пропускається.
+    """
+    today = today or datetime.date.today()
+    cutoff = today.replace(day=1)
+    for _ in range(keep_months):
+        cutoff = (cutoff - datetime.timedelta(days=1)).replace(day=1)
+    oldest = session.query(func.min(Transaction.date)).filter(
+        Transaction.date < datetime.datetime.combine(cutoff, datetime.time.min)
+    ).scalar()
+    archived = {}
+    if oldest is None:
+        return archived
+    month = oldest.date().replace(day=1)
+    while month < cutoff:
+        if session.get(ArchivedMonth, month.strftime("%Y-%m")) is None:
+            try:
+                archived[month.strftime("%Y-%m")] = archive_month(session, month, today)
+            except ArchiveError as e:
+                logger.error("archive: %s", e)
+        month = _month_range(month)[1].date()
+    return archived
+
+
+def archived_tables(session, start_dt=None, end_dt=None) -> list:
+    """
+    Архівні таблиці, що містять місяці з періоду [start_dt, end_dt] (без меж — усі).
+    """
+    query = session.query(ArchivedMonth.table_name)
+    if start_dt is not None:
+        query = query.filter(ArchivedMonth.year_month >= start_dt.strftime("%Y-%m"))
+    if end_dt is not None:
+        query = query.filter(ArchivedMonth.year_month <= end_dt.strftime("%Y-%m"))
+    names = query.distinct().order_by(ArchivedMonth.table_name).all()
+    return [archive_table(int(name[len(ARCHIVE_PREFIX):])) for name, in names]
+
+
+def transaction_source(session, start_dt=None, end_dt=None):
+    """
+    Таблиця або підзапит з колонками transactions для періоду [start_dt, end_dt]:
+    сама transactions, якщо період не зачіпає архів, інакше UNION ALL з потрібними архівними роками.
+    """
+    hot = Transaction.__table__
+    tables = archived_tables(session, start_dt, end_dt)
+    if not tables:
+        return hot
+    selects = [select(*(t.c[name] for name in _COLUMNS)) for t in [hot] + tables]
+    return union_all(*selects).subquery("transactions_all")
+
+
+def category_in_use(session, category_id: int) -> bool:
+    """
+    Чи є в категорії транзакції (гарячі чи архівні) або денні підсумки.
+    Архівні таблиці не мають зовнішнього ключа на categories, тож видалення
+    категорії перевіряється тут, інакше її суми зникли б зі звітів і експорту.
+    """
+    src = transaction_source(session)
+    if session.execute(select(src.c.id).where(src.c.category_id == category_id).limit(1)).first():
+        return True
+    return session.query(DailyRollup.id).filter(DailyRollup.category_id == category_id).first() is not None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Архівація старих транзакцій")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="архівувати всі достатньо старі місяці")
+    run.add_argument("--keep-months", type=int, default=KEEP_MONTHS)
+    one = sub.add_parser("month", help="архівувати один закритий місяць")
+    one.add_argument("year_month", type=lambda s: datetime.date.fromisoformat(s + "-01"))
+    args = parser.parse_args(argv)
+
+    session = SessionLocal()
+    try:
+        if args.command == "run":
+            archived = archive_closed_months(session, args.keep_months)
+        else:
+            archived = {args.year_month.strftime("%Y-%m"): archive_month(session, args.year_month)}
+    except ArchiveError as e:
+        session.rollback()
+        parser.exit(1, f"{e}\n")
+    finally:
+        session.close()
+    for year_month, count in archived.items():
+        print(f"{year_month}: {count} rows archived")
+
+
+def run_scheduled():
+    """
+    Задача планувальника: архівує місяці, старші за KEEP_MONTHS.
+    """
+    session = SessionLocal()
+    try:
+        archive_closed_months(session)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
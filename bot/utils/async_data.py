@@ -0,0 +1,209 @@
+# utils/async_data.py
+"""
+Async data paths for the AsyncTeleBot entry point (bot/async_bot.py).
+
+Each coroutine opens an AsyncSession and runs the same sync helpers the
+threaded handlers use (ledger, rollups, category_cache, ...) through
+AsyncSession.run_sync: the queries are awaited on the event loop instead of
+blocking a worker thread, and the data logic lives in one place.
+
+The few paths that call rate providers over HTTP (the currency chart, the
+monthly report's average rates) would block the loop inside run_sync; they
+run on a worker thread with a regular Session instead.
+"""
+import asyncio
+import datetime
+
+from bot.models import SessionLocal, get_async_sessionmaker
+from bot.utils import (
+    categories, category_cache, file_ids, ledger, market_charts, monthly_metrics, monthly_report, quick_entry,
+    reports, rollups, tx_pages, user_cache, users
+)
+
+
+async def _run(fn, *args, commit: bool = False):
+    async with get_async_sessionmaker()() as session:
+        result = await session.run_sync(fn, *args)
+        if commit:
+            await session.commit()
+        return result
+
+
+def _with_session(fn, *args):
+    session = SessionLocal()
+    try:
+        return fn(session, *args)
+    finally:
+        session.close()
+
+
+async def _in_thread(fn, *args):
+    return await asyncio.to_thread(_with_session, fn, *args)
+
+
+async def register_user(telegram_id: int, username: str, timezone=None) -> int:
+    return await _run(users.register, telegram_id, username, timezone)
+
+
+async def get_user_id(telegram_id: int):
+    return await _run(user_cache.get_user_id, telegram_id)
+
+
+def _categories(session, telegram_id: int, ctype):
+    user_id = user_cache.get_user_id(session, telegram_id)
+    if user_id is None:
+        return []
+    return category_cache.get_categories(session, user_id, ctype)
+
+
+async def get_categories(telegram_id: int, ctype=None) -> list:
+    return await _run(_categories, telegram_id, ctype)
+
+
+def _add_quick_entries(session, telegram_id: int, text: str):
+    user_id = user_cache.get_user_id(session, telegram_id)
+    if user_id is None:
+        return None, []
+    entries, errors = quick_entry.parse(text, category_cache.load(session, user_id))
+    if errors or not entries:
+        return [], errors
+    ledger.add_transactions(
+        session, user_id, [(e.type, e.amount_minor, e.category_id, e.note) for e in entries]
+    )
+    return entries, []
+
+
+async def add_quick_entries(telegram_id: int, text: str):
+    """
+    Parses and stores a quick-entry message in one commit.
+    Returns (entries, errors); entries is None for an unknown user.
+    """
+    return await _run(_add_quick_entries, telegram_id, text, commit=True)
+
+
+def _period_totals(session, telegram_id: int, start: datetime.date, end: datetime.date):
+    user_id = user_cache.get_user_id(session, telegram_id)
+    if user_id is None:
+        return None
+    return rollups.type_totals(session, user_id, start, end)
+
+
+async def period_totals(telegram_id: int, start: datetime.date, end: datetime.date):
+    """
+    {"income": kopecks, "expense": kopecks} from daily_rollups, or None for an unknown user.
+    """
+    return await _run(_period_totals, telegram_id, start, end)
+
+
+def _month_metric(session, telegram_id: int, day: datetime.date):
+    user_id = user_cache.get_user_id(session, telegram_id)
+    if user_id is None:
+        return None
+    return monthly_metrics.get_or_refresh(session, user_id, day)
+
+
+async def month_metric(telegram_id: int, day: datetime.date):
+    return await _run(_month_metric, telegram_id, day)
+
+
+def _tx_page(session, telegram_id: int, start_dt, end_dt, after, before):
+    user_id = user_cache.get_user_id(session, telegram_id)
+    if user_id is None:
+        return None
+    return tx_pages.fetch_page(session, user_id, start_dt, end_dt, after=after, before=before)
+
+
+async def tx_page(telegram_id: int, start_dt, end_dt, after=None, before=None):
+    return await _run(_tx_page, telegram_id, start_dt, end_dt, after, before)
+
+
+def _resolve_category(session, telegram_id: int, name: str, ctype):
+    user_id = user_cache.get_user_id(session, telegram_id)
+    if user_id is None:
+        return None
+    return category_cache.resolve(session, user_id, name, ctype)
+
+
+async def resolve_category(telegram_id: int, name: str, ctype=None):
+    """
+    The user's CachedCategory called name (of type ctype), or None.
+    """
+    return await _run(_resolve_category, telegram_id, name, ctype)
+
+
+def _add_transaction(session, telegram_id: int, category_id: int, ttype: str, amount_minor: int, note: str):
+    user_id = user_cache.get_user_id(session, telegram_id)
+    ledger.add_transaction(session, user_id, category_id, ttype, amount_minor, note)
+
+
+async def add_transaction(telegram_id: int, category_id: int, ttype: str, amount_minor: int, note: str = ""):
+    await _run(_add_transaction, telegram_id, category_id, ttype, amount_minor, note, commit=True)
+
+
+def _add_category(session, telegram_id: int, name: str, ctype: str):
+    return categories.add(session, user_cache.get_user_id(session, telegram_id), name, ctype)
+
+
+async def add_category(telegram_id: int, name: str, ctype: str) -> int:
+    return await _run(_add_category, telegram_id, name, ctype)
+
+
+async def rename_category(category_id: int, name: str):
+    await _run(categories.rename, category_id, name)
+
+
+async def retype_category(category_id: int, ctype: str):
+    await _run(categories.retype, category_id, ctype)
+
+
+async def delete_category(category_id: int) -> bool:
+    """
+    False if the category still has transactions (it is kept).
+    """
+    return await _run(categories.delete, category_id)
+
+
+async def category_pies_spec(user_id: int, start: datetime.date, end: datetime.date) -> dict:
+    return await _run(reports.category_pies_spec, user_id, start, end)
+
+
+async def income_expense_lines_spec(user_id: int, start: datetime.date, end: datetime.date) -> dict:
+    return await _run(reports.income_expense_lines_spec, user_id, start, end)
+
+
+async def month_totals(user_id: int, start: datetime.date, end: datetime.date) -> dict:
+    """
+    Sums, daily expenses and category totals of the monthly report (no rates).
+    """
+    return await _run(monthly_report.collect_totals, user_id, start, end)
+
+
+async def month_rates(start: datetime.date, end: datetime.date, deadline=None) -> dict:
+    return await _in_thread(monthly_report.collect_rates, start, end, deadline)
+
+
+async def save_month_rates(user_id: int, year_month: str, data: dict):
+    await _run(monthly_report.save_rates, user_id, year_month, data)
+
+
+def _market_chart(session, start: datetime.date, end: datetime.date, deadline):
+    return market_charts.get_chart(session, start, end, deadline)
+
+
+async def market_chart(start: datetime.date, end: datetime.date, deadline=None) -> tuple:
+    """
+    (PNG, stale currencies) of the shared currency chart, see utils/market_charts.py.
+    """
+    return await _in_thread(_market_chart, start, end, deadline)
+
+
+async def stored_file_id(digest: str):
+    return await _run(file_ids.lookup, digest)
+
+
+async def remember_file_id(digest: str, file_id: str, size: int):
+    await _run(file_ids.remember, digest, file_id, size)
+
+
+async def forget_file_id(digest: str):
+    await _run(file_ids.forget, digest)
@@ -0,0 +1,179 @@
+# utils/cache.py
+"""
+In-process caches shared by the bot's worker threads.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe bounded mapping that evicts the least recently used key.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after `ttl` seconds.
+
+    get_or_load() refreshes an expired entry at most once: concurrent callers
+    for the same key wait for the first loader instead of repeating its work.
+    If the loader fails, the expired value (if any) is served instead.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 3600.0, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _lookup(self, key):
+        """
+        Returns (value, is_fresh) or None; marks the key as recently used.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            expires_at, value = entry
+            return value, self._timer() < expires_at
+
+    def get(self, key, default=None):
+        found = self._lookup(key)
+        if found is None or not found[1]:
+            return default
+        return found[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self._timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                old_key, _ = self._data.popitem(last=False)
+                self._key_locks.pop(old_key, None)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key, loader):
+        found = self._lookup(key)
+        if found is not None and found[1]:
+            return found[0]
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Someone else may have refreshed the entry while we were waiting
+            found = self._lookup(key)
+            if found is not None and found[1]:
+                return found[0]
+            try:
+                value = loader()
+            except Exception:
+                if found is not None:
+                    return found[0]
+                raise
+            self.set(key, value)
+            return value
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class SizedLRUCache:
+    """
+    Thread-safe LRU cache bounded by the total size of its values rather than their count.
+
+    `sizeof` measures a value (len() by default, i.e. bytes for bytes values).
+    A value larger than the whole budget is not stored at all.
+    """
+
+    def __init__(self, max_bytes: int, sizeof=len):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data = OrderedDict()  # key -> (size, value)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        size = self._sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= old[0]
+            if size > self.max_bytes:
+                return
+            self._data[key] = (size, value)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (old_size, _) = self._data.popitem(last=False)
+                self._size -= old_size
+
+    def invalidate(self, key):
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= old[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._size
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
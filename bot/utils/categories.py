@@ -0,0 +1,52 @@
+# utils/categories.py
+"""
+Category changes shared by the threaded and the asyncio bot.
+
+Every function commits, then drops the user's category_cache entry. Renames
+and retypes also move the user's chart data version on, because category
+names and types are drawn on the cached charts.
+"""
+from bot.models.category import Category
+from bot.utils import archive, category_cache, chart_cache
+
+
+def add(session, user_id: int, name: str, ctype: str) -> int:
+    category = Category(name=name, type=ctype, is_default=False, user_id=user_id)
+    session.add(category)
+    session.commit()
+    category_cache.invalidate(user_id)
+    return category.id
+
+
+def _update(session, category_id: int, **changes):
+    category = session.get(Category, category_id)
+    for field, value in changes.items():
+        setattr(category, field, value)
+    category.is_default = 0
+    user_id = category.user_id
+    chart_cache.mark_changed(session, user_id)
+    session.commit()
+    category_cache.invalidate(user_id)
+
+
+def rename(session, category_id: int, name: str):
+    _update(session, category_id, name=name)
+
+
+def retype(session, category_id: int, ctype: str):
+    _update(session, category_id, type=ctype)
+
+
+def delete(session, category_id: int) -> bool:
+    """
+    Deletes a category that has no transactions; False (nothing changed) otherwise.
+    """
+    if archive.category_in_use(session, category_id):
+        return False
+    category = session.get(Category, category_id)
+    user_id = category.user_id
+    session.delete(category)
+    chart_cache.mark_changed(session, user_id)
+    session.commit()
+    category_cache.invalidate(user_id)
+    return True
@@ -0,0 +1,72 @@
+# utils/category_cache.py
+"""
+Per-user category cache.
+
+Keyboards and name -> category lookups are served from memory; the category
+handlers invalidate a user's entry after every add/rename/retype/delete commit,
+so the next read reloads it with one query.
+"""
+from collections import namedtuple
+
+from bot.models.category import Category
+from bot.utils.cache import LRUCache
+from bot.utils.user_cache import MAX_USERS
+
+CachedCategory = namedtuple("CachedCategory", ["id", "name", "type", "is_default"])
+
+
+class UserCategories:
+    """
+    A user's categories in id order plus name -> category maps.
+    """
+
+    def __init__(self, categories):
+        self.entries = list(categories)
+        self.by_type_and_name = {}
+        self.by_name = {}
+        for cat in self.entries:
+            self.by_type_and_name.setdefault((cat.type, cat.name), cat)
+            self.by_name.setdefault(cat.name, cat)
+
+    def of_type(self, ctype=None) -> list:
+        if ctype is None:
+            return list(self.entries)
+        return [cat for cat in self.entries if cat.type == ctype]
+
+    def resolve(self, name: str, ctype=None):
+        if ctype is None:
+            return self.by_name.get(name)
+        return self.by_type_and_name.get((ctype, name))
+
+
+_categories = LRUCache(maxsize=MAX_USERS)
+
+
+def load(session, user_id: int) -> UserCategories:
+    cached = _categories.get(user_id)
+    if cached is not None:
+        return cached
+    rows = session.query(
+        Category.id, Category.name, Category.type, Category.is_default
+    ).filter(Category.user_id == user_id).order_by(Category.id).all()
+    cached = UserCategories(CachedCategory(*row) for row in rows)
+    _categories.set(user_id, cached)
+    return cached
+
+
+def get_categories(session, user_id: int, ctype=None) -> list:
+    """
+    Returns the user's categories (optionally of one type) as CachedCategory tuples.
+    """
+    return load(session, user_id).of_type(ctype)
+
+
+def resolve(session, user_id: int, name: str, ctype=None):
+    """
+    Finds a user's category by name (and type); returns CachedCategory or None.
+    """
+    return load(session, user_id).resolve(name, ctype)
+
+
+def invalidate(user_id: int):
+    _categories.invalidate(user_id)
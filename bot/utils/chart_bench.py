@@ -0,0 +1,82 @@
+# utils/chart_bench.py
+"""
+Мікробенчмарк малювання графіків: нова фігура на кожен виклик (як раніше
+робив pyplot) проти шаблону потоку з utils/charts.py.
+
+    python -m bot.utils.chart_bench [--runs 20]
+"""
+import argparse
+import datetime
+import random
+import time
+
+from bot.utils import charts
+
+
+def sample_specs(days: int = 30, seed: int = 1) -> list:
+    """
+    Специфікації всіх типів графіків з даними «типового місяця».
+    """
+    rnd = random.Random(seed)
+    start = datetime.date(2025, 5, 1)
+    dates = [start + datetime.timedelta(days=i) for i in range(days)]
+    categories = ["Їжа", "Транспорт", "Житло", "Розваги", "Здоров'я", "Одяг"]
+    return [
+        charts.category_pies_spec(
+            {c: rnd.uniform(100, 5000) for c in categories}, {"Зарплата": 40000.0, "Інше": 1200.0},
+            "Категорії", startangle=90
+        ),
+        charts.income_expense_lines_spec(
+            {d: {"income": rnd.choice([0.0, 0.0, 1500.0]), "expense": rnd.uniform(0, 900)} for d in dates},
+            "Дохід/Витрати"
+        ),
+        charts.daily_expenses_spec({d: rnd.uniform(0, 900) for d in dates}, "Добові витрати"),
+        charts.totals_bar_spec(41200.0, 23750.5, "Зведений звіт", styled=True),
+        charts.currency_spec(
+            [(d, 41 + rnd.random()) for d in dates], [(d, 45 + rnd.random()) for d in dates],
+            [(d, 64000 + rnd.uniform(-2000, 2000)) for d in dates],
+            [(d, 3000 + rnd.uniform(-200, 200)) for d in dates],
+            set(), "Фіат", "Крипто"
+        ),
+    ]
+
+
+def _best_ms(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _cold(spec):
+    template = charts.new_template(spec)
+    template.update(spec)
+    return template.png()
+
+
+def run(runs: int = 20) -> list:
+    """
+    [(kind, мс з новою фігурою, мс із шаблоном), …] — найкращий час із runs спроб.
+    """
+    results = []
+    for spec in sample_specs():
+        charts.render(spec)  # прогрів: шрифти, шаблон потоку
+        cold = _best_ms(lambda: _cold(spec), runs)
+        warm = _best_ms(lambda: charts.render(spec), runs)
+        results.append((spec["kind"], cold, warm))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Час малювання графіків звітів")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+    print(f"{'chart':<22}{'new figure, ms':>16}{'template, ms':>14}{'speedup':>9}")
+    for kind, cold, warm in run(args.runs):
+        print(f"{kind:<22}{cold:>16.1f}{warm:>14.1f}{cold / warm:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# utils/chart_cache.py
+"""
+Rendered-chart cache.
+
+PNG bytes are kept in a byte-capped LRU under (user, chart, start, end,
+data version). The data version is a per-user counter that moves forward
+whenever a commit includes a write to that user's transactions: ledger and
+csv_import call mark_changed(), and the bump happens in the session's
+after_commit hook, so a rolled-back write never invalidates anything and a
+chart rendered from pre-commit data is filed under the old version.
+
+Versions and charts live in this process only; writes made by another
+process (e.g. a one-off CLI) are not seen until the entries age out or the
+bot restarts.
+"""
+import itertools
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from bot.utils.cache import SizedLRUCache
+from bot.utils.config import CHART_CACHE_MB
+
+_charts = SizedLRUCache(max_bytes=CHART_CACHE_MB * 1024 * 1024)
+
+_versions = {}  # user_id -> data version; users never written to stay at 0
+_counter = itertools.count(1)
+_versions_lock = threading.Lock()
+
+_PENDING = "chart_cache_users"
+
+
+def data_version(user_id: int) -> int:
+    return _versions.get(user_id, 0)
+
+
+def bump(user_id: int):
+    with _versions_lock:
+        _versions[user_id] = next(_counter)
+
+
+def mark_changed(session, user_id: int):
+    """
+    Records that the session wrote user_id's transactions; the version moves on commit.
+    """
+    session.info.setdefault(_PENDING, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    for user_id in session.info.pop(_PENDING, ()):
+        bump(user_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending(session, transaction):
+    # Runs after after_commit; on a rollback of the outermost transaction the writes are gone
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def chart_key(user_id: int, chart: str, start, end) -> tuple:
+    """
+    Cache key for the user's chart over [start, end] at the current data version.
+    Take it before reading the data the chart is drawn from.
+    """
+    return user_id, chart, start, end, data_version(user_id)
+
+
+def get(key):
+    return _charts.get(key)
+
+
+def put(key, png: bytes):
+    _charts.set(key, png)
+
+
+def get_or_render(user_id: int, chart: str, start, end, make_spec, render) -> bytes:
+    """
+    Cached PNG for the chart, or render(make_spec()) stored under the current version.
+    make_spec runs the queries, so a hit skips both the database and the renderer.
+    """
+    key = chart_key(user_id, chart, start, end)
+    png = _charts.get(key)
+    if png is None:
+        png = render(make_spec())
+        _charts.set(key, png)
+    return png
+
+
+def get_or_render_many(keys, specs, render_many) -> list:
+    """
+    Like get_or_render for a batch: only the misses go to render_many (in one call).
+    A None key marks a chart that is rendered but not cached.
+    """
+    images = [None if key is None else _charts.get(key) for key in keys]
+    missing = [i for i, png in enumerate(images) if png is None]
+    if missing:
+        for i, png in zip(missing, render_many([specs[i] for i in missing])):
+            images[i] = png
+            if keys[i] is not None:
+                _charts.set(keys[i], png)
+    return images
+
+
+def clear():
+    _charts.clear()
@@ -0,0 +1,316 @@
+# utils/charts.py
+"""
+Малювання графіків звітів зі «специфікацій» — простих словників, які можна
+серіалізувати (рядки, числа, списки; дати — ISO-рядки) і передати в інший процес.
+
+render(spec) повертає PNG-байти. Модуль не залежить від БД і конфігурації бота,
+тож його можна імпортувати у процесах пулу малювання (utils/render_service.py).
+
+pyplot не використовується: кожен тип графіка має шаблон — Figure з
+FigureCanvasAgg, осями, підписами й лініями, — який створюється один раз на потік
+і далі лише отримує нові дані. Шаблони не діляться між потоками, тож паралельні
+звіти не псують фігури один одному.
+
+    python -m bot.utils.chart_bench — порівняння з побудовою фігури щоразу
+"""
+import abc
+import datetime
+import threading
+from io import BytesIO
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def _dates(values) -> list:
+    return [datetime.date.fromisoformat(v) for v in values]
+
+
+def _series(points) -> tuple:
+    """
+    [[iso_date, value], …] → (dates, values)
+    """
+    return _dates(p[0] for p in points), [p[1] for p in points]
+
+
+def _set_line(line, dates, values):
+    line.set_data(dates, values)
+    line.set_visible(bool(values))
+
+
+def _rescale(ax):
+    ax.relim(visible_only=True)
+    ax.autoscale_view()
+
+
+def _set_legend(ax, lines, **kwargs):
+    """
+    Легенда лише з видимих ліній; без них — без легенди.
+    """
+    if ax.get_legend() is not None:
+        ax.get_legend().remove()
+    visible = [line for line in lines if line.get_visible()]
+    if visible:
+        ax.legend(handles=visible, **kwargs)
+
+
+# --------------------------------------------
+# Шаблони за типами графіків
+# --------------------------------------------
+class _Template(abc.ABC):
+    """
+    Figure з полотном Agg, що перевикористовується між викликами render().
+    """
+    figsize = None
+
+    def __init__(self):
+        self.figure = Figure(figsize=self.figsize)
+        FigureCanvasAgg(self.figure)
+        self.build(self.figure)
+
+    @abc.abstractmethod
+    def build(self, fig):
+        """
+        Один раз створює осі й порожні елементи графіка на fig.
+        """
+
+    @abc.abstractmethod
+    def update(self, spec):
+        """
+        Переносить дані spec на вже створені елементи.
+        """
+
+    def png(self) -> bytes:
+        buf = BytesIO()
+        self.figure.savefig(buf, format="png")
+        return buf.getvalue()
+
+
+class _CategoryPies(_Template):
+    figsize = (8, 4)
+
+    def build(self, fig):
+        self.ax_exp, self.ax_inc = fig.subplots(1, 2)
+        self.title = fig.suptitle("")
+
+    def update(self, spec):
+        extra = {"startangle": spec["startangle"]} if spec.get("startangle") is not None else {}
+        # Кількість секторів змінюється, тож кола перемальовуються; фігура й осі лишаються
+        for ax, data, empty, title in (
+            (self.ax_exp, spec["expenses"], spec["empty_expenses"], "Витрати"),
+            (self.ax_inc, spec["incomes"], spec["empty_incomes"], "Доходи"),
+        ):
+            ax.clear()
+            ax.pie(list(data.values()) or [1.0], labels=list(data.keys()) or [empty], autopct="%1.1f%%", **extra)
+            ax.set_title(title)
+        self.title.set_text(spec["title"])
+
+
+class _IncomeExpenseLines(_Template):
+    def build(self, fig):
+        self.ax = fig.subplots()
+        self.ax.xaxis_date()
+        self.income, = self.ax.plot([], [], label="Доходи")
+        self.expense, = self.ax.plot([], [], label="Витрати")
+        self.ax.legend()
+
+    def update(self, spec):
+        dates = _dates(spec["dates"])
+        _set_line(self.income, dates, spec["income"])
+        _set_line(self.expense, dates, spec["expense"])
+        _rescale(self.ax)
+        self.ax.set_title(spec["title"])
+        self.figure.autofmt_xdate()
+
+
+class _DailyExpenses(_Template):
+    figsize = (8, 4)
+
+    def build(self, fig):
+        self.ax = fig.subplots()
+        self.ax.xaxis_date()
+        self.line, = self.ax.plot([], [], color="red", label="Витрати")
+        self.peak, = self.ax.plot([], [], "o", color="black")
+        self.peak_label = self.ax.text(0, 0, "", fontsize=8)
+        self.ax.set_xlabel("Дата")
+        self.ax.set_ylabel("Сума витрат, грн")
+
+    def update(self, spec):
+        dates = _dates(spec["dates"])
+        vals = spec["values"]
+        _set_line(self.line, dates, vals)
+        if vals:
+            max_val = max(vals)
+            max_day = dates[vals.index(max_val)]
+            self.peak.set_data([max_day], [max_val])
+            self.peak_label.set_position((self.ax.xaxis.convert_units(max_day), max_val))
+            self.peak_label.set_text(f"  Макс: {max_val:.2f}")
+        self.peak.set_visible(bool(vals))
+        self.peak_label.set_visible(bool(vals))
+        _rescale(self.ax)
+        self.ax.set_title(spec["title"])
+        self.figure.autofmt_xdate()
+
+
+class _TotalsBar(_Template):
+    def __init__(self, styled: bool):
+        self.styled = styled
+        self.figsize = (6, 4) if styled else None
+        super().__init__()
+
+    def build(self, fig):
+        self.ax = fig.subplots()
+        colors = {"color": ["green", "red"]} if self.styled else {}
+        self.bars = self.ax.bar(["Доходи", "Витрати"], [0, 0], **colors)
+        if self.styled:
+            self.ax.set_ylabel("Сума, грн")
+
+    def update(self, spec):
+        for bar, value in zip(self.bars, (spec["income"], spec["expense"])):
+            bar.set_height(value)
+        _rescale(self.ax)
+        self.ax.set_title(spec["title"])
+
+
+class _Currency(_Template):
+    figsize = (8, 6)
+
+    def build(self, fig):
+        self.ax_fiat, self.ax_crypto = fig.subplots(2, 1, sharex=False)
+        self.ax_eth = self.ax_crypto.twinx()
+        for ax in (self.ax_fiat, self.ax_crypto, self.ax_eth):
+            ax.xaxis_date()
+
+        # Фіат: USD→UAH та EUR→UAH
+        self.usd, = self.ax_fiat.plot([], [], color="blue")
+        self.eur, = self.ax_fiat.plot([], [], color="orange")
+        self.ax_fiat.set_ylabel("Курс (UAH)")
+        self.ax_fiat.grid(True)
+
+        # Крипто: BTC→USD та ETH→USD (друга вісь)
+        self.btc, = self.ax_crypto.plot([], [], color="black")
+        self.eth, = self.ax_eth.plot([], [], color="gray", linestyle="--")
+        self.ax_eth.set_ylabel("ETH/USD", color="gray")
+        self.ax_eth.tick_params(axis="y", labelcolor="gray")
+        self.ax_crypto.set_xlabel("Дата")
+        self.ax_crypto.set_ylabel("BTC/USD", color="black")
+        self.ax_crypto.tick_params(axis="y", labelcolor="black")
+        self.ax_crypto.grid(True)
+        # Постійні поля замість tight_layout() на кожен виклик (він малює фігуру зайвий раз)
+        fig.subplots_adjust(left=0.11, right=0.9, top=0.94, bottom=0.17, hspace=0.35)
+
+    def update(self, spec):
+        stale = set(spec["stale"])
+        for line, key, label, code in (
+            (self.usd, "usd", "USD/UAH", "USD"),
+            (self.eur, "eur", "EUR/UAH", "EUR"),
+            (self.btc, "btc", "BTC/USD", "bitcoin"),
+            (self.eth, "eth", "ETH/USD", "ethereum"),
+        ):
+            _set_line(line, *_series(spec[key]))
+            line.set_label(label + ("*" if code in stale else ""))
+        # Права вісь ETH є лише тоді, коли є дані ETH
+        self.ax_eth.set_visible(bool(spec["eth"]))
+        for ax in (self.ax_fiat, self.ax_crypto, self.ax_eth):
+            _rescale(ax)
+        _set_legend(self.ax_fiat, [self.usd, self.eur])
+        _set_legend(self.ax_crypto, [self.btc], loc="upper left")
+        self.ax_fiat.set_title(spec["fiat_title"])
+        self.ax_crypto.set_title(spec["crypto_title"])
+        self.figure.autofmt_xdate(bottom=0.17)
+
+
+_TEMPLATES = {
+    "category_pies": lambda spec: _CategoryPies(),
+    "income_expense_lines": lambda spec: _IncomeExpenseLines(),
+    "daily_expenses": lambda spec: _DailyExpenses(),
+    "totals_bar": lambda spec: _TotalsBar(bool(spec["styled"])),
+    "currency": lambda spec: _Currency(),
+}
+
+_local = threading.local()
+
+
+def _template_key(spec) -> tuple:
+    return spec["kind"], bool(spec.get("styled"))
+
+
+def new_template(spec: dict) -> _Template:
+    """
+    Свіжий шаблон для типу графіка spec (render() бере шаблон свого потоку).
+    """
+    try:
+        factory = _TEMPLATES[spec["kind"]]
+    except KeyError:
+        raise ValueError(f"unknown chart kind: {spec.get('kind')!r}")
+    return factory(spec)
+
+
+def render(spec: dict) -> bytes:
+    """
+    Малює графік за специфікацією в шаблоні поточного потоку; повертає PNG-байти.
+    """
+    templates = getattr(_local, "templates", None)
+    if templates is None:
+        templates = _local.templates = {}
+    key = _template_key(spec)
+    template = templates.get(key)
+    if template is None:
+        template = templates[key] = new_template(spec)
+    template.update(spec)
+    return template.png()
+
+
+# --------------------------------------------
+# Специфікації
+# --------------------------------------------
+def category_pies_spec(expenses: dict, incomes: dict, title: str, empty_expenses: str = "Немає",
+                       empty_incomes: str = "Немає", startangle=None) -> dict:
+    return {
+        "kind": "category_pies", "title": title,
+        "expenses": dict(expenses), "incomes": dict(incomes),
+        "empty_expenses": empty_expenses, "empty_incomes": empty_incomes, "startangle": startangle,
+    }
+
+
+def income_expense_lines_spec(days: dict, title: str) -> dict:
+    """
+    days: {date: {"income": гривні, "expense": гривні}}
+    """
+    dates = sorted(days)
+    return {
+        "kind": "income_expense_lines", "title": title,
+        "dates": [d.isoformat() for d in dates],
+        "income": [days[d]["income"] for d in dates],
+        "expense": [days[d]["expense"] for d in dates],
+    }
+
+
+def daily_expenses_spec(daily_expenses: dict, title: str) -> dict:
+    dates = sorted(daily_expenses)
+    return {
+        "kind": "daily_expenses", "title": title,
+        "dates": [d.isoformat() for d in dates],
+        "values": [daily_expenses[d] for d in dates],
+    }
+
+
+def totals_bar_spec(income: float, expense: float, title: str, styled: bool = False) -> dict:
+    """
+    styled — кольори й підпис осі, як у місячному звіті.
+    """
+    return {"kind": "totals_bar", "title": title, "income": income, "expense": expense, "styled": styled}
+
+
+def currency_spec(usd, eur, btc, eth, stale, fiat_title: str, crypto_title: str) -> dict:
+    """
+    usd/eur/btc/eth: [(date, value), …]; stale — коди з підставленим останнім відомим курсом.
+    """
+    def points(series):
+        return [[d.isoformat(), v] for d, v in series]
+
+    return {
+        "kind": "currency", "fiat_title": fiat_title, "crypto_title": crypto_title,
+        "usd": points(usd), "eur": points(eur), "btc": points(btc), "eth": points(eth),
+        "stale": sorted(stale),
+    }
@@ -9,9 +9,31 @@ load_dotenv()
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# Database tuning (optional)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))  # server databases only
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # seconds
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000'))
+
+# Chart rendering: worker processes for report charts (0 renders in the handler thread)
+CHART_WORKERS = int(os.getenv('CHART_WORKERS', '2'))
+CHART_CACHE_MB = int(os.getenv('CHART_CACHE_MB', '32'))  # rendered PNGs kept in memory
+
+# Webhook mode (optional): set WEBHOOK_URL to receive updates over HTTPS instead of polling
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')  # public URL Telegram posts to, e.g. https://bot.example.com/telegram
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')  # checked against X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '8080'))
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', '8'))
+WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', '256'))
+
 # Validate required environment variables
 if not BOT_TOKEN:
     raise ValueError("BOT_TOKEN is not set in the environment (.env)")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in the environment (.env)")
+if WEBHOOK_URL and not WEBHOOK_SECRET:
+    raise ValueError("WEBHOOK_SECRET must be set when WEBHOOK_URL is used")
 
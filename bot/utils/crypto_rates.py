@@ -0,0 +1,149 @@
+# utils/crypto_rates.py
+"""
+Курси криптовалют з CoinGecko (market_chart) зі спільним TTL-кешем.
+
+Ряд денних цін завантажується один раз на (монета, валюта, глибина в днях)
+і далі будь-який місяць чи довільний період вирізається з кешу. Закриваючі
+ціни завершених днів зберігаються в таблиці crypto_prices (див. utils/rate_warmer.py).
+"""
+import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy.exc import IntegrityError
+
+from bot.models.crypto_price import CryptoPrice
+from bot.utils.cache import TTLCache
+from bot.utils.resilience import MIN_FAILURE_TIMEOUT, CircuitBreaker, CircuitOpenError
+
+COINGECKO_MARKET_CHART_URL = "https://api.coingecko.com/api/v3/coins/{coin}/market_chart"
+REQUEST_TIMEOUT = 10
+
+# Глибина рядів, які кешуються (днів від сьогодні); "max" — уся історія
+DAY_BUCKETS = (30, 90, 365, "max")
+
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+
+_series_cache = TTLCache(maxsize=32, ttl=60 * 60)
+
+# Після трьох невдач поспіль CoinGecko не опитується хвилину
+breaker = CircuitBreaker("coingecko", failure_threshold=3, reset_timeout=60)
+
+
+def _bucket_for(days_needed: int):
+    for bucket in DAY_BUCKETS:
+        if bucket == "max" or days_needed <= bucket:
+            return bucket
+
+
+def _download_market_chart(coin: str, vs_currency: str, days, timeout: float) -> list:
+    url = COINGECKO_MARKET_CHART_URL.format(coin=coin)
+    params = {"vs_currency": vs_currency, "days": days, "interval": "daily"}
+    resp = _http.get(url, params=params, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json().get("prices", [])  # [[timestamp_ms, price], …]
+
+
+def fetch_market_chart(coin: str, vs_currency: str, days, timeout: float = REQUEST_TIMEOUT) -> dict:
+    """
+    Завантажує денні ціни coin→vs_currency за останні `days` днів: {date: price}.
+    Для кожної дати лишається остання (закриваюча) ціна.
+    Кидає requests.RequestException / ValueError, якщо CoinGecko недоступний,
+    і CircuitOpenError, якщо запобіжник розімкнено.
+    """
+    # Залишок дедлайну, коротший за MIN_FAILURE_TIMEOUT, не свідчить про збій CoinGecko
+    inconclusive = (requests.Timeout,) if timeout < MIN_FAILURE_TIMEOUT else ()
+    prices = breaker.call(_download_market_chart, coin, vs_currency, days, timeout, inconclusive=inconclusive)
+    series = {}
+    for timestamp_ms, price in prices:
+        d_obj = datetime.datetime.utcfromtimestamp(timestamp_ms / 1000.0).date()
+        series[d_obj] = price
+    return series
+
+
+def get_series(coin: str, vs_currency: str, start: datetime.date, deadline=None) -> dict:
+    """
+    Повертає кешований ряд {date: price}, що сягає щонайменше до start.
+    Завантаження (якщо потрібне) триває не довше, ніж лишилося в deadline.
+    """
+    vs_currency = vs_currency.lower()
+    days_needed = (datetime.date.today() - start).days + 1
+    bucket = _bucket_for(max(days_needed, 1))
+
+    # Довший свіжий ряд у кеші теж підходить
+    for longer in DAY_BUCKETS[DAY_BUCKETS.index(bucket):]:
+        cached = _series_cache.get((coin, vs_currency, longer))
+        if cached is not None:
+            return cached
+
+    return _series_cache.get_or_load(
+        (coin, vs_currency, bucket),
+        lambda: fetch_market_chart(
+            coin, vs_currency, bucket,
+            timeout=deadline.timeout(REQUEST_TIMEOUT) if deadline else REQUEST_TIMEOUT
+        )
+    )
+
+
+def get_timeseries(coin: str, vs_currency: str, start: datetime.date, end: datetime.date) -> list:
+    """
+    Повертає список (date, price) для криптовалюти coin за період [start, end].
+    Порожній список, якщо даних немає і CoinGecko недоступний.
+    """
+    try:
+        series = get_series(coin, vs_currency, start)
+    except (CircuitOpenError, requests.RequestException, ValueError):
+        return []
+    return sorted((d, p) for d, p in series.items() if start <= d <= end)
+
+
+def store_prices(session, coin: str, vs_currency: str, prices: dict):
+    """
+    Зберігає {date: price} у crypto_prices, пропускаючи вже записані дні.
+    """
+    for day, price in prices.items():
+        try:
+            with session.begin_nested():
+                session.add(CryptoPrice(coin=coin, vs_currency=vs_currency, date=day, price=price))
+        except IntegrityError:
+            pass
+    session.commit()
+
+
+def store_closes(session, coin: str, vs_currency: str, series: dict,
+                 start: datetime.date, end: datetime.date) -> dict:
+    """
+    Зберігає ціни лише завершених днів ряду series з [start, end] і повертає їх.
+    """
+    last_closed_day = min(end, datetime.date.today() - datetime.timedelta(days=1))
+    closes = {d: p for d, p in series.items() if start <= d <= last_closed_day}
+    if closes:
+        store_prices(session, coin, vs_currency, closes)
+    return closes
+
+
+def last_known_price(session, coin: str, vs_currency: str, before: datetime.date):
+    """
+    Остання збережена закриваюча ціна coin до дати before (або None).
+    """
+    row = session.query(CryptoPrice.price).filter(
+        CryptoPrice.coin == coin,
+        CryptoPrice.vs_currency == vs_currency.lower(),
+        CryptoPrice.date < before
+    ).order_by(CryptoPrice.date.desc()).first()
+    return row[0] if row else None
+
+
+def get_stored_timeseries(session, coin: str, vs_currency: str,
+                          start: datetime.date, end: datetime.date) -> list:
+    """
+    Повертає збережені (date, price) за період одним діапазонним запитом, без мережі.
+    """
+    rows = session.query(CryptoPrice.date, CryptoPrice.price).filter(
+        CryptoPrice.coin == coin,
+        CryptoPrice.vs_currency == vs_currency.lower(),
+        CryptoPrice.date >= start,
+        CryptoPrice.date <= end
+    ).order_by(CryptoPrice.date).all()
+    return [(d, p) for d, p in rows]
@@ -0,0 +1,142 @@
+# utils/csv_import.py
+"""
+Імпорт транзакцій з CSV (власний формат або виписка банку).
+
+Файл читається потоком рядок за рядком, категорії зіставляються з одного
+попередньо завантаженого словника, транзакції вставляються пакетами по
+BATCH_SIZE рядків одним executemany. Денні підсумки й MonthlyMetric
+оновлюються один раз наприкінці, у тому ж commit, що й останній пакет.
+
+Очікувані колонки (заголовок обов'язковий, регістр не важливий):
+    date, amount, category[, type][, note]
+date — YYYY-MM-DD[ HH:MM[:SS]] або DD.MM.YYYY; якщо колонки type немає,
+від'ємна сума — витрата, додатна — дохід.
+"""
+import csv
+import datetime
+
+from bot.models.category import Category
+from bot.models.transaction import Transaction
+from bot.utils import category_cache, chart_cache, money, monthly_metrics, rollups
+
+BATCH_SIZE = 5000
+# Скільки номерів рядків з помилками повертати користувачу
+MAX_REPORTED_ERRORS = 20
+
+REQUIRED_COLUMNS = ("date", "amount", "category")
+TYPE_ALIASES = {
+    "expense": "expense",
+    "витрата": "expense",
+    "income": "income",
+    "дохід": "income",
+}
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.error_lines = []
+        self.created_categories = []
+
+
+def parse_date(text: str) -> datetime.datetime:
+    text = text.strip()
+    if "." in text[:6]:
+        return datetime.datetime.strptime(text[:10], "%d.%m.%Y")
+    return datetime.datetime.fromisoformat(text)
+
+
+def parse_row(row: dict) -> tuple:
+    """
+    Рядок CSV → (date, type, amount_minor, category_name, note); ValueError для зіпсованих рядків.
+    """
+    # Короткий рядок без частини колонок дає None — це такий самий зіпсований рядок
+    date = parse_date(row["date"] or "")
+    amount_minor = money.parse_amount(row["amount"] or "")
+    raw_type = (row.get("type") or "").strip().lower()
+    if raw_type:
+        ttype = TYPE_ALIASES.get(raw_type)
+        if ttype is None:
+            raise ValueError(f"unknown type: {raw_type!r}")
+    else:
+        ttype = "expense" if amount_minor < 0 else "income"
+    name = (row["category"] or "").strip()
+    if not name:
+        raise ValueError("empty category")
+    return date, ttype, abs(amount_minor), name, (row.get("note") or "").strip()
+
+
+def import_csv(session, user_id: int, lines, batch_size: int = BATCH_SIZE) -> ImportResult:
+    """
+    Імпортує транзакції з ітератора текстових рядків CSV (наприклад, потоку файлу).
+    Комітить сесію. ValueError, якщо в заголовку немає обов'язкових колонок.
+    """
+    reader = csv.DictReader(lines, restval="")
+    reader.fieldnames = [name.strip().lower() for name in (reader.fieldnames or [])]
+    missing = [col for col in REQUIRED_COLUMNS if col not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+
+    result = ImportResult()
+    lookup = {
+        (cat.type, cat.name): cat.id
+        for cat in category_cache.get_categories(session, user_id)
+    }
+    table = Transaction.__table__
+    batch = []
+    # (день, category_id, тип) → [копійки, кількість] для денних підсумків
+    deltas = {}
+
+    for row in reader:
+        try:
+            date, ttype, amount_minor, name, note = parse_row(row)
+        except (ValueError, KeyError, TypeError):
+            result.skipped += 1
+            if len(result.error_lines) < MAX_REPORTED_ERRORS:
+                result.error_lines.append(reader.line_num)
+            continue
+
+        category_id = lookup.get((ttype, name))
+        if category_id is None:
+            category = Category(name=name, type=ttype, is_default=False, user_id=user_id)
+            session.add(category)
+            session.flush()
+            category_id = lookup[(ttype, name)] = category.id
+            result.created_categories.append(name)
+
+        batch.append({
+            "amount_minor": amount_minor,
+            "date": date,
+            "type": ttype,
+            "note": note,
+            "user_id": user_id,
+            "category_id": category_id,
+        })
+        key = (date.date(), category_id, ttype)
+        delta = deltas.setdefault(key, [0, 0])
+        delta[0] += amount_minor
+        delta[1] += 1
+
+        if len(batch) >= batch_size:
+            session.execute(table.insert(), batch)
+            result.imported += len(batch)
+            batch = []
+
+    if batch:
+        session.execute(table.insert(), batch)
+        result.imported += len(batch)
+
+    # Похідні агрегати — один раз на весь імпорт
+    months = {}
+    for (day, category_id, ttype), (total, count) in deltas.items():
+        rollups.add(session, user_id, day, category_id, ttype, total, count)
+        months.setdefault(monthly_metrics.year_month(day), day)
+    for day in months.values():
+        monthly_metrics.refresh(session, user_id, day)
+    chart_cache.mark_changed(session, user_id)
+
+    session.commit()
+    if result.created_categories:
+        category_cache.invalidate(user_id)
+    return result
@@ -0,0 +1,134 @@
+# utils/export.py
+"""
+Експорт транзакцій користувача у стиснений CSV (gzip) або Parquet.
+
+Рядки читаються з БД порціями по EXPORT_CHUNK (yield_per) і одразу пишуться
+у SpooledTemporaryFile: невеликі файли лишаються в пам'яті, великі — переїжджають
+на диск, тож багаторічний експорт не роздуває пам'ять процесу.
+Формат CSV сумісний з /import (колонки date, type, amount, category, note).
+Parquet потребує pyarrow (необов'язкова залежність).
+"""
+import csv
+import gzip
+import io
+import tempfile
+from decimal import Decimal
+
+from sqlalchemy import func, select
+
+from bot.models.category import Category
+from bot.utils import archive, money
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - залежить від середовища
+    pa = None
+    pq = None
+
+EXPORT_CHUNK = 5000
+# Скільки байтів файлу тримати в пам'яті, перш ніж перенести його на диск
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+COLUMNS = ("date", "type", "amount", "category", "note")
+# Назва для транзакцій, чию категорію видалено: експорт не губить жодного рядка,
+# а /import створить таку категорію заново
+MISSING_CATEGORY = "Без категорії"
+FORMATS = ("csv", "parquet")
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+def iter_chunks(session, user_id: int, start_dt, end_dt, chunk_size=None):
+    """
+    Порції рядків (date, type, amount_minor, назва категорії, note) у порядку (date, id).
+    """
+    src = archive.transaction_source(session, start_dt, end_dt)
+    stmt = select(
+        src.c.date, src.c.type, src.c.amount_minor, func.coalesce(Category.name, MISSING_CATEGORY), src.c.note
+    ).outerjoin(
+        Category, src.c.category_id == Category.id
+    ).where(
+        src.c.user_id == user_id,
+        src.c.date >= start_dt,
+        src.c.date <= end_dt
+    ).order_by(src.c.date, src.c.id)
+    result = session.execute(stmt.execution_options(yield_per=chunk_size or EXPORT_CHUNK))
+    try:
+        for chunk in result.partitions():
+            yield chunk
+    finally:
+        result.close()
+
+
+def write_csv(chunks, fileobj) -> int:
+    """
+    Пише порції у fileobj як gzip-стиснений CSV; повертає кількість рядків.
+    """
+    count = 0
+    with gzip.GzipFile(fileobj=fileobj, mode="wb") as gz:
+        text = io.TextIOWrapper(gz, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(COLUMNS)
+        for chunk in chunks:
+            writer.writerows(
+                (date.isoformat(sep=" "), ttype, money.format_amount(amount_minor), name, note or "")
+                for date, ttype, amount_minor, name, note in chunk
+            )
+            count += len(chunk)
+        text.flush()
+        text.detach()
+    return count
+
+
+def write_parquet(chunks, fileobj) -> int:
+    """
+    Пише порції у fileobj як Parquet (кожна порція — окрема row group); повертає кількість рядків.
+    """
+    if pq is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+    schema = pa.schema([
+        ("date", pa.timestamp("us")),
+        ("type", pa.string()),
+        ("amount", pa.decimal128(18, 2)),
+        ("category", pa.string()),
+        ("note", pa.string()),
+    ])
+    count = 0
+    with pq.ParquetWriter(fileobj, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            dates, types, amounts, names, notes = zip(*chunk)
+            writer.write_batch(pa.record_batch([
+                pa.array(dates, pa.timestamp("us")),
+                pa.array(types, pa.string()),
+                pa.array([Decimal(m).scaleb(-2) for m in amounts], pa.decimal128(18, 2)),
+                pa.array(names, pa.string()),
+                pa.array(notes, pa.string()),
+            ], schema=schema))
+            count += len(chunk)
+    return count
+
+
+def build_export(session, user_id: int, start_dt, end_dt, fmt: str = "csv"):
+    """
+    Повертає (spooled-файл на початку, ім'я файлу, кількість рядків).
+    Файл закриває виклик.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format: {fmt!r}")
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    chunks = iter_chunks(session, user_id, start_dt, end_dt)
+    try:
+        if fmt == "csv":
+            count = write_csv(chunks, spool)
+            name = f"transactions_{start_dt.date()}_{end_dt.date()}.csv.gz"
+        else:
+            count = write_parquet(chunks, spool)
+            name = f"transactions_{start_dt.date()}_{end_dt.date()}.parquet"
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, name, count
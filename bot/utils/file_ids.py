@@ -0,0 +1,104 @@
+# utils/file_ids.py
+"""
+Telegram file_id registry: content hash -> file_id of an already uploaded image.
+
+Telegram lets a bot re-send any file it has uploaded by its file_id, without
+transferring the bytes again. send_photo() hashes the PNG, sends by file_id
+when these exact bytes went out before (the shared currency chart, cached
+report charts) and uploads only new content, recording the file_id Telegram
+returns. The registry lives in the telegram_files table with an in-memory
+LRU in front of it, so repeats survive restarts and cost no query when hot.
+"""
+import hashlib
+import logging
+
+from sqlalchemy.exc import IntegrityError
+from telebot.apihelper import ApiTelegramException
+
+from bot.models import SessionLocal
+from bot.models.telegram_file import TelegramFile
+from bot.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+MAX_HOT_FILES = 4096
+# Bad Request descriptions meaning the stored file_id itself is no longer usable,
+# e.g. "wrong file identifier/HTTP URL specified", "wrong remote file identifier specified"
+STALE_FILE_ID_ERRORS = ("file identifier", "file reference", "file_reference")
+
+_file_ids = LRUCache(maxsize=MAX_HOT_FILES)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def lookup(session, digest: str):
+    """
+    Returns the file_id recorded for digest, or None.
+    """
+    file_id = _file_ids.get(digest)
+    if file_id is not None:
+        return file_id
+    row = session.query(TelegramFile.file_id).filter(TelegramFile.content_hash == digest).first()
+    if row is None:
+        return None
+    _file_ids.set(digest, row[0])
+    return row[0]
+
+
+def remember(session, digest: str, file_id: str, size: int):
+    """
+    Records (or replaces) the file_id for digest and commits.
+    """
+    _file_ids.set(digest, file_id)
+    row = session.get(TelegramFile, digest)
+    if row is not None:
+        row.file_id = file_id
+        session.commit()
+        return
+    try:
+        session.add(TelegramFile(content_hash=digest, file_id=file_id, size=size))
+        session.commit()
+    except IntegrityError:
+        # Another worker uploaded the same bytes at the same time; either file_id works
+        session.rollback()
+
+
+def forget(session, digest: str):
+    _file_ids.invalidate(digest)
+    session.query(TelegramFile).filter(TelegramFile.content_hash == digest).delete()
+    session.commit()
+
+
+def is_stale_file_id(error: ApiTelegramException) -> bool:
+    description = (error.description or "").lower()
+    return error.error_code == 400 and any(marker in description for marker in STALE_FILE_ID_ERRORS)
+
+
+def send_photo(bot, chat_id, photo: bytes, **kwargs):
+    """
+    bot.send_photo() that uploads each distinct image only once.
+    Falls back to uploading when Telegram rejects a stored file_id (e.g. after a bot token change).
+    """
+    digest = content_hash(photo)
+    session = SessionLocal()
+    try:
+        file_id = lookup(session, digest)
+        if file_id is not None:
+            try:
+                return bot.send_photo(chat_id, file_id, **kwargs)
+            except ApiTelegramException as e:
+                # Other 400s (chat not found, bad caption, ...) would fail on upload too
+                if not is_stale_file_id(e):
+                    raise
+                logger.warning("file_ids: stored file_id for %s rejected, uploading again", digest[:12])
+                forget(session, digest)
+        message = bot.send_photo(chat_id, photo, **kwargs)
+        sizes = getattr(message, "photo", None)
+        if sizes:
+            # The largest size is the original; any size's file_id re-sends the photo
+            remember(session, digest, sizes[-1].file_id, len(photo))
+        return message
+    finally:
+        session.close()
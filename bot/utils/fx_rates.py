@@ -0,0 +1,111 @@
+# utils/fx_rates.py
+"""
+Спільне сховище офіційних курсів НБУ.
+
+Кожен історичний курс (валюта, дата) завантажується з bank.gov.ua лише один раз
+для всього деплою (див. utils/nbu_client.py), а далі читається з таблиці fx_rates
+одним діапазонним запитом.
+"""
+import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from bot.models.fx_rate import FxRate
+from bot.utils import nbu_client
+
+
+def store_rates(session, currency: str, rates: dict):
+    """
+    Зберігає {date: rate} у fx_rates. Дати, які вже записав інший процес,
+    тихо пропускаються (курс за минулий день НБУ не змінює).
+    """
+    for day, rate in rates.items():
+        try:
+            with session.begin_nested():
+                session.add(FxRate(currency=currency, date=day, rate=rate))
+        except IntegrityError:
+            pass
+    session.commit()
+
+
+def get_rates_many(session, codes, start: datetime.date, end: datetime.date,
+                   fetch_missing: bool = True, deadline=None) -> dict:
+    """
+    Повертає {code: {date: rate}} для кількох валют за діапазон [start, end].
+    Відсутні в БД дні (не пізніше сьогодні) довантажуються з НБУ одним
+    діапазонним запитом на валюту, валюти — паралельно, не довше за deadline.
+    З fetch_missing=False читається лише сховище (без звернень до мережі).
+    """
+    codes = list(codes)
+    rows = session.query(FxRate.currency, FxRate.date, FxRate.rate).filter(
+        FxRate.currency.in_(codes),
+        FxRate.date >= start,
+        FxRate.date <= end
+    ).all()
+    result = {code: {} for code in codes}
+    for code, d, r in rows:
+        result[code][d] = r
+    if not fetch_missing:
+        return result
+
+    # Охоплюємо всі пропущені дні всіх валют одним спільним періодом
+    missing = []
+    last_day = min(end, datetime.date.today())
+    for code in codes:
+        cur = start
+        while cur <= last_day:
+            if cur not in result[code]:
+                missing.append((code, cur))
+            cur += datetime.timedelta(days=1)
+    if not missing:
+        return result
+
+    fetch_codes = sorted({code for code, _ in missing})
+    fetch_start = min(d for _, d in missing)
+    fetch_end = max(d for _, d in missing)
+    fetched = nbu_client.fetch_ranges(fetch_codes, fetch_start, fetch_end, deadline=deadline)
+    for code, rates in fetched.items():
+        new_rates = {d: r for d, r in rates.items() if d not in result[code]}
+        if new_rates:
+            store_rates(session, code, new_rates)
+            result[code].update(new_rates)
+    return result
+
+
+def last_known_rate(session, currency: str, before: datetime.date):
+    """
+    Останній збережений курс currency до дати before (або None).
+    """
+    row = session.query(FxRate.rate).filter(
+        FxRate.currency == currency,
+        FxRate.date < before
+    ).order_by(FxRate.date.desc()).first()
+    return row[0] if row else None
+
+
+def get_rates(session, currency: str, start: datetime.date, end: datetime.date) -> dict:
+    """
+    Повертає {date: rate} для currency за діапазон [start, end].
+    """
+    return get_rates_many(session, [currency], start, end)[currency]
+
+
+def get_timeseries(session, currency: str, start: datetime.date, end: datetime.date) -> list:
+    """
+    Повертає відсортований список (date, rate) для графіків.
+    """
+    return sorted(get_rates(session, currency, start, end).items())
+
+
+def average(rates: dict) -> float:
+    """
+    Середнє значення {date: rate} (0.0, якщо даних немає).
+    """
+    return (sum(rates.values()) / len(rates)) if rates else 0.0
+
+
+def get_avg_rate(session, currency: str, start: datetime.date, end: datetime.date) -> float:
+    """
+    Середній курс currency→UAH за діапазон дат (0.0, якщо даних немає).
+    """
+    return average(get_rates(session, currency, start, end))
@@ -0,0 +1,79 @@
+# utils/ledger.py
+"""
+Запис транзакцій разом із похідними даними.
+
+Кожна функція змінює транзакцію, денні підсумки (rollups) і MonthlyMetric
+у транзакції сесії виклику; commit робить обробник. Після commit версія даних
+користувача зростає, тож закешовані графіки (utils/chart_cache.py) застарівають.
+"""
+import datetime
+
+from bot.models.transaction import Transaction
+from bot.utils import chart_cache, monthly_metrics, rollups
+
+
+def add_transaction(session, user_id: int, category_id: int, ttype: str, amount_minor: int,
+                    note: str = "", date=None) -> Transaction:
+    tx = Transaction(
+        amount_minor=amount_minor,
+        date=date or datetime.datetime.utcnow(),
+        type=ttype,
+        note=note,
+        user_id=user_id,
+        category_id=category_id
+    )
+    session.add(tx)
+    rollups.record(session, tx)
+    monthly_metrics.refresh(session, user_id, tx.date.date())
+    chart_cache.mark_changed(session, user_id)
+    return tx
+
+
+def add_transactions(session, user_id: int, entries, date=None) -> list:
+    """
+    Додає кілька транзакцій одним пакетом; entries — [(type, amount_minor, category_id, note), …].
+    Метрика кожного зачепленого місяця перераховується один раз.
+    """
+    date = date or datetime.datetime.utcnow()
+    txs = []
+    for ttype, amount_minor, category_id, note in entries:
+        tx = Transaction(
+            amount_minor=amount_minor,
+            date=date,
+            type=ttype,
+            note=note,
+            user_id=user_id,
+            category_id=category_id
+        )
+        txs.append(tx)
+    session.add_all(txs)
+    for tx in txs:
+        rollups.record(session, tx)
+    for day in {tx.date.date().replace(day=1) for tx in txs}:
+        monthly_metrics.refresh(session, user_id, day)
+    chart_cache.mark_changed(session, user_id)
+    return txs
+
+
+def update_transaction(session, tx: Transaction, **changes) -> Transaction:
+    """
+    Змінює поля транзакції (amount_minor, date, type, note, category_id).
+    """
+    old_day = tx.date.date()
+    rollups.discard(session, tx)
+    for field, value in changes.items():
+        setattr(tx, field, value)
+    rollups.record(session, tx)
+    monthly_metrics.refresh(session, tx.user_id, old_day)
+    if monthly_metrics.year_month(tx.date.date()) != monthly_metrics.year_month(old_day):
+        monthly_metrics.refresh(session, tx.user_id, tx.date.date())
+    chart_cache.mark_changed(session, tx.user_id)
+    return tx
+
+
+def delete_transaction(session, tx: Transaction):
+    user_id, day = tx.user_id, tx.date.date()
+    rollups.discard(session, tx)
+    session.delete(tx)
+    monthly_metrics.refresh(session, user_id, day)
+    chart_cache.mark_changed(session, user_id)
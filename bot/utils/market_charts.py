@@ -0,0 +1,155 @@
+# utils/market_charts.py
+"""
+Спільні графіки курсів валют (USD/EUR → UAH, BTC/ETH → USD).
+
+Графік не містить даних користувача, тож малюється один раз на (період, набір
+валют), а всі наступні запити лише читають готові байти:
+- закритий період (закінчився до сьогодні) зберігається в таблиці market_charts
+  і в пам'яті процесу;
+- відкритий період тримається лише в пам'яті й лише до кінця дня;
+- графік із підставленими «застарілими» курсами не зберігається — наступний
+  запит спробує отримати точні курси.
+
+На початку місяця планувальник малює графік щойно закритого місяця заздалегідь
+(pregenerate_closed_month), тож місячні звіти його вже не малюють.
+"""
+import datetime
+import logging
+import threading
+
+from bot.models import SessionLocal
+from bot.models.market_chart import MarketChart
+from bot.utils import charts, rate_lookup
+from bot.utils.cache import SizedLRUCache
+from bot.utils.render_service import renderer
+from bot.utils.resilience import Deadline
+
+logger = logging.getLogger(__name__)
+
+FIAT = ("USD", "EUR")
+CRYPTO = ("bitcoin", "ethereum")
+# Скільки байтів готових графіків тримати в пам'яті
+MAX_BYTES = 8 * 1024 * 1024
+# Фонова генерація може чекати на провайдерів довше, ніж звіт
+PREGENERATE_DEADLINE = 30.0
+
+_charts = SizedLRUCache(max_bytes=MAX_BYTES)
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def currency_set(fiat=FIAT, crypto=CRYPTO) -> str:
+    return ",".join(fiat) + "|" + ",".join(crypto)
+
+
+CURRENCIES = currency_set()
+
+
+def _is_closed(end: datetime.date, today: datetime.date) -> bool:
+    return end < today
+
+
+def _memory_key(start: datetime.date, end: datetime.date, today: datetime.date) -> tuple:
+    # Графік відкритого періоду змінюється щодня, тож до ключа входить сьогоднішня дата
+    return start, end, CURRENCIES, None if _is_closed(end, today) else today
+
+
+def cached(session, start: datetime.date, end: datetime.date, today=None):
+    """
+    Готовий PNG за період або None.
+    """
+    today = today or datetime.date.today()
+    key = _memory_key(start, end, today)
+    png = _charts.get(key)
+    if png is None and _is_closed(end, today):
+        row = session.get(MarketChart, (start, end, CURRENCIES))
+        if row is not None:
+            png = row.png
+            _charts.set(key, png)
+    return png
+
+
+def build_spec(session, start: datetime.date, end: datetime.date, deadline=None) -> tuple:
+    """
+    (специфікація графіка, множина застарілих валют) з локального сховища курсів;
+    пропуски довантажуються не довше за deadline.
+    """
+    deadline = deadline or rate_lookup.new_deadline()
+    rates, stale_fiat = rate_lookup.fiat_rates(session, FIAT, start, end, deadline)
+    crypto, stale_crypto = rate_lookup.crypto_timeseries(session, CRYPTO, "usd", start, end, deadline)
+    stale = stale_fiat | stale_crypto
+    spec = charts.currency_spec(
+        sorted(rates["USD"].items()), sorted(rates["EUR"].items()),
+        crypto["bitcoin"], crypto["ethereum"], stale,
+        f"Курси USD та EUR → UAH ({start} – {end})", f"Курси BTC та ETH → USD ({start} – {end})"
+    )
+    return spec, stale
+
+
+def store(session, start: datetime.date, end: datetime.date, png: bytes, stale, today=None):
+    """
+    Запам'ятовує графік; закритий період — ще й у market_charts (commit).
+    Графік із застарілими курсами не зберігається.
+    """
+    if stale:
+        return
+    today = today or datetime.date.today()
+    _charts.set(_memory_key(start, end, today), png)
+    if _is_closed(end, today):
+        session.merge(MarketChart(period_start=start, period_end=end, currencies=CURRENCIES, png=png))
+        session.commit()
+
+
+def _lock_for(key) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def get_chart(session, start: datetime.date, end: datetime.date, deadline=None, today=None) -> tuple:
+    """
+    (PNG, застарілі валюти) за період. Якщо графіка ще немає, його малює лише
+    перший запит; одночасні запити того ж періоду чекають на нього.
+    """
+    today = today or datetime.date.today()
+    png = cached(session, start, end, today)
+    if png is not None:
+        return png, set()
+    key = _memory_key(start, end, today)
+    lock = _lock_for(key)
+    try:
+        with lock:
+            png = cached(session, start, end, today)
+            if png is not None:
+                return png, set()
+            spec, stale = build_spec(session, start, end, deadline)
+            png = renderer.render(spec)
+            store(session, start, end, png, stale, today)
+    finally:
+        # Хто вже чекає, тримає свій lock; нові запити знайдуть графік у кеші.
+        # Прибирається лише власний lock: під ключем може бути вже lock пізнішого запиту
+        with _locks_guard:
+            if _locks.get(key) is lock:
+                del _locks[key]
+    return png, stale
+
+
+def pregenerate_closed_month(today=None) -> bool:
+    """
+    Задача планувальника: малює й зберігає графік місяця, що щойно закінчився.
+    False, якщо частину курсів отримати не вдалося (графік тоді намалює перший звіт).
+    """
+    today = today or datetime.date.today()
+    end = today.replace(day=1) - datetime.timedelta(days=1)
+    start = end.replace(day=1)
+    session = SessionLocal()
+    try:
+        _, stale = get_chart(session, start, end, Deadline(PREGENERATE_DEADLINE), today)
+    finally:
+        session.close()
+    if stale:
+        logger.warning("market chart %s: stale rates for %s, not stored", start.strftime("%Y-%m"), sorted(stale))
+    return not stale
+
+
+def clear():
+    _charts.clear()
@@ -0,0 +1,56 @@
+# utils/menus.py
+"""
+Reply keyboards shared by the threaded handlers and the asyncio bot.
+"""
+from telebot import types
+
+BACK = "🔙 Назад"
+
+
+def main_menu() -> types.ReplyKeyboardMarkup:
+    markup = types.ReplyKeyboardMarkup(row_width=2, resize_keyboard=True)
+    markup.add(
+        types.KeyboardButton("➕ Витрата"),
+        types.KeyboardButton("➕ Дохід"),
+        types.KeyboardButton("📂 Категорії"),
+        types.KeyboardButton("📆 Звіт за період"),
+        types.KeyboardButton("📅 Щомісячний звіт")
+    )
+    return markup
+
+
+def categories_menu() -> types.ReplyKeyboardMarkup:
+    markup = types.ReplyKeyboardMarkup(row_width=1, resize_keyboard=True)
+    markup.add(
+        types.KeyboardButton("📑 Всі категорії"),
+        types.KeyboardButton("➕ Додати категорію"),
+        types.KeyboardButton("✏️ Редагувати категорію"),
+        types.KeyboardButton("🗑️ Видалити категорію"),
+        types.KeyboardButton(BACK)
+    )
+    return markup
+
+
+def report_menu() -> types.ReplyKeyboardMarkup:
+    markup = types.ReplyKeyboardMarkup(row_width=2, resize_keyboard=True)
+    markup.add(
+        types.KeyboardButton("📊 Круговий по категоріям"),
+        types.KeyboardButton("📈 Лінійний по дням"),
+        types.KeyboardButton("📑 Зведений"),
+        types.KeyboardButton("📝 Транзакції"),
+        types.KeyboardButton("📊 Звіт по валютам"),
+        types.KeyboardButton(BACK)
+    )
+    return markup
+
+
+def choice_menu(*labels, back: bool = True) -> types.ReplyKeyboardMarkup:
+    """
+    One-time keyboard with one button per label (and "🔙 Назад").
+    """
+    markup = types.ReplyKeyboardMarkup(one_time_keyboard=True, resize_keyboard=True)
+    for label in labels:
+        markup.add(types.KeyboardButton(label))
+    if back:
+        markup.add(types.KeyboardButton(BACK))
+    return markup
@@ -0,0 +1,46 @@
+# utils/money.py
+"""
+Money is stored as integer minor units (kopecks): exact sums, no float drift.
+Conversion to/from hryvnias happens only at the edges — user input and report output.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+MINOR_UNITS = 100
+_CENT = Decimal("0.01")
+
+
+def to_minor(value) -> int:
+    """
+    Converts an amount in hryvnias (int, float, Decimal or str) to kopecks.
+    """
+    try:
+        amount = Decimal(str(value).strip().replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"invalid amount: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"invalid amount: {value!r}")
+    return int(amount.quantize(_CENT, rounding=ROUND_HALF_UP) * MINOR_UNITS)
+
+
+def from_minor(minor) -> float:
+    """
+    Kopecks -> hryvnias for charts and arithmetic in reports.
+    """
+    return (minor or 0) / MINOR_UNITS
+
+
+def parse_amount(text: str) -> int:
+    """
+    Parses a user-entered amount ("150", "150.5", "150,50") into kopecks.
+    Raises ValueError for anything that is not a number.
+    """
+    return to_minor(text)
+
+
+def format_amount(minor) -> str:
+    """
+    Kopecks -> "1234.50" for messages.
+    """
+    sign = "-" if (minor or 0) < 0 else ""
+    units, cents = divmod(abs(minor or 0), MINOR_UNITS)
+    return f"{sign}{units}.{cents:02d}"
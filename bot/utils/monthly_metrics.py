@@ -0,0 +1,123 @@
+# utils/monthly_metrics.py
+"""
+MonthlyMetric, що підтримується під час запису транзакцій.
+
+Після кожної вставки, зміни чи видалення транзакції refresh() перераховує метрику
+її місяця з денних підсумків (не більше днів × категорій рядків), тож місячний
+звіт і порівняння з попереднім місяцем читають один рядок monthly_metrics.
+Середні курси (avg_usd, avg_eur) від транзакцій не залежать і записуються звітом.
+
+Рядок метрики блокується (SELECT … FOR UPDATE) до читання підсумків, тож
+паралельні записи того ж місяця перераховують його по черзі й кожен бачить
+зміни попереднього; унікальний ключ (user_id, year_month) не дає двом першим
+записам місяця створити два рядки.
+"""
+import calendar
+import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from bot.models.monthly_metric import MonthlyMetric
+from bot.utils import rollups
+
+
+def year_month(day: datetime.date) -> str:
+    return day.strftime("%Y-%m")
+
+
+def month_bounds(day: datetime.date) -> tuple:
+    """
+    (перший, останній) день місяця, до якого належить day.
+    """
+    first = day.replace(day=1)
+    last = first.replace(day=calendar.monthrange(first.year, first.month)[1])
+    return first, last
+
+
+def find(session, user_id: int, day: datetime.date):
+    return session.query(MonthlyMetric).filter(
+        MonthlyMetric.user_id == user_id,
+        MonthlyMetric.year_month == year_month(day)
+    ).first()
+
+
+def _lock(session, user_id: int, day: datetime.date):
+    """
+    Рядок метрики під блокуванням до кінця транзакції (SQLite і так пише по одному).
+    """
+    return session.query(MonthlyMetric).filter(
+        MonthlyMetric.user_id == user_id,
+        MonthlyMetric.year_month == year_month(day)
+    ).with_for_update().populate_existing().first()
+
+
+def _insert(session, user_id: int, day: datetime.date):
+    """
+    Новий рядок метрики або None, якщо його щойно створив паралельний запис.
+    """
+    metric = MonthlyMetric(user_id=user_id, year_month=year_month(day), avg_usd=0.0, avg_eur=0.0)
+    try:
+        with session.begin_nested():
+            session.add(metric)
+    except IntegrityError:
+        return None
+    return metric
+
+
+def refresh(session, user_id: int, day: datetime.date):
+    """
+    Перераховує метрику місяця з daily_rollups (створює рядок за потреби).
+    Місяць без транзакцій не має метрики: рядок видаляється, повертається None.
+    Не комітить — зміни йдуть у транзакцію виклику.
+    """
+    first, last = month_bounds(day)
+    metric = _lock(session, user_id, day)
+    rows = rollups.category_totals(session, user_id, first, last)
+    while metric is None and rows:
+        metric = _insert(session, user_id, day)
+        if metric is None:
+            # Перший запис місяця зробив паралельний обробник: чекаємо на його рядок
+            # і перечитуємо підсумки вже з його змінами
+            metric = _lock(session, user_id, day)
+            rows = rollups.category_totals(session, user_id, first, last)
+    if not rows:
+        if metric is not None:
+            session.delete(metric)
+        return None
+
+    income = 0
+    expense = 0
+    cat_expenses = {}
+    for name, ttype, total in rows:
+        total = total or 0
+        if ttype == "income":
+            income += total
+        else:
+            expense += total
+            cat_expenses[name] = cat_expenses.get(name, 0) + total
+
+    metric.total_income_minor = income
+    metric.total_expense_minor = expense
+    metric.avg_daily_expense_minor = round(expense / last.day)
+    if cat_expenses and expense > 0:
+        top_name, top_total = max(cat_expenses.items(), key=lambda x: x[1])
+        metric.top_category = top_name
+        metric.top_category_pct = top_total / expense * 100
+    else:
+        metric.top_category = None
+        metric.top_category_pct = 0.0
+    return metric
+
+
+def get_or_refresh(session, user_id: int, day: datetime.date):
+    """
+    Метрика місяця або None, якщо транзакцій не було. Для місяців, записаних
+    до появи цієї логіки, метрика рахується один раз і зберігається.
+    """
+    metric = find(session, user_id, day)
+    if metric is None:
+        metric = refresh(session, user_id, day)
+        if metric is not None:
+            session.commit()
+            session.refresh(metric)
+    return metric
@@ -0,0 +1,222 @@
+# utils/monthly_report.py
+"""
+Дані й текст місячного звіту, спільні для обох ботів
+(handlers/monthly_report_handler.py та async_bot.py).
+
+Суми, денні витрати й категорії читаються з MonthlyMetric і денних підсумків
+(collect_totals — лише БД), середні курси — зі сховища курсів НБУ з довантаженням
+пропусків у межах ліміту часу (collect_rates — може звертатися до мережі).
+"""
+import datetime
+
+from bot.models.monthly_metric import MonthlyMetric
+from bot.utils import aggregates, charts, fx_rates, money, monthly_metrics, rate_lookup, rollups
+
+
+def previous_month(today: datetime.date) -> tuple:
+    """
+    (перший, останній) день місяця перед today.
+    """
+    end = today.replace(day=1) - datetime.timedelta(days=1)
+    return end.replace(day=1), end
+
+
+def empty_data() -> dict:
+    return {
+        "total_income": 0.0,
+        "total_expense": 0.0,
+        "daily_expenses": {},
+        "cat_expenses": {},
+        "cat_incomes": {},
+        "avg_usd": 0.0,
+        "avg_eur": 0.0,
+        "stale_rates": set()
+    }
+
+
+# --------------------------------------------
+# 1. Суми, денні витрати й категорії з агрегатів
+# --------------------------------------------
+def collect_totals(session, user_id: int, start_dt: datetime.date, end_dt: datetime.date) -> dict:
+    # -------- 1.1. Загальні суми доходів і витрат (рядок monthly_metrics) --------
+    metric = monthly_metrics.get_or_refresh(session, user_id, start_dt)
+    total_income = metric.total_income if metric else 0.0
+    total_expense = metric.total_expense if metric else 0.0
+
+    # -------- 1.2. Денні витрати --------
+    daily_expenses = {}
+    cur_date = start_dt
+    while cur_date <= end_dt:
+        daily_expenses[cur_date] = 0.0
+        cur_date += datetime.timedelta(days=1)
+
+    for (d, ttype), total in rollups.daily_totals(session, user_id, start_dt, end_dt).items():
+        if ttype == "expense" and d in daily_expenses:
+            daily_expenses[d] = money.from_minor(total)
+
+    # -------- 1.3. Витрати та доходи за категоріями --------
+    cat_expenses, cat_incomes = aggregates.split_by_type(
+        rollups.category_totals(session, user_id, start_dt, end_dt)
+    )
+    return {
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "daily_expenses": daily_expenses,
+        "cat_expenses": cat_expenses,
+        "cat_incomes": cat_incomes,
+    }
+
+
+# --------------------------------------------
+# 2. Середній курс USD→UAH та EUR→UAH (сховище курсів НБУ, з лімітом часу)
+# --------------------------------------------
+def collect_rates(session, start_dt: datetime.date, end_dt: datetime.date, deadline=None) -> dict:
+    rates, stale_rates = rate_lookup.fiat_rates(
+        session, ("USD", "EUR"), start_dt, end_dt, deadline or rate_lookup.new_deadline()
+    )
+    return {
+        "avg_usd": fx_rates.average(rates["USD"]),
+        "avg_eur": fx_rates.average(rates["EUR"]),
+        "stale_rates": stale_rates
+    }
+
+
+# --------------------------------------------
+# 3. Порівняння з попереднім місяцем → текст
+# --------------------------------------------
+def build_comparison_text(prev_metric: MonthlyMetric, data: dict, start_dt: datetime.date) -> str:
+    if not prev_metric:
+        return "Немає даних за попередній місяць для порівняння.\n"
+
+    txt = ""
+    # 3.1. Доходи
+    diff_inc = data["total_income"] - prev_metric.total_income
+    pct_inc = (diff_inc / prev_metric.total_income * 100) if prev_metric.total_income else 0.0
+    arrow_inc = "🔺" if diff_inc >= 0 else "🔻"
+    txt += f"Доходи: {data['total_income']:.2f} ({arrow_inc} {abs(pct_inc):.1f}% )\n"
+
+    # 3.2. Витрати
+    diff_exp = data["total_expense"] - prev_metric.total_expense
+    pct_exp = (diff_exp / prev_metric.total_expense * 100) if prev_metric.total_expense else 0.0
+    arrow_exp = "🔺" if diff_exp >= 0 else "🔻"
+    txt += f"Витрати: {data['total_expense']:.2f} ({arrow_exp} {abs(pct_exp):.1f}% )\n"
+
+    # 3.3. Середня добова витрата
+    days_in_month = len(data["daily_expenses"])
+    avg_daily = data["total_expense"] / days_in_month if days_in_month else 0.0
+    diff_avg = avg_daily - prev_metric.avg_daily_expense
+    pct_avg = (diff_avg / prev_metric.avg_daily_expense * 100) if prev_metric.avg_daily_expense else 0.0
+    arrow_avg = "🔺" if diff_avg >= 0 else "🔻"
+    txt += f"Середня добова витрата: {avg_daily:.2f} ({arrow_avg} {abs(pct_avg):.1f}% )\n"
+
+    # 3.4. Топ-категорія
+    if prev_metric.top_category == data["cat_expenses"] and prev_metric.top_category:
+        txt += f"Найбільша категорія витрат залишилася: {prev_metric.top_category} ({prev_metric.top_category_pct:.1f}%)\n"
+    else:
+        if data["cat_expenses"]:
+            top_cat_name, top_cat_amt = max(data["cat_expenses"].items(), key=lambda x: x[1])
+            share = top_cat_amt / data["total_expense"] * 100 if data["total_expense"] else 0.0
+            txt += f"Топ-категорія витрат змінилася: {top_cat_name} — {top_cat_amt:.2f} грн ({share:.1f}%)({prev_metric.top_category} ({prev_metric.top_category_pct:.1f}%))\n"
+
+    return txt + "\n"
+
+
+# --------------------------------------------
+# 4. Специфікація кругових діаграм
+# --------------------------------------------
+def pie_charts_spec(cat_expenses: dict, cat_incomes: dict, start_dt: datetime.date, end_dt: datetime.date) -> dict:
+    return charts.category_pies_spec(
+        cat_expenses, cat_incomes, f"Категорії: {start_dt}–{end_dt}",
+        empty_expenses="Немає витрат", empty_incomes="Немає доходів", startangle=90
+    )
+
+
+# --------------------------------------------
+# 5. Специфікація лінійного графіку денних витрат
+# --------------------------------------------
+def daily_line_spec(daily_expenses: dict, start_dt: datetime.date, end_dt: datetime.date) -> dict:
+    return charts.daily_expenses_spec(daily_expenses, f"Добові витрати: {start_dt}–{end_dt}")
+
+
+# --------------------------------------------
+# 6. Специфікація стовпчикової діаграми зведених сум
+# --------------------------------------------
+def summary_bar_spec(total_income: float, total_expense: float, start_dt: datetime.date, end_dt: datetime.date) -> dict:
+    return charts.totals_bar_spec(total_income, total_expense, f"Зведений звіт: {start_dt}–{end_dt}", styled=True)
+
+
+# Графіки користувача в порядку надсилання та їхні імена в chart_cache
+USER_CHARTS = ("monthly_pies", "monthly_daily", "monthly_summary")
+
+
+def user_chart_specs(data: dict, start_dt: datetime.date, end_dt: datetime.date) -> list:
+    return [
+        pie_charts_spec(data["cat_expenses"], data["cat_incomes"], start_dt, end_dt),
+        daily_line_spec(data["daily_expenses"], start_dt, end_dt),
+        summary_bar_spec(data["total_income"], data["total_expense"], start_dt, end_dt),
+    ]
+
+
+# --------------------------------------------
+# 7. Форматуємо текстовий підсумок
+# --------------------------------------------
+def format_text_report(data: dict, comparison_text: str, start_dt: datetime.date, end_dt: datetime.date) -> str:
+    total_income = data["total_income"]
+    total_expense = data["total_expense"]
+    balance = total_income - total_expense
+    days_count = len(data["daily_expenses"])
+    avg_daily = (total_expense / days_count) if days_count else 0.0
+    save_pct = (balance / total_income * 100) if total_income else 0.0
+
+    txt = f"📅 Звіт за {start_dt.strftime('%B %Y')}\n\n"
+    txt += f"• Загальні доходи: {total_income:.2f} грн\n"
+    txt += f"• Загальні витрати: {total_expense:.2f} грн\n"
+    txt += f"• Баланс (заощаджено): {balance:.2f} грн ({save_pct:.1f}% доходів)\n\n"
+    txt += "🔄 Порівняння з попереднім:\n" + comparison_text + "\n"
+
+    # Топ-3 категорії витрат
+    if data["cat_expenses"]:
+        sorted_exp = sorted(data["cat_expenses"].items(), key=lambda x: x[1], reverse=True)
+        txt += "🔥 Топ-3 категорії витрат:\n"
+        for i, (cat, amt) in enumerate(sorted_exp[:3], start=1):
+            pct = (amt / total_expense * 100) if total_expense else 0.0
+            txt += f"   {i}. {cat} — {amt:.2f} грн ({pct:.1f}%)\n"
+    else:
+        txt += "🔥 Витрат не було.\n"
+
+    # Топ-3 категорії доходів
+    if data["cat_incomes"]:
+        sorted_inc = sorted(data["cat_incomes"].items(), key=lambda x: x[1], reverse=True)
+        txt += "💰 Топ-3 категорії доходів:\n"
+        for i, (cat, amt) in enumerate(sorted_inc[:3], start=1):
+            pct = (amt / total_income * 100) if total_income else 0.0
+            txt += f"   {i}. {cat} — {amt:.2f} грн ({pct:.1f}%)\n"
+    else:
+        txt += "💰 Доходів не було.\n"
+
+    txt += f"\n• Середня добова витрата: {avg_daily:.2f} грн\n"
+    stale_rates = data.get("stale_rates", set())
+    txt += f"• Середній курс USD→UAH: {data['avg_usd']:.2f} грн{' *' if 'USD' in stale_rates else ''}\n"
+    txt += f"• Середній курс EUR→UAH: {data['avg_eur']:.2f} грн{' *' if 'EUR' in stale_rates else ''}\n"
+    if stale_rates:
+        txt += f"* {rate_lookup.STALE_NOTE}\n"
+
+    return txt
+
+
+# --------------------------------------------
+# 8. Зберігаємо середні курси в рядку monthly_metrics
+# --------------------------------------------
+def save_rates(session, user_id: int, year_month: str, data: dict):
+    """
+    Суми й топ-категорію оновлює запис транзакцій (utils/monthly_metrics.py);
+    звіт додає лише середні курси місяця. Комітить, якщо рядок є.
+    """
+    metric = session.query(MonthlyMetric).filter(
+        MonthlyMetric.user_id == user_id,
+        MonthlyMetric.year_month == year_month
+    ).first()
+    if metric:
+        metric.avg_usd = data["avg_usd"]
+        metric.avg_eur = data["avg_eur"]
+        session.commit()
@@ -0,0 +1,80 @@
+# utils/nbu_client.py
+"""
+Клієнт API НБУ для діапазонів дат.
+
+Один запит exchange_site?valcode=...&start=...&end=... повертає курс валюти
+за весь період, а спільна requests.Session тримає keep-alive з'єднання,
+тож повторні звернення не платять за TCP/TLS-рукостискання.
+"""
+import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bot.utils.resilience import MIN_FAILURE_TIMEOUT, CircuitBreaker, CircuitOpenError
+
+NBU_RANGE_URL = (
+    "https://bank.gov.ua/NBU_Exchange/exchange_site"
+    "?start={start}&end={end}&valcode={code}&sort=exchangedate&order=asc&json"
+)
+REQUEST_TIMEOUT = 10
+
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8))
+
+# Після трьох невдач поспіль НБУ не опитується хвилину
+breaker = CircuitBreaker("nbu", failure_threshold=3, reset_timeout=60)
+
+
+def _download_range(c_char_code: str, start: datetime.date, end: datetime.date, timeout: float) -> list:
+    url = NBU_RANGE_URL.format(
+        start=start.strftime("%Y%m%d"),
+        end=end.strftime("%Y%m%d"),
+        code=c_char_code.lower()
+    )
+    resp = _http.get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()  # [{"exchangedate": "01.04.2025", "cc": "USD", "rate_per_unit": 41.2, ...}, …]
+
+
+def fetch_range(c_char_code: str, start: datetime.date, end: datetime.date, deadline=None) -> dict:
+    """
+    Повертає {date: rate} для c_char_code→UAH за [start, end] одним запитом.
+    Порожній словник, якщо НБУ недоступний, розімкнено запобіжник (breaker)
+    або вичерпано час звіту (deadline, див. utils/resilience.py).
+    """
+    timeout = deadline.timeout(REQUEST_TIMEOUT) if deadline else REQUEST_TIMEOUT
+    if timeout <= 0:
+        return {}
+    # Залишок дедлайну, коротший за MIN_FAILURE_TIMEOUT, не свідчить про збій НБУ
+    inconclusive = (requests.Timeout,) if timeout < MIN_FAILURE_TIMEOUT else ()
+    try:
+        items = breaker.call(_download_range, c_char_code, start, end, timeout, inconclusive=inconclusive)
+    except (CircuitOpenError, requests.RequestException, ValueError):
+        return {}
+
+    rates = {}
+    for item in items:
+        try:
+            day = datetime.datetime.strptime(item["exchangedate"], "%d.%m.%Y").date()
+            rate = item.get("rate_per_unit") or item["rate"] / (item.get("units") or 1)
+        except (KeyError, TypeError, ValueError):
+            continue
+        rates[day] = float(rate)
+    return rates
+
+
+def fetch_ranges(codes, start: datetime.date, end: datetime.date, deadline=None) -> dict:
+    """
+    Паралельно завантажує кілька валют за один період: {code: {date: rate}}.
+    З deadline повертає лише те, що встигло прийти; решта валют — порожні.
+    """
+    codes = list(codes)
+    if not codes:
+        return {}
+    pool = ThreadPoolExecutor(max_workers=len(codes))
+    futures = {code: pool.submit(fetch_range, code, start, end, deadline) for code in codes}
+    wait(futures.values(), timeout=deadline.remaining() if deadline else None)
+    pool.shutdown(wait=False)
+    return {code: (f.result() if f.done() else {}) for code, f in futures.items()}
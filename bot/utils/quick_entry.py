@@ -0,0 +1,71 @@
+# utils/quick_entry.py
+"""
+Швидке введення кількох транзакцій одним повідомленням:
+    150 Їжа кава; 40 Транспорт; +20000 Зарплата аванс
+
+Кожен запис — сума, назва категорії (може складатися з кількох слів) і
+необов'язковий опис. Тип визначає категорія; «+» перед сумою обирає
+категорію доходу, якщо назва є серед обох типів.
+"""
+import re
+from collections import namedtuple
+
+from bot.utils import money
+
+QuickEntry = namedtuple("QuickEntry", ["type", "amount_minor", "category_id", "category_name", "note"])
+
+SEPARATOR = ";"
+_ENTRY_START = re.compile(r"^\s*\+?\d")
+
+
+def looks_like_entry(text: str) -> bool:
+    """
+    Чи схоже повідомлення на швидке введення (починається із суми).
+    """
+    return bool(text) and bool(_ENTRY_START.match(text))
+
+
+def _match_category(words: list, categories, income: bool):
+    """
+    Найдовший префікс слів, що збігається з назвою категорії (без урахування регістру).
+    Повертає (CachedCategory, кількість слів) або (None, 0).
+    """
+    by_name = {}
+    for cat in categories.entries:
+        key = cat.name.casefold()
+        preferred = (cat.type == "income") == income
+        if key not in by_name or preferred:
+            by_name[key] = cat
+    for size in range(len(words), 0, -1):
+        cat = by_name.get(" ".join(words[:size]).casefold())
+        if cat is not None:
+            return cat, size
+    return None, 0
+
+
+def parse(text: str, categories) -> tuple:
+    """
+    Розбирає повідомлення проти кешованих категорій (category_cache.UserCategories).
+    Повертає (entries, errors): errors — список частин, які не вдалося розібрати.
+    """
+    entries = []
+    errors = []
+    for part in text.split(SEPARATOR):
+        part = part.strip()
+        if not part:
+            continue
+        words = part.split()
+        raw_amount = words[0]
+        income = raw_amount.startswith("+")
+        try:
+            amount_minor = money.parse_amount(raw_amount.lstrip("+"))
+        except ValueError:
+            errors.append(part)
+            continue
+        cat, size = _match_category(words[1:], categories, income)
+        if cat is None or amount_minor <= 0:
+            errors.append(part)
+            continue
+        note = " ".join(words[1 + size:])
+        entries.append(QuickEntry(cat.type, amount_minor, cat.id, cat.name, note))
+    return entries, errors
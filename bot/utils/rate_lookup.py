@@ -0,0 +1,84 @@
+# utils/rate_lookup.py
+"""
+Пошук курсів для звітів з обмеженням часу.
+
+Порядок: локальне сховище → мережа (лише поки не вичерпано спільний deadline
+звіту і запобіжник провайдера замкнений) → останній відомий збережений курс.
+Валюти, для яких довелося підставити останній відомий курс, повертаються
+як «застарілі», щоб звіт міг це позначити.
+"""
+import datetime
+
+import requests
+
+from bot.utils import fx_rates, crypto_rates
+from bot.utils.resilience import Deadline, CircuitOpenError
+
+# Сукупний час, який один звіт може чекати на всіх провайдерів курсів, секунд
+REPORT_DEADLINE = 3.0
+
+STALE_NOTE = "⚠️ частину курсів взято з останніх відомих значень"
+
+
+def new_deadline() -> Deadline:
+    return Deadline(REPORT_DEADLINE)
+
+
+def _days(start: datetime.date, last_day: datetime.date) -> list:
+    return [start + datetime.timedelta(days=i) for i in range((last_day - start).days + 1)]
+
+
+def _fill_gaps(series: dict, days: list, last_known) -> bool:
+    """
+    Заповнює пропущені дні series попереднім відомим значенням (in-place).
+    Повертає True, якщо хоча б один день заповнено.
+    """
+    filled = False
+    prev = last_known
+    for d in days:
+        if d in series:
+            prev = series[d]
+        elif prev is not None:
+            series[d] = prev
+            filled = True
+    return filled
+
+
+def fiat_rates(session, codes, start: datetime.date, end: datetime.date, deadline: Deadline):
+    """
+    Повертає ({code: {date: rate}}, stale_codes) для курсів НБУ за [start, end].
+    """
+    codes = list(codes)
+    rates = fx_rates.get_rates_many(session, codes, start, end, deadline=deadline)
+    days = _days(start, min(end, datetime.date.today()))
+    stale = set()
+    for code in codes:
+        if len(rates[code]) < len(days):
+            last_known = fx_rates.last_known_rate(session, code, start)
+            if _fill_gaps(rates[code], days, last_known):
+                stale.add(code)
+    return rates, stale
+
+
+def crypto_timeseries(session, coins, vs_currency: str, start: datetime.date, end: datetime.date,
+                      deadline: Deadline):
+    """
+    Повертає ({coin: [(date, price), …]}, stale_coins) для закриваючих цін за [start, end].
+    """
+    days = _days(start, min(end, datetime.date.today() - datetime.timedelta(days=1)))
+    result = {}
+    stale = set()
+    for coin in coins:
+        series = dict(crypto_rates.get_stored_timeseries(session, coin, vs_currency, start, end))
+        if len(series) < len(days) and not deadline.expired:
+            try:
+                fetched = crypto_rates.get_series(coin, vs_currency, start, deadline=deadline)
+            except (CircuitOpenError, requests.RequestException, ValueError):
+                fetched = {}
+            series.update(crypto_rates.store_closes(session, coin, vs_currency, fetched, start, end))
+        if len(series) < len(days):
+            last_known = crypto_rates.last_known_price(session, coin, vs_currency, start)
+            if _fill_gaps(series, days, last_known):
+                stale.add(coin)
+        result[coin] = sorted(series.items())
+    return result, stale
@@ -0,0 +1,93 @@
+# utils/rate_warmer.py
+"""
+Попереднє завантаження курсів у локальне сховище (fx_rates, crypto_prices),
+щоб обробники звітів читали лише БД і ніколи не чекали на bank.gov.ua чи CoinGecko.
+
+Нічний запуск виконує планувальник у main.py; історію можна дозавантажити вручну:
+    python -m bot.utils.rate_warmer warm [--days N]
+    python -m bot.utils.rate_warmer backfill 2024-01-01 2024-12-31
+"""
+import argparse
+import datetime
+
+import requests
+
+from bot.models import SessionLocal
+from bot.utils import fx_rates, crypto_rates
+from bot.utils.resilience import CircuitOpenError
+
+FIAT_CURRENCIES = ("USD", "EUR")
+CRYPTO_COINS = ("bitcoin", "ethereum")
+CRYPTO_VS_CURRENCY = "usd"
+
+# Скільки останніх днів перевіряє нічний запуск (щоб закрити випадкові пропуски)
+WARM_DAYS = 7
+# Найбільший діапазон одного запиту до НБУ під час backfill
+FIAT_CHUNK_DAYS = 180
+
+
+def warm_fiat(session, start: datetime.date, end: datetime.date):
+    """
+    Довантажує відсутні курси НБУ за [start, end] порціями по FIAT_CHUNK_DAYS днів.
+    """
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(end, chunk_start + datetime.timedelta(days=FIAT_CHUNK_DAYS - 1))
+        fx_rates.get_rates_many(session, FIAT_CURRENCIES, chunk_start, chunk_end)
+        chunk_start = chunk_end + datetime.timedelta(days=1)
+
+
+def warm_crypto(session, start: datetime.date, end: datetime.date):
+    """
+    Зберігає закриваючі ціни криптовалют за завершені дні з [start, end].
+    """
+    if start >= datetime.date.today():
+        return
+    for coin in CRYPTO_COINS:
+        try:
+            series = crypto_rates.get_series(coin, CRYPTO_VS_CURRENCY, start)
+        except (CircuitOpenError, requests.RequestException, ValueError):
+            continue
+        crypto_rates.store_closes(session, coin, CRYPTO_VS_CURRENCY, series, start, end)
+
+
+def backfill(session, start: datetime.date, end: datetime.date):
+    warm_fiat(session, start, end)
+    warm_crypto(session, start, end)
+
+
+def warm_rates(days: int = WARM_DAYS):
+    """
+    Задача планувальника: підтягує курси за останні `days` днів.
+    """
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=days)
+    session = SessionLocal()
+    try:
+        backfill(session, start, end)
+    finally:
+        session.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Завантаження курсів НБУ та CoinGecko у локальне сховище")
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm = sub.add_parser("warm", help="курси за останні дні")
+    warm.add_argument("--days", type=int, default=WARM_DAYS)
+    fill = sub.add_parser("backfill", help="курси за історичний період")
+    fill.add_argument("start", type=datetime.date.fromisoformat)
+    fill.add_argument("end", type=datetime.date.fromisoformat)
+    args = parser.parse_args(argv)
+
+    if args.command == "warm":
+        warm_rates(args.days)
+        return
+    session = SessionLocal()
+    try:
+        backfill(session, args.start, args.end)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# utils/render_service.py
+"""
+Chart rendering off the handler threads.
+
+Handlers build plain chart specs (utils/charts.py) and hand them to the
+render service, which draws them in a pool of worker processes and returns
+PNG bytes. Rendering is CPU-bound matplotlib work, so running it in separate
+processes keeps it from competing with message handling for the GIL, and
+several charts of one report are drawn in parallel.
+
+Workers are started lazily with the "spawn" method (forking a process that
+already runs bot threads and database pools is unsafe). Spawn re-imports the
+main module (bot.main) in every worker, so entry points keep their start-up
+work (migrations, handlers, scheduler) under `if __name__ == "__main__"`.
+CHART_WORKERS=0 renders in the calling thread instead, which is handy for
+tests and tiny deployments.
+"""
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from bot.utils import charts
+from bot.utils.config import CHART_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class RenderService:
+    """
+    Renders chart specs to PNG bytes in a process pool of `workers` processes (0 — in-process).
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def render(self, spec: dict) -> bytes:
+        return self.render_many([spec])[0]
+
+    def render_many(self, specs) -> list:
+        """
+        Renders every spec (in parallel when pooled); returns PNG bytes in the same order.
+        """
+        specs = list(specs)
+        if self.workers <= 0:
+            return [charts.render(spec) for spec in specs]
+        executor = self._pool()
+        try:
+            return list(executor.map(charts.render, specs))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed): start a fresh pool next time, draw this batch here
+            logger.warning("render pool broke, rendering %d chart(s) in-process", len(specs))
+            self._reset(executor)
+            return [charts.render(spec) for spec in specs]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+renderer = RenderService(CHART_WORKERS)
+atexit.register(renderer.shutdown)
@@ -0,0 +1,55 @@
+# utils/reports.py
+"""
+Специфікації графіків звітів за період, спільні для обох ботів
+(handlers/report_handler.py та async_bot.py).
+
+Дані читаються з денних підсумків (daily_rollups); функції лише будують
+специфікацію для utils/charts.py, малює її render service.
+"""
+import datetime
+
+from bot.utils import aggregates, charts, money, rollups
+
+
+def category_pies_spec(session, user_id: int, start: datetime.date, end: datetime.date) -> dict:
+    """
+    Дві кругові діаграми (витрати й доходи по категоріях) за [start, end].
+    """
+    exp_data, inc_data = aggregates.split_by_type(rollups.category_totals(session, user_id, start, end))
+    return charts.category_pies_spec(exp_data, inc_data, f"Категорії: {start}–{end}")
+
+
+def income_expense_lines_spec(session, user_id: int, start: datetime.date, end: datetime.date) -> dict:
+    """
+    Лінійний графік доходів і витрат по днях [start, end] (дні без транзакцій — нулі).
+    """
+    totals = rollups.daily_totals(session, user_id, start, end)
+    days = {}
+    cur = start
+    while cur <= end:
+        days[cur] = {'income': 0.0, 'expense': 0.0}
+        cur += datetime.timedelta(days=1)
+    for (d, ttype), total in totals.items():
+        if d in days:
+            days[d][ttype] = money.from_minor(total)
+    return charts.income_expense_lines_spec(days, f"Дохід/Витрати: {start}–{end}")
+
+
+def summary_text(totals: dict, start: datetime.date, end: datetime.date) -> str:
+    """
+    Текст зведеного звіту з {"income": копійки, "expense": копійки}.
+    """
+    inc = totals['income']
+    exp = totals['expense']
+    return (
+        f"Звіт з {start} по {end}:\n"
+        f"• Доходи:  {money.format_amount(inc)}\n"
+        f"• Витрати: {money.format_amount(exp)}\n"
+        f"• Баланс:  {money.format_amount(inc - exp)}"
+    )
+
+
+def summary_bar_spec(totals: dict, start: datetime.date, end: datetime.date) -> dict:
+    return charts.totals_bar_spec(
+        money.from_minor(totals['income']), money.from_minor(totals['expense']), f"Зведений звіт: {start}–{end}"
+    )
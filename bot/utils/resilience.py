@@ -0,0 +1,121 @@
+# utils/resilience.py
+"""
+Time budgets and circuit breakers for calls to external rate providers.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# A timeout cut short by a deadline still counts as a provider failure when the
+# provider had at least this long to answer (a whole report deadline does);
+# only the leftover slivers at the end of a deadline are inconclusive
+MIN_FAILURE_TIMEOUT = 2.0
+
+
+class Deadline:
+    """
+    A total time budget shared by every network call made for one report.
+    """
+
+    def __init__(self, seconds: float, timer=time.monotonic):
+        self._timer = timer
+        self._expires_at = timer() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - self._timer())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: float) -> float:
+        """
+        Per-request timeout: never longer than `cap` nor than what is left.
+        """
+        return min(cap, self.remaining())
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a provider whose circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider after `failure_threshold` consecutive failures.
+
+    While open, allow() returns False for `reset_timeout` seconds; after that a
+    single trial call is let through (half-open) and its outcome either closes
+    the circuit again or re-opens it for another `reset_timeout`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 60.0,
+                 timer=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_running or self._timer() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("circuit %s closed", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("circuit %s opened after %d failures", self.name, self._failures)
+                self._opened_at = self._timer()
+            self._trial_running = False
+
+    def release(self):
+        """
+        Ends a call that says nothing about the provider: the circuit stays as it
+        was, and a half-open circuit may let another trial call through.
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def call(self, func, *args, inconclusive=(), **kwargs):
+        """
+        Runs func through the breaker; any exception counts as a failure except
+        those of the `inconclusive` types, which neither open nor close the circuit.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        try:
+            result = func(*args, **kwargs)
+        except inconclusive:
+            self.release()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
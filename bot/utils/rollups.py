@@ -0,0 +1,162 @@
+# utils/rollups.py
+"""
+Денні підсумки транзакцій (daily_rollups): сума й кількість за
+(користувач, день, категорія, тип).
+
+Обробники додавання транзакцій оновлюють підсумок у тому ж commit, що й вставку,
+тож звіти читають не більше ніж днів × категорій рядків замість усіх транзакцій.
+День — дата Transaction.date, тобто той самий день, за яким групують звіти.
+
+Перебудова з історичних транзакцій:
+    python -m bot.utils.rollups rebuild [--user-id ID]
+"""
+import argparse
+import datetime
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from bot.models import SessionLocal
+from bot.models.category import Category
+from bot.models.daily_rollup import DailyRollup
+from bot.models.transaction import Transaction
+from bot.utils import archive
+
+
+def _key_filter(user_id: int, day: datetime.date, category_id: int, ttype: str):
+    return (
+        DailyRollup.user_id == user_id,
+        DailyRollup.day == day,
+        DailyRollup.category_id == category_id,
+        DailyRollup.type == ttype,
+    )
+
+
+def add(session, user_id: int, day: datetime.date, category_id: int, ttype: str,
+        amount_minor: int, count: int = 1):
+    """
+    Додає amount_minor/count до підсумку дня (створює рядок, якщо його ще немає).
+    Не комітить — зміни йдуть у транзакцію виклику.
+    """
+    stmt = update(DailyRollup).where(*_key_filter(user_id, day, category_id, ttype)).values(
+        total_minor=DailyRollup.total_minor + amount_minor,
+        tx_count=DailyRollup.tx_count + count,
+    )
+    if session.execute(stmt).rowcount:
+        if count < 0:
+            # Порожній день категорії не зберігаємо
+            session.execute(delete(DailyRollup).where(
+                *_key_filter(user_id, day, category_id, ttype), DailyRollup.tx_count <= 0
+            ))
+        return
+    try:
+        with session.begin_nested():
+            session.add(DailyRollup(
+                user_id=user_id, day=day, category_id=category_id, type=ttype,
+                total_minor=amount_minor, tx_count=count
+            ))
+    except IntegrityError:
+        # Рядок щойно створив паралельний запис
+        session.execute(stmt)
+
+
+def record(session, tx: Transaction):
+    """
+    Враховує нову транзакцію в підсумках.
+    """
+    add(session, tx.user_id, tx.date.date(), tx.category_id, tx.type, tx.amount_minor, 1)
+
+
+def discard(session, tx: Transaction):
+    """
+    Прибирає транзакцію з підсумків (перед видаленням або зміною).
+    """
+    add(session, tx.user_id, tx.date.date(), tx.category_id, tx.type, -tx.amount_minor, -1)
+
+
+def rebuild(session, user_id=None) -> int:
+    """
+    Перераховує підсумки з транзакцій одним INSERT … SELECT … GROUP BY.
+    Повертає кількість рядків підсумків.
+    """
+    delete_q = session.query(DailyRollup)
+    if user_id is not None:
+        delete_q = delete_q.filter(DailyRollup.user_id == user_id)
+    delete_q.delete(synchronize_session=False)
+
+    # Разом з архівними роками: підсумки архівованих місяців теж мають лишитися
+    src = archive.transaction_source(session)
+    day = func.date(src.c.date)
+    source = select(
+        src.c.user_id, day, src.c.category_id, src.c.type,
+        func.sum(src.c.amount_minor), func.count(src.c.id)
+    ).group_by(src.c.user_id, day, src.c.category_id, src.c.type)
+    if user_id is not None:
+        source = source.where(src.c.user_id == user_id)
+    result = session.execute(insert(DailyRollup).from_select(
+        ["user_id", "day", "category_id", "type", "total_minor", "tx_count"], source
+    ))
+    session.commit()
+    return result.rowcount
+
+
+def _in_period(query, user_id: int, start_day: datetime.date, end_day: datetime.date):
+    return query.filter(
+        DailyRollup.user_id == user_id,
+        DailyRollup.day >= start_day,
+        DailyRollup.day <= end_day
+    )
+
+
+def category_totals(session, user_id: int, start_day: datetime.date, end_day: datetime.date) -> list:
+    """
+    [(назва категорії, тип, копійки), …] за дні [start_day, end_day];
+    вхід для aggregates.split_by_type.
+    """
+    return _in_period(session.query(
+        Category.name, DailyRollup.type, func.sum(DailyRollup.total_minor)
+    ).join(
+        Category, DailyRollup.category_id == Category.id
+    ), user_id, start_day, end_day).group_by(Category.name, DailyRollup.type).all()
+
+
+def type_totals(session, user_id: int, start_day: datetime.date, end_day: datetime.date) -> dict:
+    """
+    {"income": копійки, "expense": копійки} за дні [start_day, end_day].
+    """
+    rows = _in_period(session.query(
+        DailyRollup.type, func.sum(DailyRollup.total_minor)
+    ), user_id, start_day, end_day).group_by(DailyRollup.type).all()
+    totals = {"income": 0, "expense": 0}
+    for ttype, total in rows:
+        totals[ttype] = total or 0
+    return totals
+
+
+def daily_totals(session, user_id: int, start_day: datetime.date, end_day: datetime.date) -> dict:
+    """
+    {(дата, тип): копійки} за дні [start_day, end_day].
+    """
+    rows = _in_period(session.query(
+        DailyRollup.day, DailyRollup.type, func.sum(DailyRollup.total_minor)
+    ), user_id, start_day, end_day).group_by(DailyRollup.day, DailyRollup.type).all()
+    return {(d, ttype): total or 0 for d, ttype, total in rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Денні підсумки транзакцій")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_cmd = sub.add_parser("rebuild", help="перерахувати підсумки з транзакцій")
+    rebuild_cmd.add_argument("--user-id", type=int, default=None, help="лише для цього users.id")
+    args = parser.parse_args(argv)
+
+    session = SessionLocal()
+    try:
+        rows = rebuild(session, args.user_id)
+    finally:
+        session.close()
+    print(f"daily_rollups: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# utils/tx_pages.py
+"""
+Посторінковий список транзакцій для звіту «📝 Транзакції».
+
+Рядки читаються потоком (yield_per) у порядку (date, id) і пакуються в сторінки,
+що вміщаються в одне повідомлення Telegram. Сторінки гортаються keyset-курсором
+(date, id) — без OFFSET і без завантаження всього періоду в пам'ять.
+"""
+import datetime
+
+from sqlalchemy import and_, or_, select
+from telebot import types
+
+from bot.utils import archive, money
+
+# Ліміт Telegram — 4096 символів; запас на заголовок дня та службовий текст
+PAGE_CHARS = 3500
+# Довший опис обрізається, щоб будь-який рядок (з заголовком дня) вмістився в PAGE_CHARS
+NOTE_CHARS = 1000
+# Скільки рядків тягнути з курсора БД за раз
+FETCH_ROWS = 100
+# Префікс callback_data кнопок «назад/далі»
+CALLBACK_PREFIX = "txp"
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class Page:
+    def __init__(self, rows, has_prev: bool, has_next: bool):
+        self.rows = rows  # [(id, date, type, amount_minor, note), …] у порядку (date, id)
+        self.has_prev = has_prev
+        self.has_next = has_next
+
+    @property
+    def first_key(self):
+        return (self.rows[0][1], self.rows[0][0]) if self.rows else None
+
+    @property
+    def last_key(self):
+        return (self.rows[-1][1], self.rows[-1][0]) if self.rows else None
+
+    def text(self) -> str:
+        return "".join(_row_lines(self.rows))
+
+
+def _day_header(d: datetime.date) -> str:
+    return f"\n📅 {d}:\n"
+
+
+def _row_line(row) -> str:
+    _, _, ttype, amount_minor, note = row
+    if note and len(note) > NOTE_CHARS:
+        note = note[:NOTE_CHARS - 1] + "…"
+    return f" – [{ttype}] {money.format_amount(amount_minor)} ({note or 'без опису'})\n"
+
+
+def _row_lines(rows):
+    last = None
+    for row in rows:
+        d = row[1].date()
+        if d != last:
+            yield _day_header(d)
+            last = d
+        yield _row_line(row)
+
+
+def _row_cost(row) -> int:
+    # Заголовок дня рахуємо завжди: оцінка зверху, зате не залежить від напрямку читання
+    return len(_day_header(row[1].date())) + len(_row_line(row))
+
+
+def _after(src, key):
+    d, tx_id = key
+    return or_(src.c.date > d, and_(src.c.date == d, src.c.id > tx_id))
+
+
+def _before(src, key):
+    d, tx_id = key
+    return or_(src.c.date < d, and_(src.c.date == d, src.c.id < tx_id))
+
+
+def fetch_page(session, user_id: int, start_dt, end_dt, after=None, before=None,
+               page_chars: int = PAGE_CHARS) -> Page:
+    """
+    Сторінка транзакцій за [start_dt, end_dt] одразу після ключа after
+    або (для «назад») одразу перед ключем before. Ключ — (date, id).
+    """
+    # transactions або UNION ALL з архівом, якщо період його зачіпає
+    src = archive.transaction_source(session, start_dt, end_dt)
+    stmt = select(
+        src.c.id, src.c.date, src.c.type, src.c.amount_minor, src.c.note
+    ).where(
+        src.c.user_id == user_id,
+        src.c.date >= start_dt,
+        src.c.date <= end_dt
+    )
+    backwards = before is not None
+    if backwards:
+        stmt = stmt.where(_before(src, before)).order_by(src.c.date.desc(), src.c.id.desc())
+    else:
+        if after is not None:
+            stmt = stmt.where(_after(src, after))
+        stmt = stmt.order_by(src.c.date, src.c.id)
+
+    rows = []
+    size = 0
+    more = False
+    result = session.execute(stmt.execution_options(yield_per=FETCH_ROWS))
+    try:
+        for row in result:
+            cost = _row_cost(row)
+            if rows and size + cost > page_chars:
+                more = True
+                break
+            rows.append(tuple(row))
+            size += cost
+    finally:
+        result.close()
+
+    if backwards:
+        rows.reverse()
+        return Page(rows, has_prev=more, has_next=True)
+    return Page(rows, has_prev=after is not None, has_next=more)
+
+
+def page_markup(page: Page, start_dt, end_dt) -> types.InlineKeyboardMarkup:
+    """
+    Кнопки «назад/далі» під сторінкою (спільні для обох ботів).
+    """
+    markup = types.InlineKeyboardMarkup()
+    buttons = []
+    if page.has_prev:
+        buttons.append(types.InlineKeyboardButton(
+            "⬅️ Назад", callback_data=encode_callback("p", start_dt, end_dt, page.first_key)
+        ))
+    if page.has_next:
+        buttons.append(types.InlineKeyboardButton(
+            "Далі ➡️", callback_data=encode_callback("n", start_dt, end_dt, page.last_key)
+        ))
+    markup.row(*buttons)
+    return markup
+
+
+def _to_s(dt: datetime.datetime) -> int:
+    delta = dt - _EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
+def _to_us(dt: datetime.datetime) -> int:
+    return _to_s(dt) * 1000000 + dt.microsecond
+
+
+def _from_s(value: int) -> datetime.datetime:
+    return _EPOCH + datetime.timedelta(seconds=value)
+
+
+def _from_us(value: int) -> datetime.datetime:
+    return _EPOCH + datetime.timedelta(microseconds=value)
+
+
+def encode_callback(direction: str, start_dt, end_dt, key) -> str:
+    """
+    callback_data кнопки (≤ 64 байти): напрямок ('n' — далі, 'p' — назад),
+    межі періоду в секундах і ключ (date у мікросекундах, id).
+    """
+    d, tx_id = key
+    return f"{CALLBACK_PREFIX}:{direction}:{_to_s(start_dt)}:{_to_s(end_dt)}:{_to_us(d)}:{tx_id}"
+
+
+def decode_callback(data: str):
+    """
+    Повертає (direction, start_dt, end_dt, key); ValueError для чужих/зіпсованих даних.
+    """
+    prefix, direction, start_s, end_s, key_us, tx_id = data.split(":")
+    if prefix != CALLBACK_PREFIX or direction not in ("n", "p"):
+        raise ValueError(f"not a transaction page callback: {data!r}")
+    return direction, _from_s(int(start_s)), _from_s(int(end_s)), (_from_us(int(key_us)), int(tx_id))
@@ -0,0 +1,35 @@
+# utils/user_cache.py
+"""
+Identity cache: telegram_id -> users.id.
+
+A user's internal id never changes once registered, so handlers resolve it
+from memory and only hit the database for the first lookup after a restart.
+"""
+from bot.models.user import User
+from bot.utils.cache import LRUCache
+
+MAX_USERS = 10000
+
+_user_ids = LRUCache(maxsize=MAX_USERS)
+
+
+def remember(telegram_id: int, user_id: int):
+    _user_ids.set(telegram_id, user_id)
+
+
+def forget(telegram_id: int):
+    _user_ids.invalidate(telegram_id)
+
+
+def get_user_id(session, telegram_id: int):
+    """
+    Returns the internal user id for telegram_id, or None if the user is not registered.
+    """
+    user_id = _user_ids.get(telegram_id)
+    if user_id is not None:
+        return user_id
+    row = session.query(User.id).filter(User.telegram_id == telegram_id).first()
+    if row is None:
+        return None
+    remember(telegram_id, row[0])
+    return row[0]
@@ -0,0 +1,32 @@
+# utils/users.py
+"""
+User registration shared by the threaded and the asyncio bot.
+"""
+from bot.models.category import Category
+from bot.models.user import User
+from bot.utils import user_cache
+
+DEFAULT_CATEGORIES = [
+    ("Їжа", "expense"),
+    ("Транспорт", "expense"),
+    ("Розваги", "expense"),
+    ("Інше витрати", "expense"),
+    ("Зарплата", "income"),
+    ("Підробіток", "income"),
+]
+
+
+def register(session, telegram_id: int, username: str, timezone=None) -> int:
+    """
+    Returns the user's id, creating the user with the default categories on first contact.
+    """
+    user = session.query(User).filter(User.telegram_id == telegram_id).first()
+    if not user:
+        user = User(telegram_id=telegram_id, username=username, timezone=timezone)
+        session.add(user)
+        session.commit()
+        for name, ctype in DEFAULT_CATEGORIES:
+            session.add(Category(name=name, type=ctype, is_default=True, user_id=user.id))
+        session.commit()
+    user_cache.remember(user.telegram_id, user.id)
+    return user.id
@@ -0,0 +1,137 @@
+# webhook.py
+"""
+Webhook mode: a small HTTP server that accepts Telegram update POSTs.
+
+Requests are checked against the secret token Telegram sends in the
+X-Telegram-Bot-Api-Secret-Token header, parsed, and queued to a fixed pool of
+worker threads. The queue is bounded: when it is full the server answers 503
+right away and Telegram redelivers the update later, so a burst cannot pile up
+unbounded work in memory. Polling (python -m bot.main without WEBHOOK_URL)
+stays available for development.
+"""
+import hmac
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from telebot import types
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# Telegram updates are a few KB; anything much larger is not an update
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class UpdateDispatcher:
+    """
+    Bounded queue of updates drained by `workers` threads calling bot.process_new_updates().
+    """
+
+    def __init__(self, bot, workers: int = 8, queue_size: int = 256):
+        self.bot = bot
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = [
+            threading.Thread(target=self._work, name=f"webhook-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, update) -> bool:
+        """
+        Queues an update; False when the queue is full (the caller should shed load).
+        """
+        try:
+            self._queue.put_nowait(update)
+        except queue.Full:
+            return False
+        return True
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        while True:
+            update = self._queue.get()
+            try:
+                if update is None:
+                    return
+                self.bot.process_new_updates([update])
+            except Exception:
+                logger.exception("webhook: update %s failed", getattr(update, "update_id", "?"))
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """
+        Blocks until every queued update has been handled.
+        """
+        self._queue.join()
+
+
+def _make_handler(dispatcher: UpdateDispatcher, path: str, secret: str):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != path:
+                self._reply(404)
+                return
+            if secret and not hmac.compare_digest(self.headers.get(SECRET_HEADER, ""), secret):
+                self._reply(403)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0 or length > MAX_BODY_BYTES:
+                self._reply(413 if length > MAX_BODY_BYTES else 400)
+                return
+            try:
+                update = types.Update.de_json(json.loads(self.rfile.read(length)))
+            except (ValueError, KeyError, TypeError):
+                self._reply(400)
+                return
+            self._reply(200 if dispatcher.submit(update) else 503)
+
+        def _reply(self, status: int):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            logger.debug("webhook: " + format, *args)
+
+    return WebhookHandler
+
+
+def make_server(bot, host: str, port: int, path: str, secret: str,
+                workers: int = 8, queue_size: int = 256):
+    """
+    Builds (server, dispatcher) without starting them; port 0 picks a free port.
+    Handlers then run on the dispatcher's workers, not on telebot's own thread pool.
+    """
+    bot.threaded = False
+    dispatcher = UpdateDispatcher(bot, workers, queue_size)
+    server = ThreadingHTTPServer((host, port), _make_handler(dispatcher, path, secret))
+    server.daemon_threads = True
+    return server, dispatcher
+
+
+def run(bot, url: str, host: str, port: int, path: str, secret: str,
+        workers: int = 8, queue_size: int = 256):
+    """
+    Registers the webhook with Telegram and serves until interrupted.
+    """
+    server, dispatcher = make_server(bot, host, port, path, secret, workers, queue_size)
+    dispatcher.start()
+    bot.remove_webhook()
+    bot.set_webhook(url=url, secret_token=secret or None, max_connections=workers)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        dispatcher.stop()
@@ -0,0 +1,85 @@
+from logging.config import fileConfig
+
+from sqlalchemy import create_engine
+from sqlalchemy import pool
+
+from alembic import context
+
+from bot.models import Base
+
+# this is the Alembic Config object, which provides
+# access to the values within the .ini file in use.
+config = context.config
+
+# Interpret the config file for Python logging.
+# Skipped when migrations run from init_db() so the bot keeps its own logging.
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name)
+
+# Model metadata for 'autogenerate' support
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """
+    Per-year archive tables are created at runtime by bot/utils/archive.py, not by migrations.
+    """
+    if type_ == "table" and name.startswith("transactions_archive_"):
+        return False
+    return True
+
+
+def get_url() -> str:
+    """
+    The database URL comes from the bot's .env (DATABASE_URL), not from alembic.ini.
+    """
+    from bot.utils.config import DATABASE_URL
+    return DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """Run migrations in 'offline' mode (emit SQL to the script output)."""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode.
+
+    init_db() passes its own connection through config.attributes; the
+    alembic CLI gets a fresh engine for DATABASE_URL.
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+
+    connectable = create_engine(get_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        _run(connection)
+
+
+def _run(connection) -> None:
+    # render_as_batch: SQLite can only ALTER tables by copying them
+    context.configure(
+        connection=connection, target_metadata=target_metadata, render_as_batch=True,
+        include_object=include_object
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
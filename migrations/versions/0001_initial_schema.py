@@ -0,0 +1,85 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-06-10 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('telegram_id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('timezone', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_telegram_id', 'users', ['telegram_id'], unique=True)
+
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('is_default', sa.Boolean(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_categories_id', 'categories', ['id'])
+
+    op.create_table(
+        'transactions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=True),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('note', sa.String(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_transactions_id', 'transactions', ['id'])
+
+    op.create_table(
+        'monthly_metrics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('year_month', sa.String(), nullable=False),
+        sa.Column('total_income', sa.Float(), nullable=True),
+        sa.Column('total_expense', sa.Float(), nullable=True),
+        sa.Column('avg_daily_expense', sa.Float(), nullable=True),
+        sa.Column('top_category', sa.String(), nullable=True),
+        sa.Column('top_category_pct', sa.Float(), nullable=True),
+        sa.Column('avg_usd', sa.Float(), nullable=True),
+        sa.Column('avg_eur', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_monthly_metrics_id', 'monthly_metrics', ['id'])
+    op.create_index('ix_monthly_metrics_year_month', 'monthly_metrics', ['year_month'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('monthly_metrics')
+    op.drop_table('transactions')
+    op.drop_table('categories')
+    op.drop_table('users')
@@ -0,0 +1,55 @@
+"""fx_rates and crypto_prices stores
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created with create_all() before migrations existed may already have these
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'fx_rates' not in existing:
+        op.create_table(
+            'fx_rates',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('currency', sa.String(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('rate', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('currency', 'date', name='uq_fx_rates_currency_date'),
+        )
+        op.create_index('ix_fx_rates_id', 'fx_rates', ['id'])
+
+    if 'crypto_prices' not in existing:
+        op.create_table(
+            'crypto_prices',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('coin', sa.String(), nullable=False),
+            sa.Column('vs_currency', sa.String(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('coin', 'vs_currency', 'date', name='uq_crypto_prices_coin_vs_date'),
+        )
+        op.create_index('ix_crypto_prices_id', 'crypto_prices', ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('crypto_prices')
+    op.drop_table('fx_rates')
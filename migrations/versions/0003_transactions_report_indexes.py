@@ -0,0 +1,31 @@
+"""composite indexes for report range scans on transactions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Typed range scans: WHERE user_id = ? AND type = ? AND date BETWEEN ? AND ?
+    op.create_index('ix_transactions_user_type_date', 'transactions', ['user_id', 'type', 'date'])
+    # Untyped range scans and ORDER BY date: WHERE user_id = ? AND date BETWEEN ? AND ?
+    op.create_index('ix_transactions_user_date', 'transactions', ['user_id', 'date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_user_date', table_name='transactions')
+    op.drop_index('ix_transactions_user_type_date', table_name='transactions')
@@ -0,0 +1,56 @@
+"""store money as integer minor units (kopecks)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, float column, integer column)
+MONEY_COLUMNS = (
+    ('transactions', 'amount', 'amount_minor'),
+    ('monthly_metrics', 'total_income', 'total_income_minor'),
+    ('monthly_metrics', 'total_expense', 'total_expense_minor'),
+    ('monthly_metrics', 'avg_daily_expense', 'avg_daily_expense_minor'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, old, new in MONEY_COLUMNS:
+        op.add_column(table, sa.Column(new, sa.Integer(), nullable=True))
+        op.execute(f'UPDATE {table} SET {new} = CAST(ROUND({old} * 100) AS INTEGER)')
+
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('amount_minor', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('amount')
+    with op.batch_alter_table('monthly_metrics') as batch_op:
+        batch_op.drop_column('total_income')
+        batch_op.drop_column('total_expense')
+        batch_op.drop_column('avg_daily_expense')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, old, new in MONEY_COLUMNS:
+        op.add_column(table, sa.Column(old, sa.Float(), nullable=True))
+        op.execute(f'UPDATE {table} SET {old} = {new} / 100.0')
+
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('amount', existing_type=sa.Float(), nullable=False)
+        batch_op.drop_column('amount_minor')
+    with op.batch_alter_table('monthly_metrics') as batch_op:
+        batch_op.drop_column('avg_daily_expense_minor')
+        batch_op.drop_column('total_expense_minor')
+        batch_op.drop_column('total_income_minor')
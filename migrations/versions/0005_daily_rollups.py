@@ -0,0 +1,49 @@
+"""daily_rollups: per-day category totals maintained on every transaction write
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'daily_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('total_minor', sa.Integer(), nullable=False),
+        sa.Column('tx_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', 'category_id', 'type', name='uq_daily_rollups_key'),
+    )
+    op.create_index('ix_daily_rollups_id', 'daily_rollups', ['id'])
+    # Existing transactions: GROUP BY straight into the rollup
+    op.execute(
+        "INSERT INTO daily_rollups (user_id, day, category_id, type, total_minor, tx_count) "
+        "SELECT user_id, DATE(date), category_id, type, SUM(amount_minor), COUNT(*) "
+        "FROM transactions GROUP BY user_id, DATE(date), category_id, type"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_daily_rollups_id', table_name='daily_rollups')
+    op.drop_table('daily_rollups')
@@ -0,0 +1,34 @@
+"""monthly_metrics: one row per (user_id, year_month)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent first writes of a month could insert duplicates; keep the newest row
+    op.execute(
+        "DELETE FROM monthly_metrics WHERE id NOT IN "
+        "(SELECT MAX(id) FROM monthly_metrics GROUP BY user_id, year_month)"
+    )
+    with op.batch_alter_table('monthly_metrics') as batch_op:
+        batch_op.create_unique_constraint('uq_monthly_metrics_user_month', ['user_id', 'year_month'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('monthly_metrics') as batch_op:
+        batch_op.drop_constraint('uq_monthly_metrics_user_month', type_='unique')
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import datetime
 from sqlalchemy import create_engine
@@ -28,3 +29,32 @@ def session(engine):
     session.close()
     trans.rollback()
     connection.close()
+
+
+@pytest.fixture
+def async_db(tmp_path, monkeypatch):
+    """
+    Файлова SQLite для async-шляхів: async engine для run_sync і звичайні сесії
+    для шляхів у робочому потоці (async_data.SessionLocal).
+    """
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("greenlet")
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from bot import models
+    from bot.utils import async_data, category_cache, user_cache
+
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = models.create_db_engine(url)
+    Base.metadata.create_all(sync_engine)
+    async_engine = models.create_async_db_engine(url)
+    monkeypatch.setattr(models, "_async_sessionmaker", async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    ))
+    monkeypatch.setattr(async_data, "SessionLocal", sessionmaker(bind=sync_engine))
+    user_cache._user_ids.clear()
+    category_cache._categories.clear()
+    yield sync_engine
+    asyncio.run(async_engine.dispose())
+    sync_engine.dispose()
+    user_cache._user_ids.clear()
+    category_cache._categories.clear()
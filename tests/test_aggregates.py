@@ -0,0 +1,14 @@
+from bot.utils import aggregates
+
+
+def test_split_by_type_converts_to_hryvnias():
+    rows = [
+        ("Food", "expense", 1000), ("Food", "expense", 1550),
+        ("Salary", "income", 100000), ("Gift", "income", None),
+    ]
+    assert aggregates.split_by_type(rows) == ({"Food": 25.5}, {"Salary": 1000.0, "Gift": 0.0})
+
+
+def test_split_by_type_keeps_same_name_apart_by_type():
+    rows = [("Інше", "expense", 250), ("Інше", "income", 700)]
+    assert aggregates.split_by_type(rows) == ({"Інше": 2.5}, {"Інше": 7.0})
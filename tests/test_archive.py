@@ -0,0 +1,104 @@
+import datetime
+import pytest
+from sqlalchemy import inspect
+from bot.models import User, Category, Transaction, ArchivedMonth, DailyRollup
+from bot.utils import archive, export, ledger, rollups, tx_pages
+
+
+@pytest.fixture
+def user_with_history(session):
+    user = User(telegram_id=1201, username="mia")
+    session.add(user)
+    session.flush()
+    food = Category(name="Food", type="expense", user_id=user.id)
+    session.add(food)
+    session.flush()
+    for day in (datetime.datetime(2024, 1, 5), datetime.datetime(2024, 1, 20), datetime.datetime(2025, 3, 1)):
+        ledger.add_transaction(session, user.id, food.id, "expense", 1000, date=day)
+    session.commit()
+    return user, food
+
+
+def test_archive_month_moves_rows_and_reports_still_see_them(session, user_with_history):
+    user, food = user_with_history
+    moved = archive.archive_month(session, datetime.date(2024, 1, 1), today=datetime.date(2025, 6, 1))
+
+    assert moved == 2
+    assert session.query(Transaction).count() == 1
+    assert session.get(ArchivedMonth, "2024-01").table_name == "transactions_archive_2024"
+    assert "transactions_archive_2024" in inspect(session.connection()).get_table_names()
+
+    # Період без архіву читає лише гарячу таблицю
+    assert archive.transaction_source(
+        session, datetime.datetime(2025, 1, 1), datetime.datetime(2025, 12, 31)
+    ) is Transaction.__table__
+
+    everything = (datetime.datetime(2023, 1, 1), datetime.datetime(2025, 12, 31))
+    page = tx_pages.fetch_page(session, user.id, *everything)
+    assert [row[1].date() for row in page.rows] == [
+        datetime.date(2024, 1, 5), datetime.date(2024, 1, 20), datetime.date(2025, 3, 1)
+    ]
+    assert sum(len(chunk) for chunk in export.iter_chunks(session, user.id, *everything)) == 3
+
+    # Перебудова підсумків не губить архівовані місяці
+    rollups.rebuild(session, user.id)
+    assert rollups.type_totals(session, user.id, datetime.date(2024, 1, 1), datetime.date(2024, 1, 31))["expense"] == 2000
+
+
+def test_archive_refuses_open_or_incomplete_months(session, user_with_history):
+    user, food = user_with_history
+    with pytest.raises(archive.ArchiveError):
+        archive.archive_month(session, datetime.date(2025, 6, 1), today=datetime.date(2025, 6, 15))
+
+    session.query(DailyRollup).filter(DailyRollup.day < datetime.date(2024, 2, 1)).delete()
+    session.commit()
+    with pytest.raises(archive.ArchiveError, match="daily_rollups"):
+        archive.archive_month(session, datetime.date(2024, 1, 1), today=datetime.date(2025, 6, 1))
+    assert session.query(Transaction).count() == 3
+
+
+def test_archive_closed_months_keeps_recent_months(session, user_with_history):
+    archived = archive.archive_closed_months(session, keep_months=12, today=datetime.date(2025, 6, 1))
+    assert list(archived) == [f"2024-{m:02d}" for m in range(1, 6)]
+    assert archived["2024-01"] == 2
+    assert session.query(Transaction).count() == 1
+
+
+def test_archive_fills_metrics_missing_on_upgraded_database(session):
+    # Як в оновленій базі: транзакція без MonthlyMetric, підсумки з rollups rebuild
+    user = User(telegram_id=1202, username="ola")
+    session.add(user)
+    session.flush()
+    food = Category(name="Food", type="expense", user_id=user.id)
+    session.add(food)
+    session.flush()
+    session.add(Transaction(amount_minor=500, date=datetime.datetime(2023, 3, 4), type="expense",
+                            user_id=user.id, category_id=food.id))
+    session.commit()
+    rollups.rebuild(session, user.id)
+
+    assert archive.archive_closed_months(session, keep_months=12, today=datetime.date(2025, 6, 1))["2023-03"] == 1
+    assert session.query(Transaction).filter(Transaction.user_id == user.id).count() == 0
+
+
+def test_archive_closed_months_skips_a_bad_month(session, user_with_history, caplog):
+    session.query(DailyRollup).filter(DailyRollup.day < datetime.date(2024, 2, 1)).delete()
+    session.commit()
+    archived = archive.archive_closed_months(session, keep_months=12, today=datetime.date(2025, 6, 1))
+    assert "2024-01" not in archived
+    assert list(archived) == [f"2024-{m:02d}" for m in range(2, 6)]
+    assert "2024-01" in caplog.text
+    assert session.get(ArchivedMonth, "2024-01") is None
+
+
+def test_archived_category_is_still_in_use(session, user_with_history):
+    user, food = user_with_history
+    archive.archive_month(session, datetime.date(2024, 1, 1), today=datetime.date(2025, 6, 1))
+    session.query(Transaction).delete()
+    session.commit()
+    assert archive.category_in_use(session, food.id)
+
+    # Без рядків у жодному джерелі категорію можна видаляти
+    session.query(DailyRollup).delete()
+    session.execute(archive.archive_table(2024).delete())
+    assert not archive.category_in_use(session, food.id)
@@ -0,0 +1,136 @@
+import asyncio
+import datetime
+import pytest
+from telebot import types
+from bot import async_bot as bot_module
+from bot.models import Category, Transaction
+from bot.utils import chart_cache
+
+
+class FakeTelegram:
+    """
+    Записує відповіді бота замість запитів до Telegram.
+    """
+    def __init__(self):
+        self.texts = []
+        self.photos = []
+
+    async def send_message(self, chat_id, text, reply_markup=None, **kwargs):
+        self.texts.append(text)
+
+    async def send_photo(self, chat_id, photo, **kwargs):
+        self.photos.append(photo)
+        file_id = f"file-{len(self.photos)}"
+        return types.Message.de_json({
+            "message_id": len(self.photos), "date": 0, "chat": {"id": chat_id, "type": "private"},
+            "photo": [{"file_id": file_id, "file_unique_id": file_id, "width": 1, "height": 1}],
+        })
+
+
+@pytest.fixture
+def telegram(async_db, monkeypatch):
+    fake = FakeTelegram()
+    monkeypatch.setattr(bot_module.async_bot, "send_message", fake.send_message)
+    monkeypatch.setattr(bot_module.async_bot, "send_photo", fake.send_photo)
+    monkeypatch.setattr(bot_module.renderer, "render", lambda spec: f"png:{spec['title']}".encode())
+    chart_cache.clear()
+    yield fake
+    chart_cache.clear()
+
+
+def message(text, user_id=42):
+    return types.Message.de_json({
+        "message_id": 1, "date": 0, "text": text,
+        "chat": {"id": user_id, "type": "private"},
+        "from": {"id": user_id, "is_bot": False, "first_name": "Nina", "username": "nina"},
+    })
+
+
+def chat(*texts):
+    async def scenario():
+        for text in texts:
+            await bot_module.async_bot.process_new_messages([message(text)])
+    asyncio.run(scenario())
+
+
+def test_parse_range_covers_the_whole_last_day():
+    start, end = bot_module.parse_range("2025-03-01:2025-03-31")
+    assert start == datetime.datetime(2025, 3, 1)
+    assert end == datetime.datetime(2025, 3, 31, 23, 59, 59, 999999)
+    with pytest.raises(ValueError):
+        bot_module.parse_range("2025-03-01")
+
+
+def test_step_by_step_expense(telegram, async_db):
+    # "150" — також схоже на швидке введення, але відповідь на крок розмови має перевагу
+    chat("/start", "➕ Витрата", "150", "Їжа", "кава")
+    assert telegram.texts[1:] == [
+        "Введіть суму витрати:",
+        "Оберіть категорію:",
+        "(Опційно) Додайте опис витрати або натисніть 'Пропустити' чи '🔙 Назад':",
+        "Витрату 150.00 додано до 'Їжа'.",
+    ]
+    with async_db.connect() as connection:
+        rows = connection.execute(Transaction.__table__.select()).fetchall()
+    assert [(r.type, r.amount_minor, r.note) for r in rows] == [("expense", 15000, "кава")]
+
+    # Після завершення розмови повідомлення знову йдуть у звичайні хендлери
+    chat("40 Транспорт")
+    assert telegram.texts[-1].startswith("Додано:")
+
+
+def test_entry_back_cancels_the_conversation(telegram):
+    chat("/start", "➕ Дохід", "🔙 Назад", "🔙 Назад")
+    assert telegram.texts[2:] == ["Додавання доходу скасовано.", "Головне меню:"]
+
+
+def test_category_add_rename_and_delete(telegram, async_db):
+    chat(
+        "/start",
+        "➕ Додати категорію", "Дохід", "Подарунки",
+        "✏️ Редагувати категорію", "Подарунки", "Змінити назву", "Подарунки рідних",
+        "🗑️ Видалити категорію", "Їжа", "✅ Так",
+        "40 Транспорт",
+        "🗑️ Видалити категорію", "Транспорт", "✅ Так",
+    )
+    assert "Категорію 'Подарунки' додано (income)." in telegram.texts
+    assert "Категорію перейменовано на 'Подарунки рідних'." in telegram.texts
+    assert telegram.texts.count("Категорію видалено.") == 1
+    assert telegram.texts[-1] == "Категорію не можна видалити: у ній є транзакції."
+    with async_db.connect() as connection:
+        names = {r.name for r in connection.execute(Category.__table__.select()).fetchall()}
+    assert "Подарунки рідних" in names and "Транспорт" in names
+    assert "Їжа" not in names and "Подарунки" not in names
+
+
+def test_period_reports_send_charts_once(telegram):
+    today = datetime.date.today()
+    period = f"{today}:{today}"
+    chat("/start", "40 Транспорт", "📊 Круговий по категоріям", period, "📊 Круговий по категоріям", period)
+    assert telegram.photos[0] == f"png:Категорії: {today}–{today}".encode()
+    # Той самий графік вдруге — з кешу й за file_id, без повторного завантаження
+    assert telegram.photos[1] == "file-1"
+    assert telegram.texts.count("Круговий звіт готовий.") == 2
+
+    chat("📑 Зведений", period)
+    assert telegram.texts[-1].startswith(f"Звіт з {today} по {today}:")
+    assert "• Витрати: 40.00" in telegram.texts[-1]
+
+    chat("📈 Лінійний по дням", "не період")
+    assert telegram.texts[-1] == "Невірний формат."
+
+
+def test_monthly_report(telegram, monkeypatch):
+    async def no_rates(start, end, deadline=None):
+        return {"avg_usd": 0.0, "avg_eur": 0.0, "stale_rates": set()}
+
+    async def market_chart(start, end, deadline=None):
+        return b"market", set()
+
+    monkeypatch.setattr(bot_module.async_data, "month_rates", no_rates)
+    monkeypatch.setattr(bot_module.async_data, "market_chart", market_chart)
+    monkeypatch.setattr(bot_module.renderer, "render_many", lambda specs: [b"png"] * len(specs))
+    chat("/start", "📅 Щомісячний звіт")
+    # Три графіки користувача однакові — завантажуються раз, далі йдуть за file_id
+    assert telegram.photos == [b"png", "file-1", "file-1", b"market"]
+    assert telegram.texts[-1].startswith("📅 Звіт за ")
@@ -0,0 +1,49 @@
+import asyncio
+import datetime
+import pytest
+from bot import models
+from bot.models import Transaction
+from bot.utils import async_data
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+
+def test_async_database_url():
+    assert models.async_database_url("sqlite:////tmp/x.db") == "sqlite+aiosqlite:////tmp/x.db"
+    assert models.async_database_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert models.async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_concurrent_quick_entries_on_one_event_loop(async_db):
+    async def scenario():
+        await async_data.register_user(42, "nina")
+        results = await asyncio.gather(*(
+            async_data.add_quick_entries(42, f"{i + 1} Їжа; 2 Транспорт") for i in range(20)
+        ))
+        today = datetime.date.today()
+        totals = await async_data.period_totals(42, today, today)
+        page = await async_data.tx_page(42, datetime.datetime.combine(today, datetime.time.min),
+                                        datetime.datetime.combine(today, datetime.time.max))
+        categories = await async_data.get_categories(42, "income")
+        return results, totals, page, categories
+
+    results, totals, page, categories = asyncio.run(scenario())
+    assert all(not errors for _, errors in results)
+    assert totals == {"income": 0, "expense": (sum(range(1, 21)) + 2 * 20) * 100}
+    assert len(page.rows) == 40
+    assert [c.name for c in categories] == ["Зарплата", "Підробіток"]
+
+    with async_db.connect() as connection:
+        assert len(connection.execute(Transaction.__table__.select()).fetchall()) == 40
+
+
+def test_unknown_user_paths_return_none(async_db):
+    async def scenario():
+        return (
+            await async_data.add_quick_entries(7, "10 Їжа"),
+            await async_data.period_totals(7, datetime.date(2025, 1, 1), datetime.date(2025, 1, 31)),
+        )
+
+    (entries, errors), totals = asyncio.run(scenario())
+    assert entries is None and totals is None
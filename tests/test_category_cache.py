@@ -0,0 +1,34 @@
+from sqlalchemy import event
+from bot.models import User, Category
+from bot.utils import category_cache
+from bot.utils.cache import LRUCache
+
+
+def test_categories_served_from_memory_until_invalidated(session, engine, monkeypatch):
+    monkeypatch.setattr(category_cache, "_categories", LRUCache(maxsize=4))
+    user = User(telegram_id=888, username="grace")
+    session.add(user)
+    session.flush()
+    session.add_all([
+        Category(name="Food", type="expense", user_id=user.id),
+        Category(name="Bonus", type="income", user_id=user.id),
+    ])
+    session.commit()
+    user_id = user.id
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert [c.name for c in category_cache.get_categories(session, user_id, "expense")] == ["Food"]
+        assert category_cache.resolve(session, user_id, "Bonus", "income").type == "income"
+        assert category_cache.resolve(session, user_id, "Bonus", "expense") is None
+        assert len(category_cache.get_categories(session, user_id)) == 2
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(statements) == 1
+
+    session.add(Category(name="Taxi", type="expense", user_id=user_id))
+    session.commit()
+    category_cache.invalidate(user_id)
+    assert category_cache.resolve(session, user_id, "Taxi").type == "expense"
@@ -0,0 +1,66 @@
+import datetime
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import sessionmaker
+from bot.handlers import category_handler
+from bot.models import User, Category, Transaction, DailyRollup, MonthlyMetric
+from bot.utils import chart_cache, ledger
+
+
+class DummyMessage:
+    def __init__(self, text, user_id=1, chat_id=123):
+        self.text = text
+        self.chat = type("C", (object,), {"id": chat_id})()
+        self.from_user = type("U", (object,), {"id": user_id})()
+
+
+@pytest.fixture
+def category(engine, monkeypatch):
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(category_handler, "SessionLocal", Session)
+    monkeypatch.setattr(category_handler.bot, "send_message", MagicMock())
+    monkeypatch.setattr(category_handler, "get_categories_menu", lambda: "MENU")
+    session = Session()
+    user = User(telegram_id=2401, username="iva")
+    session.add(user)
+    session.flush()
+    cat = Category(name="Food", type="expense", user_id=user.id)
+    session.add(cat)
+    session.commit()
+    ids = user.id, cat.id
+    session.close()
+    yield ids
+    session = Session()
+    session.query(Transaction).filter(Transaction.user_id == ids[0]).delete()
+    session.query(DailyRollup).filter(DailyRollup.user_id == ids[0]).delete()
+    session.query(MonthlyMetric).filter(MonthlyMetric.user_id == ids[0]).delete()
+    session.query(Category).filter(Category.user_id == ids[0]).delete()
+    session.query(User).filter(User.id == ids[0]).delete()
+    session.commit()
+    session.close()
+
+
+@pytest.mark.parametrize("apply, text", [
+    (category_handler.edit_category_apply_name, "Їжа"),
+    (category_handler.edit_category_apply_type, "Дохід"),
+    (category_handler.delete_category_apply, "✅ Так"),
+])
+def test_category_changes_invalidate_cached_charts(category, apply, text):
+    user_id, category_id = category
+    before = chart_cache.data_version(user_id)
+    apply(DummyMessage(text), category_id)
+    assert chart_cache.data_version(user_id) > before
+
+
+def test_category_with_transactions_is_not_deleted(category, engine):
+    user_id, category_id = category
+    session = sessionmaker(bind=engine)()
+    ledger.add_transaction(session, user_id, category_id, "expense", 1000, date=datetime.datetime(2024, 9, 3))
+    session.commit()
+    session.close()
+
+    category_handler.delete_category_apply(DummyMessage("✅ Так"), category_id)
+    session = sessionmaker(bind=engine)()
+    assert session.get(Category, category_id) is not None
+    session.close()
+    assert "не можна видалити" in category_handler.bot.send_message.call_args[0][1]
@@ -0,0 +1,86 @@
+import datetime
+from sqlalchemy.orm import Session
+from bot.models import User, Category
+from bot.utils import chart_cache, ledger
+from bot.utils.cache import SizedLRUCache
+
+
+def test_sized_lru_evicts_by_total_bytes():
+    cache = SizedLRUCache(max_bytes=10)
+    cache.set("a", b"xxxx")
+    cache.set("b", b"yyyy")
+    assert cache.get("a") == b"xxxx"  # "a" стає найсвіжішим
+    cache.set("c", b"zzzz")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (b"xxxx", b"zzzz")
+    assert cache.size == 8
+
+    cache.set("a", b"x")
+    assert cache.size == 5
+    cache.set("huge", b"h" * 11)  # більше за весь бюджет — не зберігається
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+
+
+def test_data_version_moves_on_commit_only(session, engine):
+    user = User(telegram_id=2301, username="vera")
+    session.add(user)
+    session.flush()
+    food = Category(name="Food", type="expense", user_id=user.id)
+    session.add(food)
+    session.commit()
+
+    before = chart_cache.data_version(user.id)
+    ledger.add_transaction(session, user.id, food.id, "expense", 1500, date=datetime.datetime(2025, 5, 3))
+    session.flush()
+    assert chart_cache.data_version(user.id) == before
+    session.commit()
+    after = chart_cache.data_version(user.id)
+    assert after > before
+
+    other = Session(bind=engine)
+    other.connection()
+    chart_cache.mark_changed(other, user.id)
+    other.rollback()
+    other.commit()
+    other.close()
+    assert chart_cache.data_version(user.id) == after
+
+
+def test_get_or_render_skips_queries_until_data_changes(monkeypatch):
+    monkeypatch.setattr(chart_cache, "_charts", SizedLRUCache(max_bytes=1024))
+    calls = []
+
+    def make_spec():
+        calls.append("query")
+        return {"kind": "x"}
+
+    def render(spec):
+        calls.append("render")
+        return b"png-%d" % len(calls)
+
+    start, end = datetime.date(2025, 5, 1), datetime.date(2025, 5, 31)
+    first = chart_cache.get_or_render(42, "pie", start, end, make_spec, render)
+    assert chart_cache.get_or_render(42, "pie", start, end, make_spec, render) == first
+    assert calls == ["query", "render"]
+    # Інший тип графіка чи період — окремий запис
+    chart_cache.get_or_render(42, "line", start, end, make_spec, render)
+    assert len(calls) == 4
+
+    chart_cache.bump(42)
+    assert chart_cache.get_or_render(42, "pie", start, end, make_spec, render) != first
+    assert len(calls) == 6
+
+
+def test_get_or_render_many_renders_only_misses(monkeypatch):
+    monkeypatch.setattr(chart_cache, "_charts", SizedLRUCache(max_bytes=1024))
+    batches = []
+
+    def render_many(specs):
+        batches.append(list(specs))
+        return [spec.encode() for spec in specs]
+
+    keys = [chart_cache.chart_key(7, name, "2025-05-01", "2025-05-31") for name in ("a", "b")] + [None]
+    assert chart_cache.get_or_render_many(keys, ["a", "b", "fx"], render_many) == [b"a", b"b", b"fx"]
+    assert chart_cache.get_or_render_many(keys, ["a", "b", "fx"], render_many) == [b"a", b"b", b"fx"]
+    assert batches == [["a", "b", "fx"], ["fx"]]
@@ -0,0 +1,97 @@
+import datetime
+import json
+import pytest
+from bot.utils import charts
+from bot.utils.render_service import RenderService
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def _specs():
+    d1, d2 = datetime.date(2025, 5, 1), datetime.date(2025, 5, 2)
+    return [
+        charts.category_pies_spec({"Їжа": 12.5, "Транспорт": 3.0}, {}, "Категорії", startangle=90),
+        charts.income_expense_lines_spec(
+            {d1: {"income": 100.0, "expense": 12.5}, d2: {"income": 0.0, "expense": 3.0}}, "Дохід/Витрати"
+        ),
+        charts.daily_expenses_spec({d1: 12.5, d2: 3.0}, "Добові витрати"),
+        charts.totals_bar_spec(100.0, 15.5, "Зведений звіт", styled=True),
+        charts.currency_spec(
+            [(d1, 41.2), (d2, 41.3)], [(d1, 45.0)], [(d1, 64000.0), (d2, 65000.0)], [], {"EUR"},
+            "Фіат", "Крипто"
+        ),
+    ]
+
+
+def test_specs_are_plain_json():
+    for spec in _specs():
+        assert json.loads(json.dumps(spec)) == spec
+
+
+def test_render_every_kind_in_process():
+    service = RenderService(workers=0)
+    images = service.render_many(_specs())
+    assert len(images) == 5
+    assert all(png.startswith(PNG_MAGIC) for png in images)
+
+
+def test_render_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        charts.render({"kind": "radar"})
+
+
+def test_template_must_define_build_and_update():
+    class NoUpdate(charts._Template):
+        def build(self, fig):
+            self.ax = fig.subplots()
+
+    with pytest.raises(TypeError):
+        NoUpdate()
+
+
+def test_process_pool_renders_in_order():
+    service = RenderService(workers=2)
+    try:
+        pooled = service.render_many(_specs())
+        single = service.render(charts.totals_bar_spec(1.0, 2.0, "x"))
+    finally:
+        service.shutdown()
+    assert [len(png) > 0 and png.startswith(PNG_MAGIC) for png in pooled] == [True] * 5
+    # Той самий графік у процесі й у пулі дає однакову картинку
+    assert pooled[3] == charts.render(_specs()[3])
+    assert single.startswith(PNG_MAGIC)
+
+
+def test_reused_template_matches_fresh_figure():
+    specs = _specs()
+    first = [charts.render(spec) for spec in specs]
+    # Інші дані в тих самих шаблонах, зокрема порожні
+    charts.render(charts.category_pies_spec({}, {}, "порожньо"))
+    charts.render(charts.daily_expenses_spec({}, "порожньо"))
+    charts.render(charts.currency_spec([], [], [], [], set(), "a", "b"))
+    again = [charts.render(spec) for spec in specs]
+    fresh = []
+    for spec in specs:
+        template = charts.new_template(spec)
+        template.update(spec)
+        fresh.append(template.png())
+    assert again == first
+    assert fresh == first
+
+
+def test_concurrent_renders_do_not_share_figures():
+    from concurrent.futures import ThreadPoolExecutor
+
+    specs = [charts.daily_expenses_spec({datetime.date(2025, 5, d): float(d * k) for d in range(1, 29)}, f"#{k}")
+             for k in range(1, 9)]
+    expected = [charts.render(spec) for spec in specs]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        got = list(pool.map(charts.render, specs * 3))
+    assert got == expected * 3
+
+
+def test_chart_bench_reports_every_kind():
+    from bot.utils import chart_bench
+
+    kinds = [kind for kind, cold, warm in chart_bench.run(runs=1)]
+    assert kinds == ["category_pies", "income_expense_lines", "daily_expenses", "totals_bar", "currency"]
@@ -0,0 +1,72 @@
+import datetime
+import threading
+import time
+import pytest
+import requests
+from bot.utils import crypto_rates
+from bot.utils.cache import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(crypto_rates, "_series_cache", TTLCache(maxsize=8, ttl=60))
+
+
+def test_periods_are_cut_from_one_download(monkeypatch):
+    today = datetime.date.today()
+    calls = []
+
+    def fake_fetch(coin, vs_currency, days, timeout=None):
+        calls.append((coin, vs_currency, days))
+        return {today - datetime.timedelta(days=i): 100.0 + i for i in range(90)}
+
+    monkeypatch.setattr(crypto_rates, "fetch_market_chart", fake_fetch)
+    start = today - datetime.timedelta(days=60)
+    series = crypto_rates.get_timeseries("bitcoin", "USD", start, start + datetime.timedelta(days=2))
+    assert [d for d, _ in series] == [start + datetime.timedelta(days=i) for i in range(3)]
+
+    # Коротший період береться з того самого (довшого) ряду
+    crypto_rates.get_timeseries("bitcoin", "usd", today - datetime.timedelta(days=5), today)
+    assert calls == [("bitcoin", "usd", 90)]
+
+
+def test_unavailable_api_returns_empty_series(monkeypatch):
+    def failing_fetch(coin, vs_currency, days, timeout=None):
+        raise requests.ConnectionError("down")
+
+    monkeypatch.setattr(crypto_rates, "fetch_market_chart", failing_fetch)
+    today = datetime.date.today()
+    assert crypto_rates.get_timeseries("ethereum", "usd", today, today) == []
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # "b" — найдавніше використаний
+    assert cache.get("b") is None and cache.get("a") == 1
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    # Протухле значення віддається, якщо оновлення не вдалося
+    assert cache.get_or_load("a", lambda: 1 / 0) == 1
+
+
+def test_ttl_cache_loads_once_for_concurrent_callers():
+    cache = TTLCache()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    threads = [threading.Thread(target=cache.get_or_load, args=("k", slow_loader)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert cache.get("k") == "value"
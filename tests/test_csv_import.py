@@ -0,0 +1,56 @@
+import datetime
+import io
+import pytest
+from bot.models import User, Category, Transaction, DailyRollup
+from bot.utils import csv_import, monthly_metrics
+
+
+def _user(session):
+    user = User(telegram_id=901, username="jack")
+    session.add(user)
+    session.flush()
+    session.add(Category(name="Їжа", type="expense", user_id=user.id))
+    session.commit()
+    return user
+
+
+def test_import_batches_rows_and_updates_aggregates(session):
+    user = _user(session)
+    data = io.StringIO(
+        "Date,Amount,Category,Note\n"
+        "2025-05-01,-150.50,Їжа,кава\n"
+        "01.05.2025,-49.50,Їжа,\n"
+        "2025-05-02 10:30,20000,Зарплата,аванс\n"
+        "not-a-date,-1,Їжа,\n"
+    )
+    result = csv_import.import_csv(session, user.id, data, batch_size=2)
+
+    assert result.imported == 3
+    assert result.skipped == 1 and result.error_lines == [5]
+    assert result.created_categories == ["Зарплата"]
+    assert session.query(Transaction).filter_by(user_id=user.id).count() == 3
+
+    rollup = session.query(DailyRollup).filter_by(user_id=user.id, type="expense").one()
+    assert (rollup.day, rollup.total_minor, rollup.tx_count) == (datetime.date(2025, 5, 1), 20000, 2)
+    metric = monthly_metrics.find(session, user.id, datetime.date(2025, 5, 1))
+    assert metric.total_expense_minor == 20000
+    assert metric.total_income_minor == 2000000
+
+
+def test_import_requires_header_columns(session):
+    user = _user(session)
+    with pytest.raises(ValueError):
+        csv_import.import_csv(session, user.id, io.StringIO("when,how much\n2025-05-01,1\n"))
+
+
+def test_short_rows_are_skipped_not_fatal(session):
+    user = _user(session)
+    data = io.StringIO(
+        "amount,date,category\n"
+        "150\n"
+        "-20,2025-05-03,Їжа\n"
+        "-5,2025-05-04\n"
+    )
+    result = csv_import.import_csv(session, user.id, data)
+    assert result.imported == 1
+    assert result.skipped == 2 and result.error_lines == [2, 4]
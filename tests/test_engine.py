@@ -0,0 +1,19 @@
+from sqlalchemy import text
+from bot.models import create_db_engine, engine_options
+
+
+def test_sqlite_engine_uses_wal_and_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -20000
+
+
+def test_server_database_gets_pool_settings():
+    opts = engine_options("postgresql://bot:secret@db/finance")
+    assert "connect_args" not in opts
+    assert opts["pool_size"] == 10 and opts["max_overflow"] == 20
+    assert opts["pool_pre_ping"] is True
+    assert engine_options("sqlite:///bot.db")["connect_args"]["check_same_thread"] is False
@@ -0,0 +1,79 @@
+import datetime
+import gzip
+import io
+import pytest
+from bot.models import User, Category, Transaction
+from bot.utils import csv_import, export
+
+
+def _setup(session):
+    user = User(telegram_id=1001, username="kate")
+    session.add(user)
+    session.flush()
+    food = Category(name="Їжа", type="expense", user_id=user.id)
+    session.add(food)
+    session.flush()
+    session.add_all([
+        Transaction(amount=12.5, date=datetime.datetime(2025, 5, 1, 9, 0), type="expense", note="кава",
+                    user_id=user.id, category_id=food.id),
+        Transaction(amount=3, date=datetime.datetime(2025, 5, 2, 9, 0), type="expense",
+                    user_id=user.id, category_id=food.id),
+        Transaction(amount=7, date=datetime.datetime(2025, 6, 1), type="expense",
+                    user_id=user.id, category_id=food.id),
+    ])
+    session.commit()
+    return user
+
+
+def test_csv_export_streams_chunks_and_round_trips_through_import(session, monkeypatch):
+    user = _setup(session)
+    monkeypatch.setattr(export, "EXPORT_CHUNK", 1)
+    spool, name, count = export.build_export(
+        session, user.id, datetime.datetime(2025, 5, 1), datetime.datetime(2025, 5, 31, 23, 59)
+    )
+    with spool:
+        text = gzip.decompress(spool.read()).decode("utf-8")
+
+    assert name == "transactions_2025-05-01_2025-05-31.csv.gz"
+    assert count == 2
+    assert text.splitlines() == [
+        "date,type,amount,category,note",
+        "2025-05-01 09:00:00,expense,12.50,Їжа,кава",
+        "2025-05-02 09:00:00,expense,3.00,Їжа,",
+    ]
+
+    before = session.query(Transaction).count()
+    result = csv_import.import_csv(session, user.id, io.StringIO(text))
+    assert result.imported == 2 and not result.created_categories
+    assert session.query(Transaction).count() == before + 2
+
+
+def test_rows_of_a_missing_category_are_still_exported(session):
+    user = _setup(session)
+    # Категорія могла зникнути, поки її рядки лежали в архіві
+    session.query(Category).filter(Category.user_id == user.id).delete()
+    session.commit()
+    rows = [
+        row for chunk in export.iter_chunks(
+            session, user.id, datetime.datetime(2025, 5, 1), datetime.datetime(2025, 6, 30)
+        ) for row in chunk
+    ]
+    assert [row[3] for row in rows] == [export.MISSING_CATEGORY] * 3
+
+
+def test_unknown_format_is_rejected(session):
+    with pytest.raises(ValueError):
+        export.build_export(session, 1, datetime.datetime(2025, 1, 1), datetime.datetime(2025, 1, 2), "xlsx")
+
+
+def test_parquet_export(session):
+    pq = pytest.importorskip("pyarrow.parquet")
+    user = _setup(session)
+    spool, name, count = export.build_export(
+        session, user.id, datetime.datetime(2025, 5, 1), datetime.datetime(2025, 6, 30), "parquet"
+    )
+    with spool:
+        table = pq.read_table(io.BytesIO(spool.read()))
+    assert name.endswith(".parquet") and count == 3
+    assert table.column("category").to_pylist() == ["Їжа"] * 3
+    assert [str(a) for a in table.column("amount").to_pylist()] == ["12.50", "3.00", "7.00"]
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.orm import sessionmaker
+from telebot.apihelper import ApiTelegramException
+from bot.models import TelegramFile
+from bot.utils import file_ids
+from bot.utils.cache import LRUCache
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+        self.rejected = set()
+        self.uploads = 0
+
+    def send_photo(self, chat_id, photo, **kwargs):
+        self.sent.append((chat_id, photo))
+        if isinstance(photo, str):
+            if photo in self.rejected:
+                raise ApiTelegramException(
+                    "sendPhoto", None, {"error_code": 400, "description": "Bad Request: wrong file identifier"}
+                )
+            return SimpleNamespace(photo=[SimpleNamespace(file_id=photo)])
+        self.uploads += 1
+        return SimpleNamespace(photo=[
+            SimpleNamespace(file_id=f"small-{self.uploads}"), SimpleNamespace(file_id=f"file-{self.uploads}")
+        ])
+
+
+@pytest.fixture
+def registry(engine, monkeypatch):
+    monkeypatch.setattr(file_ids, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(file_ids, "_file_ids", LRUCache(maxsize=16))
+    yield
+    session = sessionmaker(bind=engine)()
+    session.query(TelegramFile).delete()
+    session.commit()
+    session.close()
+
+
+def test_identical_bytes_are_uploaded_once(registry, engine, monkeypatch):
+    bot = FakeBot()
+    png = b"\x89PNG same chart"
+    file_ids.send_photo(bot, 1, png)
+    file_ids.send_photo(bot, 2, png)
+    file_ids.send_photo(bot, 3, b"\x89PNG another chart")
+    assert bot.sent == [(1, png), (2, "file-1"), (3, b"\x89PNG another chart")]
+
+    # Після перезапуску file_id береться з бази
+    monkeypatch.setattr(file_ids, "_file_ids", LRUCache(maxsize=16))
+    file_ids.send_photo(bot, 4, png)
+    assert bot.sent[-1] == (4, "file-1")
+    row = sessionmaker(bind=engine)().get(TelegramFile, file_ids.content_hash(png))
+    assert (row.file_id, row.size) == ("file-1", len(png))
+
+
+def test_rejected_file_id_falls_back_to_upload(registry):
+    bot = FakeBot()
+    png = b"\x89PNG chart"
+    file_ids.send_photo(bot, 1, png)
+    bot.rejected.add("file-1")
+    file_ids.send_photo(bot, 1, png)
+    assert bot.sent[1:] == [(1, "file-1"), (1, png)]
+    file_ids.send_photo(bot, 1, png)
+    assert bot.sent[-1] == (1, "file-2")
+
+
+def test_other_bad_requests_keep_the_file_id(registry):
+    bot = FakeBot()
+    png = b"\x89PNG chart"
+    file_ids.send_photo(bot, 1, png)
+
+    def chat_not_found(chat_id, photo, **kwargs):
+        raise ApiTelegramException("sendPhoto", None, {"error_code": 400, "description": "Bad Request: chat not found"})
+
+    bot.send_photo = chat_not_found
+    with pytest.raises(ApiTelegramException):
+        file_ids.send_photo(bot, 2, png)
+    assert file_ids.lookup(file_ids.SessionLocal(), file_ids.content_hash(png)) == "file-1"
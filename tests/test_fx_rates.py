@@ -0,0 +1,54 @@
+import datetime
+from unittest.mock import MagicMock
+from bot.models import FxRate
+from bot.utils import fx_rates, nbu_client
+
+
+def test_get_rates_fetches_missing_days_once(session, monkeypatch):
+    calls = []
+
+    def fake_fetch(codes, start, end, deadline=None):
+        calls.append((tuple(codes), start, end))
+        days = [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+        return {code: {d: 40.0 + d.day for d in days} for code in codes}
+
+    monkeypatch.setattr(nbu_client, "fetch_ranges", fake_fetch)
+    start = datetime.date(2025, 4, 1)
+    end = datetime.date(2025, 4, 3)
+
+    rates = fx_rates.get_rates_many(session, ("USD", "EUR"), start, end)
+    assert rates["USD"] == {start: 41.0, datetime.date(2025, 4, 2): 42.0, end: 43.0}
+    # Одна пачка для обох валют за весь період
+    assert calls == [(("EUR", "USD"), start, end)]
+
+    # Повторний запит обслуговується зі сховища, без звернень до НБУ
+    calls.clear()
+    assert fx_rates.get_timeseries(session, "USD", start, end)[0] == (start, 41.0)
+    assert fx_rates.get_avg_rate(session, "EUR", start, end) == 42.0
+    assert calls == []
+    assert session.query(FxRate).filter_by(currency="USD").count() == 3
+
+
+def test_store_rates_skips_existing(session):
+    day = datetime.date(2025, 3, 1)
+    fx_rates.store_rates(session, "EUR", {day: 44.0})
+    fx_rates.store_rates(session, "EUR", {day: 45.0})
+
+    stored = session.query(FxRate).filter_by(currency="EUR", date=day).one()
+    assert stored.rate == 44.0
+
+
+def test_fetch_range_parses_nbu_payload(monkeypatch):
+    resp = MagicMock()
+    resp.json.return_value = [
+        {"exchangedate": "01.04.2025", "cc": "USD", "rate": 41.2, "units": 1, "rate_per_unit": 41.2},
+        {"exchangedate": "02.04.2025", "cc": "USD", "rate": 412.0, "units": 10},
+        {"exchangedate": "bad", "cc": "USD", "rate": 1.0},
+    ]
+    fake_get = MagicMock(return_value=resp)
+    monkeypatch.setattr(nbu_client._http, "get", fake_get)
+
+    rates = nbu_client.fetch_range("USD", datetime.date(2025, 4, 1), datetime.date(2025, 4, 2))
+    assert rates == {datetime.date(2025, 4, 1): 41.2, datetime.date(2025, 4, 2): 41.2}
+    url = fake_get.call_args[0][0]
+    assert "valcode=usd" in url and "start=20250401" in url and "end=20250402" in url
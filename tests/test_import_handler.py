@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+from sqlalchemy.orm import sessionmaker
+from bot.handlers import import_handler
+from bot.models import User, Transaction
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+@pytest.fixture
+def importer(engine, monkeypatch):
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(import_handler, "SessionLocal", Session)
+    monkeypatch.setattr(import_handler, "get_main_menu", lambda: "MENU")
+    monkeypatch.setattr(import_handler.bot, "send_message", MagicMock())
+    monkeypatch.setattr(import_handler.bot, "get_file", lambda file_id: SimpleNamespace(file_path="doc.csv"))
+    session = Session()
+    user = User(telegram_id=1501, username="olha")
+    session.add(user)
+    session.commit()
+    user_id = user.id
+    session.close()
+    yield monkeypatch
+    session = Session()
+    session.query(Transaction).filter(Transaction.user_id == user_id).delete()
+    session.query(User).filter(User.id == user_id).delete()
+    session.commit()
+    session.close()
+
+
+def _document_message():
+    return SimpleNamespace(
+        content_type="document", document=SimpleNamespace(file_id="f1"),
+        chat=SimpleNamespace(id=9), from_user=SimpleNamespace(id=1501)
+    )
+
+
+def test_document_is_downloaded_before_import(importer):
+    # Відповідь уже закрита, коли імпорт починає читати потік
+    body = "date,amount,category\n2025-05-01,-20,Їжа\n".encode("utf-8-sig")
+    importer.setattr(import_handler.requests, "get", lambda url, stream, timeout: FakeResponse(body))
+    stream = import_handler.download_document("f1")
+    try:
+        assert stream.read() == "date,amount,category\n2025-05-01,-20,Їжа\n"
+    finally:
+        stream.close()
+
+
+def test_csv_reader_errors_get_a_reply(importer):
+    body = ("date,amount,category\n2025-05-01,-20,\"" + "x" * 200000 + "\"\n").encode()
+    importer.setattr(import_handler.requests, "get", lambda url, stream, timeout: FakeResponse(body))
+    import_handler.import_document(_document_message())
+    reply = import_handler.bot.send_message.call_args[0][1]
+    assert reply.startswith("Невірний формат файлу")
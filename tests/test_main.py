@@ -0,0 +1,12 @@
+import runpy
+from bot import models
+
+
+def test_spawned_workers_do_not_start_the_bot(monkeypatch):
+    # Пул малювання ("spawn") імпортує головний модуль як __mp_main__
+    def fail(*args, **kwargs):
+        raise AssertionError("init_db called on import")
+
+    monkeypatch.setattr(models, "init_db", fail)
+    namespace = runpy.run_module("bot.main", run_name="__mp_main__")
+    assert callable(namespace["main"])
@@ -0,0 +1,95 @@
+import datetime
+import threading
+import pytest
+from sqlalchemy.orm import sessionmaker
+from bot.models import MarketChart
+from bot.utils import market_charts, rate_lookup
+from bot.utils.cache import SizedLRUCache
+
+MAY_START, MAY_END = datetime.date(2025, 5, 1), datetime.date(2025, 5, 31)
+JUNE_10 = datetime.date(2025, 6, 10)
+
+
+@pytest.fixture
+def fake_rates(monkeypatch):
+    """
+    Курси без мережі; calls рахує побудови графіка, stale — які валюти «застарілі».
+    """
+    state = {"calls": 0, "stale": set()}
+
+    def fiat_rates(session, codes, start, end, deadline):
+        state["calls"] += 1
+        return {code: {start: 41.0, end: 41.5} for code in codes}, set(state["stale"])
+
+    def crypto_timeseries(session, coins, vs_currency, start, end, deadline):
+        return {coin: [(start, 64000.0), (end, 65000.0)] for coin in coins}, set()
+
+    monkeypatch.setattr(rate_lookup, "fiat_rates", fiat_rates)
+    monkeypatch.setattr(rate_lookup, "crypto_timeseries", crypto_timeseries)
+    monkeypatch.setattr(market_charts.renderer, "render", lambda spec: b"png:" + spec["fiat_title"].encode())
+    monkeypatch.setattr(market_charts, "_charts", SizedLRUCache(max_bytes=1024 * 1024))
+    return state
+
+
+def test_closed_period_is_rendered_once_and_persisted(session, fake_rates, monkeypatch):
+    png, stale = market_charts.get_chart(session, MAY_START, MAY_END, today=JUNE_10)
+    assert stale == set() and png.startswith(b"png:")
+    assert market_charts.get_chart(session, MAY_START, MAY_END, today=JUNE_10) == (png, set())
+    assert fake_rates["calls"] == 1
+
+    # Інший процес / перезапуск: байти з market_charts
+    monkeypatch.setattr(market_charts, "_charts", SizedLRUCache(max_bytes=1024 * 1024))
+    assert market_charts.get_chart(session, MAY_START, MAY_END, today=JUNE_10)[0] == png
+    assert fake_rates["calls"] == 1
+    row = session.get(MarketChart, (MAY_START, MAY_END, market_charts.CURRENCIES))
+    assert row.png == png
+
+
+def test_stale_chart_is_not_stored(session, fake_rates):
+    fake_rates["stale"] = {"USD"}
+    assert market_charts.get_chart(session, MAY_START, MAY_END, today=JUNE_10)[1] == {"USD"}
+    market_charts.get_chart(session, MAY_START, MAY_END, today=JUNE_10)
+    assert fake_rates["calls"] == 2
+    assert session.query(MarketChart).count() == 0
+
+
+def test_open_period_is_kept_in_memory_for_the_day(session, fake_rates):
+    start, end = datetime.date(2025, 6, 1), datetime.date(2025, 6, 30)
+    market_charts.get_chart(session, start, end, today=JUNE_10)
+    market_charts.get_chart(session, start, end, today=JUNE_10)
+    assert fake_rates["calls"] == 1
+    market_charts.get_chart(session, start, end, today=JUNE_10 + datetime.timedelta(days=1))
+    assert fake_rates["calls"] == 2
+    assert session.query(MarketChart).count() == 0
+
+
+def test_pregenerate_closed_month_at_rollover(engine, fake_rates, monkeypatch):
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(market_charts, "SessionLocal", Session)
+    assert market_charts.pregenerate_closed_month(today=datetime.date(2025, 6, 1)) is True
+
+    session = Session()
+    try:
+        row = session.get(MarketChart, (MAY_START, MAY_END, market_charts.CURRENCIES))
+        assert row is not None
+        # Місячний звіт після цього лише читає готовий графік
+        assert market_charts.get_chart(session, MAY_START, MAY_END, today=JUNE_10)[0] == row.png
+        assert fake_rates["calls"] == 1
+    finally:
+        session.query(MarketChart).delete()
+        session.commit()
+        session.close()
+
+
+def test_finished_request_keeps_a_later_requests_lock(session, fake_rates, monkeypatch):
+    key = market_charts._memory_key(MAY_START, MAY_END, JUNE_10)
+    later = threading.Lock()
+
+    def build_spec(*args, **kwargs):
+        # Поки перший запит малює, його lock уже прибрано, а наступний поставив свій
+        market_charts._locks[key] = later
+        return {"fiat_title": "May"}, set()
+
+    monkeypatch.setattr(market_charts, "build_spec", build_spec)
+    market_charts.get_chart(session, MAY_START, MAY_END, today=JUNE_10)
+    assert market_charts._locks.pop(key) is later
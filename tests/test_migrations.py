@@ -0,0 +1,96 @@
+import datetime
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+from bot.models import Base, Transaction, alembic_config, init_db
+
+
+def test_migrations_match_models(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    engine = create_engine(url)
+    cfg = alembic_config()
+    with engine.begin() as connection:
+        cfg.attributes["connection"] = connection
+        command.upgrade(cfg, "head")
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    assert diff == []
+
+
+def test_init_db_upgrades_legacy_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    cfg = alembic_config()
+    # База, створена старим create_all(): схема 0001 без таблиці alembic_version
+    with engine.begin() as connection:
+        cfg.attributes["connection"] = connection
+        command.upgrade(cfg, "0001")
+        connection.execute(text("DROP TABLE alembic_version"))
+
+    init_db(url)
+    indexes = {ix["name"] for ix in inspect(engine).get_indexes("transactions")}
+    assert {"ix_transactions_user_type_date", "ix_transactions_user_date"} <= indexes
+
+
+def _plan(session, query):
+    compiled = query.statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    rows = session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_report_range_queries_use_composite_index(session, typed):
+    start = datetime.datetime(2025, 5, 1)
+    end = datetime.datetime(2025, 5, 31, 23, 59)
+    query = session.query(Transaction).filter(
+        Transaction.user_id == 1,
+        Transaction.date >= start,
+        Transaction.date <= end
+    )
+    if typed:
+        query = query.filter(Transaction.type == "expense")
+        expected = "ix_transactions_user_type_date"
+    else:
+        expected = "ix_transactions_user_date"
+    assert expected in _plan(session, query.order_by(Transaction.date))
+
+
+def test_minor_units_migration_converts_amounts(tmp_path):
+    url = f"sqlite:///{tmp_path / 'amounts.db'}"
+    engine = create_engine(url)
+    cfg = alembic_config()
+    with engine.begin() as connection:
+        cfg.attributes["connection"] = connection
+        command.upgrade(cfg, "0003")
+        connection.execute(text("INSERT INTO users (id, telegram_id, username) VALUES (1, 1, 'u')"))
+        connection.execute(text(
+            "INSERT INTO categories (id, name, type, user_id, is_default) VALUES (1, 'Food', 'expense', 1, 0)"
+        ))
+        connection.execute(text(
+            "INSERT INTO transactions (amount, type, user_id, category_id) VALUES (19.99, 'expense', 1, 1)"
+        ))
+        command.upgrade(cfg, "0004")
+        assert connection.execute(text("SELECT amount_minor FROM transactions")).scalar() == 1999
+
+
+def test_monthly_metrics_migration_drops_duplicates(tmp_path):
+    url = f"sqlite:///{tmp_path / 'metrics.db'}"
+    engine = create_engine(url)
+    cfg = alembic_config()
+    with engine.begin() as connection:
+        cfg.attributes["connection"] = connection
+        command.upgrade(cfg, "0008")
+        connection.execute(text("INSERT INTO users (id, telegram_id, username) VALUES (1, 1, 'u')"))
+        for total in (100, 300):
+            connection.execute(text(
+                "INSERT INTO monthly_metrics (user_id, year_month, total_expense_minor) "
+                f"VALUES (1, '2025-04', {total})"
+            ))
+        command.upgrade(cfg, "0009")
+        rows = connection.execute(text("SELECT total_expense_minor FROM monthly_metrics")).fetchall()
+    assert rows == [(300,)]
+    assert {uq["name"] for uq in inspect(engine).get_unique_constraints("monthly_metrics")} == {
+        "uq_monthly_metrics_user_month"
+    }
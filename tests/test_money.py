@@ -0,0 +1,26 @@
+import pytest
+from bot.utils import money
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("150", 15000),
+    ("150.5", 15050),
+    ("150,50", 15050),
+    (" 0.1 ", 10),
+    ("2.675", 268),
+])
+def test_parse_amount(text, expected):
+    assert money.parse_amount(text) == expected
+
+
+@pytest.mark.parametrize("text", ["abc", "", "nan", "inf"])
+def test_parse_amount_rejects_non_numbers(text):
+    with pytest.raises(ValueError):
+        money.parse_amount(text)
+
+
+def test_round_trip_and_format():
+    assert money.to_minor(0.1) + money.to_minor(0.2) == money.to_minor(0.3)
+    assert money.from_minor(15050) == 150.5
+    assert money.format_amount(15050) == "150.50"
+    assert money.format_amount(-5) == "-0.05"
@@ -0,0 +1,92 @@
+import datetime
+import pytest
+from sqlalchemy.exc import IntegrityError
+from bot.models import User, Category, MonthlyMetric
+from bot.utils import ledger, monthly_metrics
+
+
+def _setup(session):
+    user = User(telegram_id=701, username="hugo")
+    session.add(user)
+    session.flush()
+    food = Category(name="Food", type="expense", user_id=user.id)
+    rent = Category(name="Rent", type="expense", user_id=user.id)
+    salary = Category(name="Salary", type="income", user_id=user.id)
+    session.add_all([food, rent, salary])
+    session.flush()
+    return user, food, rent, salary
+
+
+def test_metric_follows_insert_edit_delete(session):
+    user, food, rent, salary = _setup(session)
+    may = datetime.datetime(2025, 5, 10, 12, 0)
+    ledger.add_transaction(session, user.id, salary.id, "income", 3100000, date=may)
+    ledger.add_transaction(session, user.id, food.id, "expense", 31000, date=may)
+    big = ledger.add_transaction(session, user.id, rent.id, "expense", 62000, date=may)
+    session.commit()
+
+    metric = monthly_metrics.find(session, user.id, may.date())
+    assert metric.total_income_minor == 3100000
+    assert metric.total_expense_minor == 93000
+    assert metric.avg_daily_expense_minor == 3000  # 93000 / 31 день
+    assert metric.top_category == "Rent"
+    assert round(metric.top_category_pct, 1) == 66.7
+
+    # Зміна суми переносить топ-категорію
+    ledger.update_transaction(session, big, amount_minor=1000)
+    session.commit()
+    metric = monthly_metrics.find(session, user.id, may.date())
+    assert metric.total_expense_minor == 32000
+    assert metric.top_category == "Food"
+
+    # Перенесення в інший місяць оновлює обидва
+    ledger.update_transaction(session, big, date=datetime.datetime(2025, 6, 1))
+    session.commit()
+    assert monthly_metrics.find(session, user.id, may.date()).total_expense_minor == 31000
+    june = monthly_metrics.find(session, user.id, datetime.date(2025, 6, 15))
+    assert june.total_expense_minor == 1000
+
+    ledger.delete_transaction(session, big)
+    session.commit()
+    assert monthly_metrics.find(session, user.id, datetime.date(2025, 6, 1)) is None
+
+
+def test_get_or_refresh_fills_missing_month_once(session):
+    user, food, rent, salary = _setup(session)
+    day = datetime.datetime(2025, 4, 3)
+    ledger.add_transaction(session, user.id, food.id, "expense", 1500, date=day)
+    session.commit()
+    session.query(MonthlyMetric).delete()
+    session.commit()
+
+    metric = monthly_metrics.get_or_refresh(session, user.id, day.date())
+    assert metric.year_month == "2025-04"
+    assert metric.total_expense == 15.0
+    assert session.query(MonthlyMetric).count() == 1
+    assert monthly_metrics.get_or_refresh(session, user.id, datetime.date(2025, 3, 1)) is None
+
+
+def test_one_metric_row_per_month(session):
+    user, food, rent, salary = _setup(session)
+    ledger.add_transaction(session, user.id, food.id, "expense", 1500, date=datetime.datetime(2025, 4, 3))
+    session.commit()
+    with pytest.raises(IntegrityError):
+        with session.begin_nested():
+            session.add(MonthlyMetric(user_id=user.id, year_month="2025-04"))
+
+
+def test_refresh_joins_a_row_created_concurrently(session, monkeypatch):
+    user, food, rent, salary = _setup(session)
+    day = datetime.datetime(2025, 4, 3)
+    ledger.add_transaction(session, user.id, food.id, "expense", 1500, date=day)
+    ledger.add_transaction(session, user.id, rent.id, "expense", 2500, date=day)
+    session.commit()
+
+    # Перший lock «не бачить» рядка, який тим часом вставив інший обробник
+    lock = monthly_metrics._lock
+    misses = iter([None])
+    monkeypatch.setattr(monthly_metrics, "_lock", lambda *args: next(misses, None) or lock(*args))
+    metric = monthly_metrics.refresh(session, user.id, day.date())
+    session.commit()
+    assert session.query(MonthlyMetric).count() == 1
+    assert (metric.total_expense_minor, metric.top_category) == (4000, "Rent")
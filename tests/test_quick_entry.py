@@ -0,0 +1,51 @@
+import datetime
+from bot.models import User, Category, Transaction, MonthlyMetric
+from bot.utils import category_cache, ledger, quick_entry
+
+
+def _setup(session):
+    user = User(telegram_id=1101, username="liam")
+    session.add(user)
+    session.flush()
+    session.add_all([
+        Category(name="Їжа", type="expense", user_id=user.id),
+        Category(name="Інше витрати", type="expense", user_id=user.id),
+        Category(name="Інше", type="expense", user_id=user.id),
+        Category(name="Подарунки", type="expense", user_id=user.id),
+        Category(name="Подарунки", type="income", user_id=user.id),
+    ])
+    session.commit()
+    category_cache.invalidate(user.id)
+    return user
+
+
+def test_parse_matches_longest_category_and_sign(session):
+    user = _setup(session)
+    cats = category_cache.load(session, user.id)
+    entries, errors = quick_entry.parse(
+        "150 їжа кава з собою; 40,5 Інше витрати; +300 Подарунки від мами; 20 Подарунки; 5 Невідома",
+        cats
+    )
+    assert errors == ["5 Невідома"]
+    assert [(e.type, e.amount_minor, e.category_name, e.note) for e in entries] == [
+        ("expense", 15000, "Їжа", "кава з собою"),
+        ("expense", 4050, "Інше витрати", ""),
+        ("income", 30000, "Подарунки", "від мами"),
+        ("expense", 2000, "Подарунки", ""),
+    ]
+    assert quick_entry.looks_like_entry("150 Їжа") and quick_entry.looks_like_entry("+1 x")
+    assert not quick_entry.looks_like_entry("➕ Витрата")
+
+
+def test_batch_insert_updates_month_once(session):
+    user = _setup(session)
+    cats = category_cache.load(session, user.id)
+    entries, _ = quick_entry.parse("150 Їжа; 50 Їжа; +300 Подарунки", cats)
+    ledger.add_transactions(
+        session, user.id, [(e.type, e.amount_minor, e.category_id, e.note) for e in entries],
+        date=datetime.datetime(2025, 5, 3)
+    )
+    session.commit()
+    assert session.query(Transaction).filter_by(user_id=user.id).count() == 3
+    metric = session.query(MonthlyMetric).filter_by(user_id=user.id).one()
+    assert (metric.total_expense_minor, metric.total_income_minor) == (20000, 30000)
@@ -0,0 +1,119 @@
+import datetime
+import pytest
+import requests
+from bot.utils import fx_rates, crypto_rates, nbu_client, rate_lookup
+from bot.utils.resilience import Deadline, CircuitBreaker, CircuitOpenError
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    timer = FakeTimer()
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30, timer=timer)
+
+    def boom():
+        raise IOError("down")
+
+    for _ in range(2):
+        with pytest.raises(IOError):
+            breaker.call(boom)
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "never")
+
+    # Після reset_timeout пропускається один пробний виклик
+    timer.now = 31
+    assert breaker.call(lambda: "ok") == "ok"
+    assert not breaker.is_open
+
+
+def test_report_timeouts_open_circuit_but_deadline_leftovers_do_not(monkeypatch):
+    breaker = CircuitBreaker("nbu-test", failure_threshold=3, reset_timeout=60)
+    monkeypatch.setattr(nbu_client, "breaker", breaker)
+    calls = []
+
+    def hang(url, timeout):
+        calls.append(timeout)
+        raise requests.Timeout()
+
+    monkeypatch.setattr(nbu_client._http, "get", hang)
+    day = datetime.date(2025, 4, 1)
+    timer = FakeTimer()
+
+    # Залишок дедлайну в пів секунди нічого не каже про НБУ
+    for _ in range(3):
+        assert nbu_client.fetch_range("USD", day, day, Deadline(0.5, timer=timer)) == {}
+    assert not breaker.is_open
+
+    # Три звіти поспіль прочекали весь дедлайн — НБУ більше не опитується
+    for _ in range(3):
+        assert nbu_client.fetch_range("USD", day, day, Deadline(rate_lookup.REPORT_DEADLINE, timer=timer)) == {}
+    assert breaker.is_open
+    calls.clear()
+    assert nbu_client.fetch_range("USD", day, day, Deadline(rate_lookup.REPORT_DEADLINE, timer=timer)) == {}
+    assert calls == []
+
+
+def test_inconclusive_trial_keeps_circuit_open():
+    timer = FakeTimer()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, timer=timer)
+
+    def boom():
+        raise IOError("down")
+
+    def slow():
+        raise requests.Timeout()
+
+    with pytest.raises(IOError):
+        breaker.call(boom)
+    timer.now = 31
+    with pytest.raises(requests.Timeout):
+        breaker.call(slow, inconclusive=(requests.Timeout,))
+    assert breaker.is_open
+    # Пробний виклик можна повторити
+    assert breaker.call(lambda: "ok") == "ok"
+    assert not breaker.is_open
+
+
+def test_deadline_caps_timeouts():
+    timer = FakeTimer()
+    deadline = Deadline(3.0, timer=timer)
+    assert deadline.timeout(10) == 3.0
+    timer.now = 2.5
+    assert deadline.timeout(10) == 0.5
+    timer.now = 4
+    assert deadline.expired and deadline.timeout(10) == 0.0
+
+
+def test_fiat_falls_back_to_last_known_rate(session, monkeypatch):
+    monkeypatch.setattr(nbu_client, "fetch_ranges", lambda codes, start, end, deadline=None: {})
+    fx_rates.store_rates(session, "USD", {datetime.date(2024, 1, 31): 38.0, datetime.date(2024, 2, 2): 39.0})
+
+    start, end = datetime.date(2024, 2, 1), datetime.date(2024, 2, 3)
+    rates, stale = rate_lookup.fiat_rates(session, ["USD", "EUR"], start, end, Deadline(1.0))
+    assert rates["USD"] == {start: 38.0, datetime.date(2024, 2, 2): 39.0, end: 39.0}
+    assert stale == {"USD"}
+    # Для EUR у сховищі нічого немає — підставляти нічого
+    assert rates["EUR"] == {}
+
+
+def test_crypto_skips_network_after_deadline(session, monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("network call")
+
+    monkeypatch.setattr(crypto_rates, "get_series", no_network)
+    day = datetime.date(2024, 3, 1)
+    crypto_rates.store_prices(session, "bitcoin", "usd", {day - datetime.timedelta(days=1): 60000.0})
+
+    timer = FakeTimer()
+    deadline = Deadline(1.0, timer=timer)
+    timer.now = 2.0
+    series, stale = rate_lookup.crypto_timeseries(session, ["bitcoin"], "usd", day, day, deadline)
+    assert series["bitcoin"] == [(day, 60000.0)]
+    assert stale == {"bitcoin"}
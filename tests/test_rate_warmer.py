@@ -0,0 +1,60 @@
+import datetime
+import pytest
+from bot.models import CryptoPrice
+from bot.utils import fx_rates, crypto_rates, nbu_client, rate_warmer
+
+
+def _days(start, end):
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+@pytest.fixture
+def fake_sources(monkeypatch):
+    calls = {"nbu": [], "crypto": []}
+
+    def fake_ranges(codes, start, end, deadline=None):
+        calls["nbu"].append((start, end))
+        return {code: {d: 40.0 for d in _days(start, end)} for code in codes}
+
+    def fake_series(coin, vs_currency, start, deadline=None):
+        calls["crypto"].append(coin)
+        return {d: 1000.0 for d in _days(start, datetime.date.today())}
+
+    monkeypatch.setattr(nbu_client, "fetch_ranges", fake_ranges)
+    monkeypatch.setattr(crypto_rates, "get_series", fake_series)
+    return calls
+
+
+def test_backfill_fills_both_stores(session, fake_sources, monkeypatch):
+    monkeypatch.setattr(rate_warmer, "FIAT_CHUNK_DAYS", 10)
+    start = datetime.date(2024, 1, 1)
+    end = datetime.date(2024, 1, 25)
+    rate_warmer.backfill(session, start, end)
+
+    # Діапазон НБУ розбивається на порції
+    assert fake_sources["nbu"] == [
+        (start, datetime.date(2024, 1, 10)),
+        (datetime.date(2024, 1, 11), datetime.date(2024, 1, 20)),
+        (datetime.date(2024, 1, 21), end),
+    ]
+    usd = fx_rates.get_rates_many(session, ["USD"], start, end, fetch_missing=False)["USD"]
+    assert len(usd) == 25
+    btc = crypto_rates.get_stored_timeseries(session, "bitcoin", "USD", start, end)
+    assert len(btc) == 25
+    assert session.query(CryptoPrice).filter_by(coin="ethereum").count() == 25
+
+
+def test_store_only_lookup_never_fetches(session, monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("network call")
+
+    monkeypatch.setattr(nbu_client, "fetch_ranges", no_network)
+    day = datetime.date(2024, 2, 1)
+    assert fx_rates.get_rates_many(session, ("USD", "EUR"), day, day, fetch_missing=False) == {"USD": {}, "EUR": {}}
+
+
+def test_crypto_closes_skip_today(session, fake_sources):
+    today = datetime.date.today()
+    rate_warmer.warm_crypto(session, today - datetime.timedelta(days=2), today)
+    stored = crypto_rates.get_stored_timeseries(session, "bitcoin", "usd", today - datetime.timedelta(days=5), today)
+    assert [d for d, _ in stored] == _days(today - datetime.timedelta(days=2), today - datetime.timedelta(days=1))
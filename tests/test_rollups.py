@@ -0,0 +1,68 @@
+import datetime
+from bot.models import User, Category, Transaction, DailyRollup
+from sqlalchemy import func
+from bot.utils import rollups
+
+
+def _setup(session):
+    user = User(telegram_id=601, username="gina")
+    session.add(user)
+    session.flush()
+    food = Category(name="Food", type="expense", user_id=user.id)
+    salary = Category(name="Salary", type="income", user_id=user.id)
+    session.add_all([food, salary])
+    session.flush()
+    return user, food, salary
+
+
+def _add_tx(session, **kwargs):
+    tx = Transaction(**kwargs)
+    session.add(tx)
+    rollups.record(session, tx)
+    return tx
+
+
+def test_record_accumulates_one_row_per_key(session):
+    user, food, salary = _setup(session)
+    day = datetime.datetime(2025, 5, 10, 9, 0)
+    _add_tx(session, amount=10, date=day, type="expense", user_id=user.id, category_id=food.id)
+    _add_tx(session, amount=2.5, date=day.replace(hour=20), type="expense", user_id=user.id, category_id=food.id)
+    _add_tx(session, amount=1000, date=day, type="income", user_id=user.id, category_id=salary.id)
+    session.commit()
+
+    rows = session.query(DailyRollup).filter_by(user_id=user.id, type="expense").all()
+    assert [(r.day, r.total_minor, r.tx_count) for r in rows] == [(datetime.date(2025, 5, 10), 1250, 2)]
+
+    start, end = datetime.date(2025, 5, 1), datetime.date(2025, 5, 31)
+    assert rollups.type_totals(session, user.id, start, end) == {"income": 100000, "expense": 1250}
+    assert sorted(rollups.category_totals(session, user.id, start, end)) == [
+        ("Food", "expense", 1250), ("Salary", "income", 100000)
+    ]
+    assert rollups.daily_totals(session, user.id, start, end) == {
+        (datetime.date(2025, 5, 10), "expense"): 1250,
+        (datetime.date(2025, 5, 10), "income"): 100000,
+    }
+
+
+def test_discard_and_rebuild_match_transactions(session):
+    user, food, salary = _setup(session)
+    day = datetime.datetime(2025, 5, 10, 9, 0)
+    _add_tx(session, amount=10, date=day, type="expense", user_id=user.id, category_id=food.id)
+    removed = _add_tx(session, amount=7, date=day, type="expense", user_id=user.id, category_id=food.id)
+    session.flush()
+    rollups.discard(session, removed)
+    session.delete(removed)
+    # Транзакція, додана в обхід підсумків — її підхопить rebuild
+    session.add(Transaction(amount=3, date=day.replace(day=12), type="expense", user_id=user.id, category_id=food.id))
+    session.commit()
+
+    start, end = datetime.date(2025, 5, 1), datetime.date(2025, 5, 31)
+    assert rollups.type_totals(session, user.id, start, end)["expense"] == 1000
+
+    rollups.rebuild(session, user.id)
+    raw = dict(session.query(Transaction.type, func.sum(Transaction.amount_minor)).filter(
+        Transaction.user_id == user.id
+    ).group_by(Transaction.type).all())
+    assert raw == {"expense": 1300}
+    assert rollups.type_totals(session, user.id, start, end) == {"income": 0, "expense": 1300}
+    assert rollups.daily_totals(session, user.id, start, end)[(datetime.date(2025, 5, 12), "expense")] == 300
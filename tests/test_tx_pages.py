@@ -0,0 +1,63 @@
+import datetime
+from bot.models import User, Category, Transaction
+from bot.utils import tx_pages
+
+
+def _setup(session, count):
+    user = User(telegram_id=801, username="iris")
+    session.add(user)
+    session.flush()
+    food = Category(name="Food", type="expense", user_id=user.id)
+    session.add(food)
+    session.flush()
+    base = datetime.datetime(2025, 5, 1, 8, 0)
+    # Кілька транзакцій з однаковим часом — порядок вирішує id
+    session.add_all([
+        Transaction(amount=i + 1, date=base + datetime.timedelta(hours=(i // 2) * 5), type="expense",
+                    note=f"n{i}", user_id=user.id, category_id=food.id)
+        for i in range(count)
+    ])
+    session.commit()
+    return user
+
+
+def test_pages_cover_period_once_and_fit_message(session):
+    user = _setup(session, 60)
+    start, end = datetime.datetime(2025, 5, 1), datetime.datetime(2025, 5, 31)
+    seen = []
+    pages = []
+    page = tx_pages.fetch_page(session, user.id, start, end, page_chars=400)
+    while True:
+        pages.append(page)
+        assert len(page.text()) <= 400
+        seen.extend(row[0] for row in page.rows)
+        if not page.has_next:
+            break
+        page = tx_pages.fetch_page(session, user.id, start, end, after=page.last_key, page_chars=400)
+
+    assert len(pages) > 2
+    assert seen == sorted(seen) and len(seen) == len(set(seen)) == 60
+    assert not pages[0].has_prev and pages[-1].has_prev
+
+    back = tx_pages.fetch_page(session, user.id, start, end, before=pages[2].first_key, page_chars=400)
+    assert back.rows[-1][0] == pages[1].rows[-1][0]
+    assert back.has_next
+
+
+def test_long_note_is_cut_to_fit_one_message(session):
+    user = _setup(session, 2)
+    tx = session.query(Transaction).filter_by(user_id=user.id).first()
+    tx.note = "x" * 10000
+    session.commit()
+    page = tx_pages.fetch_page(session, user.id, datetime.datetime(2025, 5, 1), datetime.datetime(2025, 5, 31))
+    assert len(page.rows) == 2
+    assert len(page.text()) <= tx_pages.PAGE_CHARS
+    assert "x" * (tx_pages.NOTE_CHARS - 1) + "…)" in page.text()
+
+
+def test_callback_data_round_trip_fits_telegram_limit():
+    start, end = datetime.datetime(2025, 1, 1), datetime.datetime(2025, 12, 31, 23, 59, 59)
+    key = (datetime.datetime(2025, 6, 30, 12, 34, 56, 789012), 123456789)
+    data = tx_pages.encode_callback("n", start, end, key)
+    assert len(data.encode()) <= 64
+    assert tx_pages.decode_callback(data) == ("n", start, end, key)
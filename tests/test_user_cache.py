@@ -0,0 +1,35 @@
+from sqlalchemy import event
+from bot.models import User
+from bot.utils import user_cache
+from bot.utils.cache import LRUCache
+
+
+def test_get_user_id_queries_once(session, engine, monkeypatch):
+    monkeypatch.setattr(user_cache, "_user_ids", LRUCache(maxsize=2))
+    user = User(telegram_id=777, username="frank")
+    session.add(user)
+    session.commit()
+    user_id = user.id
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert user_cache.get_user_id(session, 777) == user_id
+        assert user_cache.get_user_id(session, 777) == user_id
+        # незареєстрованих не кешуємо
+        assert user_cache.get_user_id(session, 778) is None
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(statements) == 2
+
+
+def test_identity_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(user_cache, "_user_ids", LRUCache(maxsize=2))
+    user_cache.remember(1, 10)
+    user_cache.remember(2, 20)
+    user_cache.remember(3, 30)
+    assert len(user_cache._user_ids) == 2
+    assert user_cache._user_ids.get(1) is None
+    user_cache.forget(3)
+    assert user_cache._user_ids.get(3) is None
@@ -0,0 +1,98 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+import telebot
+from bot import webhook
+
+SECRET = "s3cret"
+
+
+def _update(update_id, text="hello"):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 5, "type": "private"},
+            "from": {"id": 5, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+
+class FakeTelegram:
+    """Plays Telegram's side: POSTs updates to the webhook like the Bot API does."""
+
+    def __init__(self, url):
+        self.url = url
+
+    def post(self, payload, secret=SECRET, body=None):
+        data = body if body is not None else json.dumps(payload).encode()
+        request = urllib.request.Request(self.url, data=data, method="POST")
+        request.add_header("Content-Type", "application/json")
+        if secret is not None:
+            request.add_header(webhook.SECRET_HEADER, secret)
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+@pytest.fixture
+def served():
+    servers = []
+
+    def serve(bot, workers=2, queue_size=8):
+        server, dispatcher = webhook.make_server(bot, "127.0.0.1", 0, "/telegram", SECRET, workers, queue_size)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append((server, dispatcher))
+        return FakeTelegram(f"http://127.0.0.1:{server.server_address[1]}/telegram"), dispatcher
+
+    yield serve
+    for server, dispatcher in servers:
+        server.shutdown()
+        server.server_close()
+        dispatcher.stop()
+
+
+def test_updates_reach_handlers_through_worker_pool(served):
+    bot = telebot.TeleBot("1:fake")
+    seen = []
+    bot.message_handler(func=lambda m: True)(lambda m: seen.append((m.text, threading.current_thread().name)))
+    client, dispatcher = served(bot)
+    dispatcher.start()
+
+    assert [client.post(_update(i, f"m{i}")) for i in range(5)] == [200] * 5
+    dispatcher.join()
+    assert sorted(text for text, _ in seen) == [f"m{i}" for i in range(5)]
+    assert all(name.startswith("webhook-worker-") for _, name in seen)
+
+
+def test_rejects_bad_secret_path_and_body(served):
+    bot = telebot.TeleBot("1:fake")
+    client, dispatcher = served(bot)
+    dispatcher.start()
+    assert client.post(_update(1), secret="wrong") == 403
+    assert client.post(_update(1), secret=None) == 403
+    assert client.post(None, body=b"not json") == 400
+    assert FakeTelegram(client.url.replace("/telegram", "/other")).post(_update(1)) == 404
+
+
+def test_full_queue_answers_503(served):
+    bot = telebot.TeleBot("1:fake")
+    started = threading.Event()
+    release = threading.Event()
+    bot.message_handler(func=lambda m: True)(lambda m: (started.set(), release.wait(5)))
+    client, dispatcher = served(bot, workers=1, queue_size=2)
+    dispatcher.start()
+
+    statuses = [client.post(_update(0))]
+    assert started.wait(5)
+    statuses += [client.post(_update(i)) for i in range(1, 6)]
+    release.set()
+    dispatcher.join()
+    # Один апдейт у роботі, два в черзі — решта відхиляється, Telegram повторить їх пізніше
+    assert statuses == [200, 200, 200, 503, 503, 503]